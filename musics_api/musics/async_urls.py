@@ -0,0 +1,11 @@
+from django.urls import path
+
+from musics.async_views import cd_list, cd_detail, cds_by_artist, cds_by_name, cds_by_published_by
+
+urlpatterns = [
+    path('', cd_list, name="async-musics-list"),
+    path('<int:pk>/', cd_detail, name="async-musics-detail"),
+    path('byartist', cds_by_artist, name="async-byartist"),
+    path('byname', cds_by_name, name="async-byname"),
+    path('by_published_by', cds_by_published_by, name="async-bypublishedby"),
+]
@@ -0,0 +1,89 @@
+"""
+Async counterparts of the CD read endpoints: under ASGI a request waiting on the database doesn't hold a
+worker thread. The sync views in musics.views stay the ones to mount behind WSGI and handle every write.
+"""
+import functools
+
+from django.http import HttpResponse
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from musics import cache, conditional
+from musics.models import CD
+from musics.pagination import CDCursorPagination
+from musics.serializers import CDSerializer
+from musics.views import search_term
+
+
+def _json(data, status=200) -> HttpResponse:
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def read_only(view):
+    # the reads are open to everyone (IsPublisherOrReadOnly), the DRF errors raised on the way get the
+    # same JSON bodies the sync views answer with
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return _json({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+        try:
+            return await view(request, *args, **kwargs)
+        except APIException as exc:
+            # validation errors are sent as they are, like the DRF exception handler does
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            return _json(data, status=exc.status_code)
+    return wrapper
+
+
+async def _list(request, queryset) -> HttpResponse:
+    # same layers as the sync list views: conditional GET, then the response cache, then one page
+    # fetched with the async ORM and serialized from the select_related rows
+    etag, last_modified = await conditional.alist_validators(request, queryset)
+
+    async def build_data():
+        drf_request = Request(request)
+        paginator = CDCursorPagination()
+        page = await paginator.apaginate_queryset(queryset, drf_request)
+        serializer = CDSerializer(page, many=True, context={'request': drf_request})
+        return paginator.get_paginated_response(serializer.data).data
+
+    return await conditional.aconditional_response(
+        request, etag, last_modified, lambda: cache.acached_response(cache.list_key(request, etag), build_data, _json))
+
+
+@read_only
+async def cd_list(request) -> HttpResponse:
+    return await _list(request, CD.objects.with_publisher())
+
+
+@read_only
+async def cd_detail(request, pk) -> HttpResponse:
+    queryset = CD.objects.with_publisher()
+    etag, last_modified = await conditional.adetail_validators(request, queryset, pk)
+
+    async def build_data():
+        try:
+            cd = await queryset.aget(pk=pk)
+        except CD.DoesNotExist:
+            raise NotFound()
+        return CDSerializer(cd, context={'request': Request(request)}).data
+
+    return await conditional.aconditional_response(
+        request, etag, last_modified,
+        lambda: cache.acached_response(etag and cache.detail_key(request, pk, etag), build_data, _json))
+
+
+@read_only
+async def cds_by_artist(request) -> HttpResponse:
+    return await _list(request, CD.objects.with_publisher().search('artist', search_term(request.GET, 'artist')))
+
+
+@read_only
+async def cds_by_name(request) -> HttpResponse:
+    return await _list(request, CD.objects.with_publisher().search('name', search_term(request.GET, 'name')))
+
+
+@read_only
+async def cds_by_published_by(request) -> HttpResponse:
+    return await _list(request, CD.objects.with_publisher().search('publisher', search_term(request.GET, 'publishedby')))
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from musics import cache
+
+
+def _user_fields():
+    # the password hash never leaves the database, the cached user loads it lazily if something asks for it
+    return [field.attname for field in get_user_model()._meta.concrete_fields if field.attname != 'password']
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication keeping the token, and its user without the password, in the musics cache for
+    MUSICS_TOKEN_CACHE_TIMEOUT seconds. Deleting the token (logout) or saving its user drops the entry once
+    committed, unknown keys are never cached. Nothing is cached when the workers don't share the cache.
+    """
+
+    def authenticate_credentials(self, key):
+        if not cache.shared_across_workers():
+            return super().authenticate_credentials(key)
+        cache_key = cache.token_key(key)
+        entry = cache.get_cache().get(cache_key)
+        if entry is not None:
+            return self._from_entry(key, entry)
+        user, token = super().authenticate_credentials(key)
+        entry = {'created': token.created, 'user': {name: getattr(user, name) for name in _user_fields()}}
+        cache.get_cache().set(cache_key, entry, timeout=settings.MUSICS_TOKEN_CACHE_TIMEOUT)
+        return user, token
+
+    @staticmethod
+    def _from_entry(key, entry):
+        # from_db marks the fields left out as deferred: saving the user never overwrites them
+        user_model = get_user_model()
+        user = user_model.from_db(router.db_for_read(user_model), list(entry['user']), list(entry['user'].values()))
+        token = Token.from_db(router.db_for_read(Token), ['key', 'user_id', 'created'],
+                              [key, user.pk, entry['created']])
+        token.user = user
+        return user, token
@@ -0,0 +1,161 @@
+from django.conf import settings
+from django.db import transaction, IntegrityError
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import PermissionDenied, NotAuthenticated
+
+from musics.models import CD
+from musics.serializers import CDBulkSerializer
+from musics.signals import cds_bulk_saved, cds_bulk_deleted
+
+UPDATABLE_FIELDS = ['name', 'artist', 'record_company', 'genre', 'ean_code', 'price', 'price_currency', 'updated_at']
+EAN_CONFLICT_ERROR = 'cd with this ean code already exists.'
+NOT_FOUND_ERROR = 'Not found.'
+NOT_A_LIST_ERROR = 'Expected a list of items.'
+INVALID_ID_ERROR = 'A valid integer is required.'
+
+
+class BulkRejected(Exception):
+    """raised when some items are invalid or conflict, nothing is written, results holds one entry per failing item"""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.results = [errors[index] for index in sorted(errors)]
+
+
+def chunks(items, size=None):
+    size = size or settings.MUSICS_BULK_CHUNK_SIZE
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def result(index, status_code, **extra):
+    return dict(index=index, status=status_code, **extra)
+
+
+def item_id(item):
+    return item.get('id') if isinstance(item, dict) else item
+
+
+def validate(view, items):
+    serializer = CDBulkSerializer(data=items, many=True, context=view.get_serializer_context())
+    if serializer.is_valid():
+        return serializer.validated_data, {}
+    return None, {index: result(index, status.HTTP_400_BAD_REQUEST, errors=errors)
+                  for index, errors in enumerate(serializer.errors) if errors}
+
+
+def ean_conflicts(items):
+    """items is a list of (index, id, ean_code), id is None for CDs still to be created"""
+    conflicts = {}
+    seen = set()
+    for index, pk, ean_code in items:
+        if ean_code in seen:
+            conflicts[index] = result(index, status.HTTP_409_CONFLICT, errors={'ean_code': [EAN_CONFLICT_ERROR]})
+        seen.add(ean_code)
+
+    taken = {}
+    for chunk in chunks(list(seen)):
+        taken.update(CD.objects.filter(ean_code__in=chunk).values_list('ean_code', 'id'))
+    for index, pk, ean_code in items:
+        if ean_code in taken and taken[ean_code] != pk:
+            conflicts[index] = result(index, status.HTTP_409_CONFLICT, errors={'ean_code': [EAN_CONFLICT_ERROR]})
+    return conflicts
+
+
+def fetch_and_authorize(view, ids):
+    """fetch the CDs with one query per chunk and run the object permissions on each of them"""
+    # ids come straight from the payload, lists or objects are not hashable and bools are not ids
+    invalid = {index for index, pk in enumerate(ids) if not isinstance(pk, int) or isinstance(pk, bool)}
+    instances = {}
+    for chunk in chunks(list({pk for index, pk in enumerate(ids) if index not in invalid})):
+        instances.update(CD.objects.with_publisher().in_bulk(chunk))
+
+    errors = {}
+    for index, pk in enumerate(ids):
+        if index in invalid:
+            errors[index] = result(index, status.HTTP_400_BAD_REQUEST, errors={'id': [INVALID_ID_ERROR]})
+            continue
+        if pk not in instances:
+            errors[index] = result(index, status.HTTP_404_NOT_FOUND, errors={'id': [NOT_FOUND_ERROR]})
+            continue
+        try:
+            view.check_object_permissions(view.request, instances[pk])
+        except (PermissionDenied, NotAuthenticated) as exc:
+            errors[index] = result(index, status.HTTP_403_FORBIDDEN, errors={'detail': [str(exc.detail)]})
+    return instances, errors
+
+
+def write_in_chunks(indexed_instances, write, status_code):
+    """run write chunk by chunk in a single transaction, a failing chunk rolls back the whole request"""
+    results = []
+    try:
+        with transaction.atomic():
+            for chunk in chunks(indexed_instances):
+                failing = chunk
+                write([instance for _, instance in chunk])
+                results += [result(index, status_code, id=instance.pk) for index, instance in chunk]
+    except IntegrityError as exc:
+        raise BulkRejected({index: result(index, status.HTTP_409_CONFLICT, errors={'detail': [str(exc)]})
+                            for index, _ in failing})
+    return results
+
+
+def create(view, items):
+    validated, errors = validate(view, items)
+    if errors:
+        raise BulkRejected(errors)
+    errors = ean_conflicts([(index, None, data['ean_code']) for index, data in enumerate(validated)])
+    if errors:
+        raise BulkRejected(errors)
+
+    def write(instances):
+        CD.objects.bulk_create(instances)
+        cds_bulk_saved.send(sender=CD, instances=instances)
+
+    user = view.request.user
+    return write_in_chunks([(index, CD(published_by=user, **data)) for index, data in enumerate(validated)],
+                           write, status.HTTP_201_CREATED)
+
+
+def update(view, items):
+    ids = [item_id(item) for item in items]
+    validated, errors = validate(view, items)
+    instances, not_allowed = fetch_and_authorize(view, ids)
+    errors = {**not_allowed, **errors}
+    if errors:
+        raise BulkRejected(errors)
+    errors = ean_conflicts([(index, pk, data['ean_code']) for index, (pk, data) in enumerate(zip(ids, validated))])
+    if errors:
+        raise BulkRejected(errors)
+
+    now = timezone.now()
+    updated = []
+    for index, (pk, data) in enumerate(zip(ids, validated)):
+        instance = instances[pk]
+        for attr, value in data.items():
+            setattr(instance, attr, value)
+        instance.updated_at = now  # auto_now is not applied by bulk_update
+        updated.append((index, instance))
+
+    def write(chunk):
+        CD.objects.bulk_update(chunk, UPDATABLE_FIELDS)
+        cds_bulk_saved.send(sender=CD, instances=chunk)
+
+    return write_in_chunks(updated, write, status.HTTP_200_OK)
+
+
+def delete(view, items):
+    ids = [item_id(item) for item in items]
+    instances, errors = fetch_and_authorize(view, ids)
+    if errors:
+        raise BulkRejected(errors)
+
+    def write(chunk):
+        # nothing references a CD, one DELETE replaces the collector and its post_delete per row
+        pks = [instance.pk for instance in chunk]
+        CD.objects.filter(pk__in=pks)._raw_delete(CD.objects.db)
+        cds_bulk_deleted.send(sender=CD, ids=pks)
+
+    return write_in_chunks([(index, instances[pk]) for index, pk in enumerate(ids)], write,
+                           status.HTTP_204_NO_CONTENT)
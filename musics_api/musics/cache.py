@@ -0,0 +1,127 @@
+import hashlib
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+# hits and misses of this process, counting them in the cache would write to it on every read
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[settings.MUSICS_CACHE_ALIAS]
+
+
+def shared_across_workers() -> bool:
+    """False when several workers each hold a locmem cache, an invalidation would then reach only one of them"""
+    backend = settings.CACHES[settings.MUSICS_CACHE_ALIAS]['BACKEND']
+    return settings.MUSICS_WORKERS == 1 or not backend.endswith('.LocMemCache')
+
+
+def publisher_key(user_pk) -> str:
+    return f'musics:publisher:{user_pk}'
+
+
+def invalidate_publishers(user_pks) -> None:
+    """drops the cached group membership of the given users"""
+    get_cache().delete_many([publisher_key(pk) for pk in user_pks])
+
+
+def token_key(key) -> str:
+    # the token itself never ends up in a cache key
+    return f'musics:token:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def invalidate_tokens(keys) -> None:
+    get_cache().delete_many([token_key(key) for key in keys])
+
+
+# responses are keyed by the ETag that ConditionalGetMixin computed from the database in the same request:
+# a write changes the ETag, so there is nothing to invalidate, no version to lose when the cache culls
+# and no window where a reader caches data that is not committed yet under a new key
+
+def list_key(request, etag) -> str:
+    return _key('list', etag, request)
+
+
+def detail_key(request, pk, etag) -> str:
+    return _key(f'cd:{pk}', etag, request)
+
+
+def _key(scope, etag, request) -> str:
+    # the absolute uri keeps endpoint and query params apart, the host is part of the pagination links
+    digest = hashlib.md5(f'{etag}|{request.build_absolute_uri()}'.encode()).hexdigest()
+    return f'musics:response:{scope}:{digest}'
+
+
+def _count(outcome) -> None:
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+def cached_response(key, build_response) -> Response:
+    """key is None when the response has no validators, it is then built and not cached"""
+    if key is None:
+        return build_response()
+    cache = get_cache()
+    data = cache.get(key)
+    if data is not None:
+        _count('hits')
+        return Response(data)
+    _count('misses')
+    response = build_response()
+    if response.status_code == status.HTTP_200_OK:
+        cache.set(key, response.data, timeout=settings.MUSICS_CACHE_TIMEOUT)
+    return response
+
+
+async def acached_response(key, build_data, respond):
+    if key is None:
+        return respond(await build_data())
+    # the async cache methods, a file backend read never blocks the event loop
+    cache = get_cache()
+    data = await cache.aget(key)
+    if data is not None:
+        _count('hits')
+        return respond(data)
+    _count('misses')
+    data = await build_data()
+    await cache.aset(key, data, timeout=settings.MUSICS_CACHE_TIMEOUT)
+    return respond(data)
+
+
+def stats() -> dict:
+    """hits and misses of the current process"""
+    with _stats_lock:
+        hits, misses = _stats['hits'], _stats['misses']
+    return {
+        'backend': settings.CACHES[settings.MUSICS_CACHE_ALIAS]['BACKEND'],
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+    }
+
+
+class CachedReadMixin:
+    """
+    Serves list and retrieve from the musics cache under the ETag set by ConditionalGetMixin, which must come
+    first in the bases.
+    """
+
+    def list(self, request, *args, **kwargs):
+        key = list_key(request, self.etag) if getattr(self, 'etag', None) else None
+        return cached_response(key, lambda: super(CachedReadMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        key = detail_key(request, pk, self.etag) if getattr(self, 'etag', None) else None
+        return cached_response(key, lambda: super(CachedReadMixin, self).retrieve(request, *args, **kwargs))
@@ -0,0 +1,85 @@
+import base64
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Max
+
+from musics.models import CD, CDChange, CDDeletion
+
+# rows deleted or inserted per query by log_changes
+LOG_CHUNK_SIZE = 500
+
+
+class InvalidToken(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class ChangesToken:
+    """Position in the feed: last change log row and last tombstone returned."""
+    change_id: int
+    deletion_id: int
+
+    def encode(self) -> str:
+        raw = f'{self.change_id}|{self.deletion_id}'.encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    @staticmethod
+    def decode(token: str) -> 'ChangesToken':
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+            change_id, deletion_id = raw.split('|')
+            return ChangesToken(int(change_id), int(deletion_id))
+        except ValueError:
+            raise InvalidToken(token)
+
+
+def log_changes(cd_ids: Iterable[int]) -> None:
+    """moves the given CDs to the end of the change log, called once their write is part of the transaction"""
+    cd_ids = list(cd_ids)
+    with transaction.atomic():
+        for start in range(0, len(cd_ids), LOG_CHUNK_SIZE):
+            chunk = cd_ids[start:start + LOG_CHUNK_SIZE]
+            CDChange.objects.filter(cd_id__in=chunk).delete()
+            CDChange.objects.bulk_create(CDChange(cd_id=cd_id) for cd_id in chunk)
+
+
+def unlog_changes(cd_ids: Iterable[int]) -> None:
+    # a deleted CD is only sent as a tombstone
+    cd_ids = list(cd_ids)
+    for start in range(0, len(cd_ids), LOG_CHUNK_SIZE):
+        CDChange.objects.filter(cd_id__in=cd_ids[start:start + LOG_CHUNK_SIZE]).delete()
+
+
+@dataclass(frozen=True)
+class Changes:
+    changed: List[CD]
+    deleted: List[int]
+    token: ChangesToken
+    has_more: bool
+
+
+def changes_since(token: Optional[ChangesToken], limit: int) -> Changes:
+    # the feed follows the change log instead of updated_at: the timestamps are taken before the write lock,
+    # a write committed after a later stamped one would fall behind an updated_at cursor and never be sent
+    if token is None:
+        # a client without token gets the whole catalogue, tombstones before now are not relevant for it
+        last_deletion = CDDeletion.objects.aggregate(last=Max('id'))['last'] or 0
+        token = ChangesToken(0, last_deletion)
+
+    logged = list(CDChange.objects.filter(id__gt=token.change_id).order_by('id')
+                  .values_list('id', 'cd_id')[:limit + 1])
+    deletions = list(CDDeletion.objects.filter(id__gt=token.deletion_id).order_by('id')
+                     .values_list('id', 'cd_id')[:limit + 1])
+    has_more = len(logged) > limit or len(deletions) > limit
+    logged, deletions = logged[:limit], deletions[:limit]
+
+    # a CD deleted since it was logged is left to its tombstone
+    cds = CD.objects.with_publisher().in_bulk([cd_id for _, cd_id in logged])
+    changed = [cds[cd_id] for _, cd_id in logged if cd_id in cds]
+    if logged:
+        token = ChangesToken(logged[-1][0], token.deletion_id)
+    if deletions:
+        token = ChangesToken(token.change_id, deletions[-1][0])
+    return Changes(changed, [cd_id for _, cd_id in deletions], token, has_more)
@@ -0,0 +1,108 @@
+import hashlib
+
+from django.db.models import Subquery
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from musics.models import CDChange, CDDeletion
+
+
+def _etag(*parts) -> str:
+    return quote_etag(hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest())
+
+
+def _timestamp(value):
+    return int(value.timestamp()) if value is not None else None
+
+
+# lists only get an ETag: their Last-Modified would be Max(updated_at), which a delete does not move and
+# which is truncated to seconds, so If-Modified-Since could get a stale 304.
+# The list ETag is the position of the change log (see musics.changes): the last change row and the last
+# tombstone, read from their primary keys instead of aggregating the listed rows. Every committed write,
+# a publisher rename included, moves it. It is the same for every list, any write revalidates all of them.
+
+def _log_position():
+    last_deletion = CDDeletion.objects.order_by('-id').values('id')[:1]
+    return CDChange.objects.order_by('-id').annotate(last_deletion=Subquery(last_deletion)) \
+        .values_list('id', 'last_deletion')
+
+
+def list_validators(request, queryset):
+    """one query on two primary keys, the etag changes when any CD is added, updated or removed"""
+    return _list_etag(request, _log_position().first()), None
+
+
+async def alist_validators(request, queryset):
+    return _list_etag(request, await _log_position().afirst()), None
+
+
+def _list_etag(request, position) -> str:
+    return _etag(request.get_full_path(), position)
+
+
+def _detail_row(queryset, pk):
+    # an id that is not a number gets no validators, the view then answers 404 as it did before
+    try:
+        return queryset.filter(pk=pk).values_list('updated_at', 'published_by__username')
+    except (ValueError, TypeError):
+        return None
+
+
+def detail_validators(request, queryset, pk):
+    row = _detail_row(queryset, pk)
+    return _detail_validators(request, row.first() if row is not None else None)
+
+
+async def adetail_validators(request, queryset, pk):
+    row = _detail_row(queryset, pk)
+    return _detail_validators(request, await row.afirst() if row is not None else None)
+
+
+def _detail_validators(request, row):
+    if row is None:
+        return None, None
+    last_modified, publisher = row
+    return _etag(request.get_full_path(), last_modified.isoformat(), publisher), _timestamp(last_modified)
+
+
+def conditional_response(request, etag, last_modified, build_response):
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+    return _with_validators(build_response(), etag, last_modified)
+
+
+async def aconditional_response(request, etag, last_modified, build_response):
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+    return _with_validators(await build_response(), etag, last_modified)
+
+
+def _with_validators(response, etag, last_modified):
+    if response.status_code == 200:
+        if etag is not None:
+            response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Answers list and retrieve with 304 when the client validators still match, before anything is serialized.
+    The ETag is left on the view, CachedReadMixin keys the cached responses with it.
+    """
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = list_validators(request, self.filter_queryset(self.get_queryset()))
+        self.etag = etag
+        return conditional_response(request, etag, last_modified,
+                                    lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        etag, last_modified = detail_validators(request, self.get_queryset(), pk)
+        self.etag = etag
+        return conditional_response(request, etag, last_modified,
+                                    lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs))
@@ -0,0 +1,33 @@
+# Generated by Django 4.1.13 on 2026-10-17 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cd',
+            index=models.Index(fields=['artist'], name='musics_cd_artist_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cd',
+            index=models.Index(fields=['name'], name='musics_cd_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cd',
+            index=models.Index(fields=['genre'], name='musics_cd_genre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cd',
+            index=models.Index(fields=['ean_code'], name='musics_cd_ean_code_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cd',
+            index=models.Index(fields=['created_at', 'id'], name='musics_cd_created_at_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+import sqlite3
+
+from django.db import migrations
+
+TRIGRAM_INDEXES = [
+    ('musics_cd_artist_trgm', 'musics_cd', 'artist'),
+    ('musics_cd_name_trgm', 'musics_cd', 'name'),
+    ('musics_auth_user_username_trgm', 'auth_user', 'username'),
+]
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        # icontains is compiled to UPPER(column::text) LIKE UPPER(%s), index that expression
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for name, table, column in TRIGRAM_INDEXES:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (UPPER({column}::text) gin_trgm_ops)')
+    elif connection.vendor == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34, 0):
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS musics_cd_search USING fts5(artist, name, publisher, tokenize='trigram')")
+        schema_editor.execute(
+            'INSERT INTO musics_cd_search(rowid, artist, name, publisher) '
+            'SELECT cd.id, cd.artist, cd.name, u.username FROM musics_cd cd JOIN auth_user u ON u.id = cd.published_by_id')
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        for name, table, column in TRIGRAM_INDEXES:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS musics_cd_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('musics', '0002_cd_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.1.13 on 2026-10-17 18:52
+
+from django.db import migrations, models
+from django.db.models import Count
+import musics.validators
+
+
+def resolve_duplicated_ean_codes(apps, schema_editor):
+    # the oldest CD keeps the code, the others get an internal one from the GS1 prefix 2 (restricted
+    # circulation, never assigned to a product) so that no CD is lost, their publishers can fix them later
+    CD = apps.get_model('musics', 'CD')
+    duplicated = CD.objects.values('ean_code').annotate(total=Count('id')).filter(total__gt=1)
+    for row in duplicated:
+        for cd in CD.objects.filter(ean_code=row['ean_code']).order_by('id')[1:]:
+            serial = cd.id
+            while True:
+                code = '2' + str(serial).zfill(11)
+                code += musics.validators.ean_calc_check_digit(code)
+                if not CD.objects.filter(ean_code=code).exists():
+                    break
+                serial += 10 ** 10  # only taken if a publisher used the same internal code
+            CD.objects.filter(pk=cd.pk).update(ean_code=code)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musics', '0003_cd_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(resolve_duplicated_ean_codes, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='cd',
+            name='musics_cd_ean_code_idx',
+        ),
+        migrations.AlterField(
+            model_name='cd',
+            name='ean_code',
+            field=models.CharField(max_length=13, unique=True, validators=[musics.validators.validate_ean]),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-17 18:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musics', '0004_cd_unique_ean_code'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cd',
+            index=models.Index(fields=['updated_at', 'id'], name='musics_cd_updated_at_idx'),
+        ),
+    ]
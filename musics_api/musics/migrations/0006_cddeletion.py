@@ -0,0 +1,21 @@
+# Generated by Django 4.1.13 on 2026-10-17 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musics', '0005_cd_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CDDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cd_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
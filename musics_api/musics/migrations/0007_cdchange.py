@@ -0,0 +1,29 @@
+# Generated by Django 4.1.13 on 2026-10-17 21:10
+
+from django.db import migrations, models
+
+
+def log_existing_cds(apps, schema_editor):
+    # one row per CD, in the order the feed delivered them so far
+    CD = apps.get_model('musics', 'CD')
+    CDChange = apps.get_model('musics', 'CDChange')
+    ids = CD.objects.order_by('updated_at', 'id').values_list('id', flat=True)
+    CDChange.objects.bulk_create((CDChange(cd_id=cd_id) for cd_id in ids.iterator()), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musics', '0006_cddeletion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CDChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cd_id', models.BigIntegerField(unique=True)),
+            ],
+        ),
+        migrations.RunPython(log_existing_cds, migrations.RunPython.noop),
+    ]
@@ -1,13 +1,26 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, connections
+from django.db.models.expressions import RawSQL
 from djmoney.models.fields import MoneyField
 from djmoney.models.validators import MaxMoneyValidator, MinMoneyValidator
 
+from musics import search
 from musics.validators import validate_name, validate_artist, validate_record_company, validate_genre, \
     validate_ean
 
 
+class CDQuerySet(models.QuerySet):
+    def with_publisher(self):
+        return self.select_related('published_by')
+
+    def search(self, column, term):
+        if search.can_match(connections[self.db], term):
+            sql, params = search.match_sql(column, term)
+            return self.filter(pk__in=RawSQL(sql, params))
+        return self.filter(**{search.SEARCH_LOOKUPS[column]: term})
+
+
 # CD:#
 # - Nome ->
 # - Band/Artista
@@ -21,7 +34,7 @@ class CD(models.Model):
     artist = models.CharField(max_length=50, validators=[validate_artist])
     record_company = models.CharField(max_length=50, validators=[validate_record_company])
     genre = models.CharField(max_length=25, validators=[validate_genre])
-    ean_code = models.CharField(max_length=13, validators=[validate_ean])
+    ean_code = models.CharField(max_length=13, unique=True, validators=[validate_ean])
     published_by = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
     price = MoneyField(default=1, default_currency='EUR', max_digits=8, decimal_places=2, validators=[
         MinMoneyValidator(1),
@@ -30,5 +43,36 @@ class CD(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CDQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['artist'], name='musics_cd_artist_idx'),
+            models.Index(fields=['name'], name='musics_cd_name_idx'),
+            models.Index(fields=['genre'], name='musics_cd_genre_idx'),
+            models.Index(fields=['created_at', 'id'], name='musics_cd_created_at_idx'),
+            models.Index(fields=['updated_at', 'id'], name='musics_cd_updated_at_idx'),
+        ]
+
     def __str__(self):
         return self.artist + " " + self.name
+
+
+class CDChange(models.Model):
+    """
+    Latest write of a CD, read by the changes feed. The autoincrement id follows the commit order (SQLite
+    serializes the writers), the row of a CD is replaced on every write so that the log holds one row per CD.
+    """
+    cd_id = models.BigIntegerField(unique=True)
+
+    def __str__(self):
+        return str(self.id) + " " + str(self.cd_id)
+
+
+class CDDeletion(models.Model):
+    """Tombstone of a deleted CD, read by the changes feed."""
+    cd_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return str(self.cd_id) + " " + str(self.deleted_at)
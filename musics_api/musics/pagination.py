@@ -0,0 +1,83 @@
+from rest_framework.pagination import CursorPagination
+
+
+def _reversed(ordering):
+    return tuple(field[1:] if field.startswith('-') else '-' + field for field in ordering)
+
+
+class CDCursorPagination(CursorPagination):
+    ordering = ('created_at', 'id')
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    # async copy of CursorPagination.paginate_queryset, split around the query so that the page is fetched
+    # with the async ORM, the sync views keep the stock method
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        window = self._window(queryset, request, view)
+        if window is None:
+            return None
+        return self._paginate([cd async for cd in window])
+
+    def _window(self, queryset, request, view):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (self._offset, self._reverse, self._current_position) = (0, False, None)
+        else:
+            (self._offset, self._reverse, self._current_position) = self.cursor
+
+        if self._reverse:
+            queryset = queryset.order_by(*_reversed(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self._current_position is not None:
+            order = self.ordering[0]
+            is_reversed = order.startswith('-')
+            order_attr = order.lstrip('-')
+            if self.cursor.reverse != is_reversed:
+                queryset = queryset.filter(**{order_attr + '__lt': self._current_position})
+            else:
+                queryset = queryset.filter(**{order_attr + '__gt': self._current_position})
+
+        # one extra row tells whether a page follows
+        return queryset[self._offset:self._offset + self.page_size + 1]
+
+    def _paginate(self, results):
+        offset, reverse, current_position = self._offset, self._reverse, self._current_position
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
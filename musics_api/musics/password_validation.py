@@ -0,0 +1,46 @@
+import re
+
+from django.core.exceptions import ValidationError
+
+# the same rules are enforced by the TUI Password value object, both read the MUSICS_PASSWORD_* variables
+CHARACTER_CLASSES = {
+    'require_lowercase': (re.compile(r'[a-z]'), 'a lowercase letter'),
+    'require_uppercase': (re.compile(r'[A-Z]'), 'an uppercase letter'),
+    'require_digit': (re.compile(r'[0-9]'), 'a digit'),
+    'require_symbol': (re.compile(r'[^A-Za-z0-9\s]'), 'a symbol'),
+}
+
+
+class PasswordPolicyValidator:
+    """Django password validator, built once by get_default_password_validators from settings.MUSICS_PASSWORD_POLICY"""
+
+    def __init__(self, min_length=8, max_length=128, allow_spaces=False, require_lowercase=True,
+                 require_uppercase=False, require_digit=False, require_symbol=False):
+        self.min_length = min_length
+        self.max_length = max_length
+        self.allow_spaces = allow_spaces
+        flags = dict(require_lowercase=require_lowercase, require_uppercase=require_uppercase,
+                     require_digit=require_digit, require_symbol=require_symbol)
+        self.required = [CHARACTER_CLASSES[rule] for rule, enabled in flags.items() if enabled]
+
+    def validate(self, password, user=None):
+        errors = []
+        if not self.min_length <= len(password) <= self.max_length:
+            errors.append(ValidationError(
+                'Password must be between %(min)d and %(max)d characters long.',
+                code='password_length', params={'min': self.min_length, 'max': self.max_length}))
+        if not self.allow_spaces and any(c.isspace() for c in password):
+            errors.append(ValidationError('Password must not contain spaces.', code='password_spaces'))
+        for regex, description in self.required:
+            if not regex.search(password):
+                errors.append(ValidationError('Password must contain %(description)s.',
+                                              code='password_character_class', params={'description': description}))
+        if errors:
+            raise ValidationError(errors)
+
+    def get_help_text(self):
+        required = ', '.join(description for _, description in self.required)
+        text = f'Your password must be between {self.min_length} and {self.max_length} characters long'
+        if not self.allow_spaces:
+            text += ', without spaces'
+        return text + (f' and contain {required}.' if required else '.')
@@ -1,6 +1,32 @@
+from django.conf import settings
 from rest_framework import permissions
 
+from musics import cache
+
 publishers_allowed_methods = ['PUT', 'PATCH', 'DELETE', 'POST']
+PUBLISHERS_GROUP = 'publishers'
+
+
+def is_publisher(request) -> bool:
+    # composed permissions re-run has_permission for every object, the group lookup is done once per request
+    if not hasattr(request, '_is_publisher'):
+        request._is_publisher = _in_publishers_group(request.user)
+    return request._is_publisher
+
+
+def _in_publishers_group(user) -> bool:
+    # kept in the musics cache across requests when every worker sees the same cache, the signals drop it
+    # once a change to the groups of the user is committed
+    if not user.is_authenticated:
+        return False
+    if not cache.shared_across_workers():
+        return user.groups.filter(name=PUBLISHERS_GROUP).exists()
+    key = cache.publisher_key(user.pk)
+    member = cache.get_cache().get(key)
+    if member is None:
+        member = user.groups.filter(name=PUBLISHERS_GROUP).exists()
+        cache.get_cache().set(key, member, timeout=settings.MUSICS_PUBLISHER_CACHE_TIMEOUT)
+    return member
 
 
 class IsPublisherOrReadOnly(permissions.BasePermission):
@@ -8,10 +34,10 @@ class IsPublisherOrReadOnly(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
         if request.method in publishers_allowed_methods:
-            return request.user.groups.filter(name='publishers').exists()
+            return is_publisher(request)
         return False
 
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return obj.published_by == request.user
+        return obj.published_by_id == request.user.pk
@@ -0,0 +1,55 @@
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class Echo:
+    """
+    File-like object whose write returns the value, lets csv.writer produce lines one by one.
+    """
+
+    def write(self, value):
+        return value
+
+
+def as_rows(data):
+    return data if isinstance(data, list) else [data]
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    @staticmethod
+    def line(row) -> str:
+        return json.dumps(row, cls=JSONEncoder) + '\n'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return ''.join(self.line(row) for row in as_rows(data)).encode(self.charset)
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def __init__(self):
+        self.writer = csv.writer(Echo())
+
+    def header(self, fields) -> str:
+        return self.writer.writerow(fields)
+
+    def line(self, row, fields) -> str:
+        return self.writer.writerow([row.get(field, '') for field in fields])
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = as_rows(data)
+        fields = list(rows[0].keys()) if rows else []
+        return (self.header(fields) + ''.join(self.line(row, fields) for row in rows)).encode(self.charset)
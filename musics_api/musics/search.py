@@ -0,0 +1,75 @@
+import sqlite3
+
+from django.db import connections, router
+
+SEARCH_TABLE = 'musics_cd_search'
+MIN_TERM_LENGTH = 3  # the trigram tokenizer cannot match shorter terms
+
+# column of the search table -> equivalent ORM lookup
+SEARCH_LOOKUPS = {
+    'artist': 'artist__icontains',
+    'name': 'name__icontains',
+    'publisher': 'published_by__username__icontains',
+}
+
+
+def fts_enabled(connection) -> bool:
+    # FTS5 trigram tokenizer is available since SQLite 3.34; other backends rely on
+    # the pg_trgm indexes created by the migrations
+    return connection.vendor == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34, 0)
+
+
+def _connection(model):
+    return connections[router.db_for_write(model)]
+
+
+def match_sql(column: str, term: str):
+    phrase = '"' + term.replace('"', '""') + '"'
+    return f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s', [f'{column} : {phrase}']
+
+
+def can_match(connection, term) -> bool:
+    return fts_enabled(connection) and term is not None and len(term) >= MIN_TERM_LENGTH
+
+
+def index_cds(cds) -> None:
+    from musics.models import CD
+    connection = _connection(CD)
+    if not fts_enabled(connection):
+        return
+    rows = [(cd.pk, cd.artist, cd.name, cd.published_by.username) for cd in cds]
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(f'INSERT INTO {SEARCH_TABLE}(rowid, artist, name, publisher) VALUES (%s, %s, %s, %s)',
+                           rows)
+
+
+def unindex_cds(ids) -> None:
+    from musics.models import CD
+    connection = _connection(CD)
+    if not fts_enabled(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [(pk,) for pk in ids])
+
+
+def rename_publisher(user) -> None:
+    from musics.models import CD
+    connection = _connection(CD)
+    if not fts_enabled(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'UPDATE {SEARCH_TABLE} SET publisher = %s WHERE rowid IN '
+                       f'(SELECT id FROM musics_cd WHERE published_by_id = %s)', [user.username, user.pk])
+
+
+def rebuild() -> None:
+    from musics.models import CD
+    connection = _connection(CD)
+    if not fts_enabled(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(f'INSERT INTO {SEARCH_TABLE}(rowid, artist, name, publisher) '
+                       f'SELECT cd.id, cd.artist, cd.name, u.username '
+                       f'FROM musics_cd cd JOIN auth_user u ON u.id = cd.published_by_id')
@@ -5,6 +5,7 @@ from djmoney.contrib.django_rest_framework import MoneyField
 from rest_framework import serializers
 
 from musics.models import CD
+from musics.validators import validate_ean
 
 
 class CDSerializer(serializers.ModelSerializer):
@@ -25,6 +26,29 @@ class CDSerializer(serializers.ModelSerializer):
         model = CD
 
 
+class CDBulkSerializer(CDSerializer):
+    class Meta(CDSerializer.Meta):
+        # the bulk endpoint checks ean_code uniqueness and sets published_by with one query for the whole payload
+        extra_kwargs = {
+            'ean_code': {'validators': [validate_ean]},
+            'published_by': {'read_only': True},
+        }
+
+
+EAN_BATCH_MAX_SIZE = 1000
+
+
+class EANBatchSerializer(serializers.Serializer):
+    ean_codes = serializers.ListField(child=serializers.CharField(max_length=32), allow_empty=False,
+                                      max_length=EAN_BATCH_MAX_SIZE)
+
+    def update(self, instance, validated_data):
+        pass
+
+    def create(self, validated_data):
+        pass
+
+
 REGISTRATION_ALLOWED_GROUPS = ['publishers']
 
 
@@ -0,0 +1,129 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver, Signal
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from musics import search, cache, sqlite
+from musics.changes import log_changes, unlog_changes
+from musics.models import CD, CDDeletion
+
+# bulk_create/bulk_update do not send post_save, the bulk endpoint sends this one with the written instances
+cds_bulk_saved = Signal()
+# and this one with the ids of the CDs it deleted in one query, without post_delete
+cds_bulk_deleted = Signal()
+
+
+@receiver(post_save, sender=CD)
+def index_cd(sender, instance, **kwargs):
+    search.index_cds([instance])
+
+
+@receiver(cds_bulk_saved, sender=CD)
+def index_cds(sender, instances, **kwargs):
+    search.index_cds(instances)
+
+
+@receiver(post_delete, sender=CD)
+def unindex_cd(sender, instance, **kwargs):
+    search.unindex_cds([instance.pk])
+
+
+@receiver(post_save, sender=CD)
+def log_change(sender, instance, **kwargs):
+    log_changes([instance.pk])
+
+
+@receiver(cds_bulk_saved, sender=CD)
+def log_bulk_changes(sender, instances, **kwargs):
+    log_changes(cd.pk for cd in instances)
+
+
+@receiver(post_delete, sender=CD)
+def log_deletion(sender, instance, **kwargs):
+    unlog_changes([instance.pk])
+    CDDeletion.objects.create(cd_id=instance.pk)
+
+
+@receiver(cds_bulk_deleted, sender=CD)
+def unindex_and_log_bulk_deletions(sender, ids, **kwargs):
+    search.unindex_cds(ids)
+    unlog_changes(ids)
+    CDDeletion.objects.bulk_create(CDDeletion(cd_id=pk) for pk in ids)
+
+
+@receiver(post_save, sender=get_user_model())
+def rename_publisher(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    search.rename_publisher(instance)
+
+
+@receiver(pre_save, sender=get_user_model())
+def remember_username(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or (update_fields is not None and 'username' not in update_fields):
+        return
+    instance._previous_username = sender.objects.filter(pk=instance.pk).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=get_user_model())
+def touch_renamed_publisher_cds(sender, instance, **kwargs):
+    # the CDs embed the username: moving their updated_at changes the ETags keying the cached responses
+    # and sends them again through the changes feed
+    if getattr(instance, '_previous_username', instance.username) != instance.username:
+        cds = CD.objects.filter(published_by=instance)
+        cds.update(updated_at=timezone.now())
+        log_changes(cds.values_list('id', flat=True))
+    instance._previous_username = instance.username
+
+
+def _invalidate_membership_on_commit(user_pks):
+    # a request running before the commit still reads the old groups, and may cache them, until then
+    user_pks = list(user_pks)
+    transaction.on_commit(lambda: cache.invalidate_publishers(user_pks))
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def invalidate_cached_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            _invalidate_membership_on_commit([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        _invalidate_membership_on_commit(pk_set)
+    elif action == 'pre_clear':  # post_clear of group.user_set.clear() does not tell which users were in the group
+        _invalidate_membership_on_commit(instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidate_cached_groups(sender, instance, created=False, **kwargs):
+    # renaming or deleting a group changes who is a publisher, deleting it does not send m2m_changed
+    if not created:
+        _invalidate_membership_on_commit(instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token(sender, instance, **kwargs):
+    # dj_rest_auth logout deletes the token
+    key = instance.key
+    transaction.on_commit(lambda: cache.invalidate_tokens([key]))
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_cached_tokens_of_user(sender, instance, created, update_fields=None, **kwargs):
+    # the cached tokens carry their user, e.g. a deactivated user must not stay authenticated
+    if created or update_fields == {'last_login'}:
+        return
+    keys = list(Token.objects.filter(user=instance).values_list('key', flat=True))
+    transaction.on_commit(lambda: cache.invalidate_tokens(keys))
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite' and settings.MUSICS_SQLITE_PRAGMAS:
+        with connection.cursor() as cursor:
+            sqlite.apply_pragmas(cursor, settings.MUSICS_SQLITE_PRAGMAS)
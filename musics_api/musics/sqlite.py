@@ -0,0 +1,8 @@
+def pragma_statements(pragmas) -> list:
+    return [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+
+
+def apply_pragmas(cursor, pragmas) -> None:
+    """runs the pragmas of the SQLite profile on a DB-API cursor of a new connection"""
+    for statement in pragma_statements(pragmas):
+        cursor.execute(statement)
@@ -1,13 +1,18 @@
 from django.urls import path
 from rest_framework.routers import SimpleRouter
 
-from musics.views import CDViewSet, CDByArtist, CDByName, CDByPublishedBy
+from musics.views import CDViewSet, CDByArtist, CDByName, CDByPublishedBy, CDByEAN, CDByEANBatch, \
+    CacheStats, CDChanges
 
 router = SimpleRouter()
 router.register('', CDViewSet, basename="musics")
 urlpatterns = [
     path('byartist', CDByArtist.as_view(),name="byartist"),
     path('byname', CDByName.as_view(),name="byname"),
-    path('by_published_by', CDByPublishedBy.as_view(),name="bypublishedby")
+    path('by_published_by', CDByPublishedBy.as_view(),name="bypublishedby"),
+    path('byean', CDByEANBatch.as_view(), name="byean-batch"),
+    path('byean/<str:ean>', CDByEAN.as_view(), name="byean"),
+    path('changes', CDChanges.as_view(), name="changes"),
+    path('cache/stats', CacheStats.as_view(), name="cache-stats"),
 ]
 urlpatterns += router.urls
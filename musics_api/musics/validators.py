@@ -2,18 +2,24 @@ from django.core.exceptions import ValidationError
 from stdnum.util import clean, isdigits
 import re
 
+# compiled once at import instead of looking the pattern up in the re cache on every call
+NAME_PATTERN = re.compile("[A-Za-z0-9- ,'!@]*$")
+ARTIST_PATTERN = re.compile('[A-Za-z0-9- ,!@]*$')
+RECORD_COMPANY_PATTERN = re.compile('[A-Za-z0-9- ,!@#]*$')
+GENRE_PATTERN = re.compile('[a-zA-Z ]*$')
+
 
 def validate_name(value: str) -> None:
     if len(value) == 0:
         raise ValidationError('Name must not be empty')
-    if not re.match("[A-Za-z0-9- ,'!@]*$", value):
+    if not NAME_PATTERN.match(value):
         raise ValidationError(
             "Name format can contain only letters,numbers and special characters as '-', ',' and whitespaces")
 
 def validate_artist(value: str) -> None:
     if len(value) == 0:
         raise ValidationError('Artist name must not be empty')
-    if not re.match('[A-Za-z0-9- ,!@]*$', value):
+    if not ARTIST_PATTERN.match(value):
         raise ValidationError(
             "Artist name format can contain only letters,numbers and special characters as '-', ',' and whitespaces")
 
@@ -21,7 +27,7 @@ def validate_artist(value: str) -> None:
 def validate_record_company(value: str) -> None:
     if len(value) == 0:
         raise ValidationError('Record company name must not be empty')
-    if not re.match('[A-Za-z0-9- ,!@#]*$', value):
+    if not RECORD_COMPANY_PATTERN.match(value):
         raise ValidationError(
             "Record company name format can contain only letters,numbers and special characters as '-', ',' and whitespaces")
 
@@ -31,7 +37,7 @@ def validate_genre(value: str) -> None:
         raise ValidationError('Genre name must not be empty')
     if not value[0].isupper():
         raise ValidationError('Genre must be capitalized')
-    if not re.match('[a-zA-Z ]*$', value):
+    if not GENRE_PATTERN.match(value):
         raise ValidationError("Genre name format can contain only letters and whitespaces")
 
 
@@ -49,6 +55,23 @@ def validate_ean(number: str):
         raise ValidationError("Checksum fails.")
 
 
+def normalize_ean(number: str) -> str:
+    number = clean(number, ' -').strip()
+    validate_ean(number)
+    return number
+
+
+def ean_variants(number: str) -> list:
+    # UPC-A, EAN-13 and GTIN-14 encode the same item when they only differ by leading zeros
+    variants = [number]
+    if len(number) >= 12:
+        for length in (12, 13):
+            candidate = number.lstrip('0').zfill(length)
+            if len(candidate) == length and candidate not in variants:
+                variants.append(candidate)
+    return variants
+
+
 def ean_is_valid(number: str):
     try:
         validate_ean(number)
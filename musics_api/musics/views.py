@@ -1,56 +1,177 @@
+import itertools
+
 from dj_rest_auth.registration.views import RegisterView
-from django.contrib.auth.models import User
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import StreamingHttpResponse, Http404
 from rest_framework import permissions
-from rest_framework import viewsets, generics
+from rest_framework import viewsets, generics, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
 
+from musics import bulk, cache
+from musics.changes import ChangesToken, InvalidToken, changes_since
+from musics.conditional import ConditionalGetMixin
 from musics.models import CD
+from musics.parsers import NDJSONParser
 from musics.permissions import IsPublisherOrReadOnly
-from musics.serializers import CDSerializer, RegistrationSerializer
+from musics.renderers import NDJSONRenderer, CSVRenderer
+from musics.serializers import CDSerializer, RegistrationSerializer, EANBatchSerializer
+from musics.validators import normalize_ean, ean_variants
+
 
+def search_term(query_params, name):
+    # a search without its term is a client error, not an unfiltered listing
+    term = query_params.get(name)
+    if term is None:
+        raise ValidationError({name: ['This field is required.']})
+    return term
 
-class CDViewSet(viewsets.ModelViewSet):
+
+class CDViewSet(ConditionalGetMixin, cache.CachedReadMixin, viewsets.ModelViewSet):
     permission_classes = [IsPublisherOrReadOnly | permissions.IsAdminUser]
-    queryset = CD.objects.all()
+    queryset = CD.objects.with_publisher()
     serializer_class = CDSerializer
 
+    @action(detail=False, methods=['post', 'put', 'delete'], parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        # POST creates, PUT updates (items carry their id) and DELETE removes (items are ids) many CDs at once
+        if not isinstance(request.data, list):
+            raise ValidationError({'non_field_errors': [bulk.NOT_A_LIST_ERROR]})
+        operation = {'POST': bulk.create, 'PUT': bulk.update, 'DELETE': bulk.delete}[request.method]
+        try:
+            results = operation(self, request.data)
+        except bulk.BulkRejected as rejected:
+            return Response({'results': rejected.results}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'results': results})
+
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        # rows are serialized while the response is sent, memory does not grow with the catalogue
+        cds = self.get_queryset().order_by('created_at', 'id').iterator(chunk_size=settings.MUSICS_EXPORT_CHUNK_SIZE)
+        serializer = self.get_serializer()
+        renderer = request.accepted_renderer
+        if isinstance(renderer, CSVRenderer):
+            fields = serializer.Meta.fields
+            lines = (renderer.line(serializer.to_representation(cd), fields) for cd in cds)
+            content = itertools.chain([renderer.header(fields)], lines)
+        else:
+            content = (renderer.line(serializer.to_representation(cd)) for cd in cds)
+        response = StreamingHttpResponse(content, content_type=f'{renderer.media_type}; charset={renderer.charset}')
+        response['Content-Disposition'] = f'attachment; filename="musics.{renderer.format}"'
+        return response
+
 
 # CDByArtist,CDByPublishedBy,CDByName
-class CDByArtist(generics.ListAPIView):
+class CDByArtist(ConditionalGetMixin, cache.CachedReadMixin, generics.ListAPIView):
     permission_classes = [IsPublisherOrReadOnly | permissions.IsAdminUser]
     model = CD
     serializer_class = CDSerializer
 
     def get_queryset(self):
-        artist = self.request.query_params.get('artist')
-        cd_by_artist = CD.objects.filter(artist__icontains=artist)
+        artist = search_term(self.request.query_params, 'artist')
+        cd_by_artist = CD.objects.with_publisher().search('artist', artist)
         return cd_by_artist
 
 
-class CDByName(generics.ListAPIView):
+class CDByName(ConditionalGetMixin, cache.CachedReadMixin, generics.ListAPIView):
     permission_classes = [IsPublisherOrReadOnly | permissions.IsAdminUser]
     model = CD
     serializer_class = CDSerializer
 
     def get_queryset(self):
-        name = self.request.query_params.get('name')
-        cd_by_name = CD.objects.filter(name__icontains=name)
+        name = search_term(self.request.query_params, 'name')
+        cd_by_name = CD.objects.with_publisher().search('name', name)
         return cd_by_name
 
 
-class CDByPublishedBy(generics.ListAPIView):
+class CDByPublishedBy(ConditionalGetMixin, cache.CachedReadMixin, generics.ListAPIView):
     permission_classes = [IsPublisherOrReadOnly | permissions.IsAdminUser]
     model = CD
     serializer_class = CDSerializer
 
     def get_queryset(self):
-        published_by_search = self.request.query_params.get('publishedby')
-        published_by_users = User.objects.filter(username__icontains=published_by_search)
-        cd_by_published = []
-        for u in published_by_users:
-            cd_by_published += CD.objects.filter(published_by=u.id)
+        published_by_search = search_term(self.request.query_params, 'publishedby')
+        cd_by_published = CD.objects.with_publisher().search('publisher', published_by_search)
         return cd_by_published
 
 
+class CDByEAN(generics.RetrieveAPIView):
+    permission_classes = [IsPublisherOrReadOnly | permissions.IsAdminUser]
+    model = CD
+    serializer_class = CDSerializer
+
+    def get_object(self):
+        try:
+            ean = normalize_ean(self.kwargs['ean'])
+        except DjangoValidationError as e:
+            raise ValidationError({'ean_code': e.messages})
+        # uniqueness is enforced on the stored string, two CDs may hold variants of the same code
+        cd = CD.objects.with_publisher().filter(ean_code__in=ean_variants(ean)).order_by('id').first()
+        if cd is None:
+            raise Http404
+        self.check_object_permissions(self.request, cd)
+        return cd
+
+
+class CDByEANBatch(generics.GenericAPIView):
+    permission_classes = [permissions.AllowAny]  # POST is only used to carry the codes, nothing is written
+    serializer_class = EANBatchSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        requested = {}
+        invalid = []
+        for code in serializer.validated_data['ean_codes']:
+            try:
+                requested[code] = ean_variants(normalize_ean(code))
+            except DjangoValidationError:
+                invalid.append(code)
+
+        lookup = [variant for variants in requested.values() for variant in variants]
+        cds = {cd.ean_code: cd for cd in CD.objects.with_publisher().filter(ean_code__in=lookup)}
+
+        results = {}
+        not_found = []
+        for code, variants in requested.items():
+            found = next((cds[variant] for variant in variants if variant in cds), None)
+            if found is None:
+                not_found.append(code)
+            else:
+                results[code] = CDSerializer(found).data
+        return Response({'results': results, 'not_found': not_found, 'invalid': invalid})
+
+
+class CDChanges(generics.GenericAPIView):
+    permission_classes = [IsPublisherOrReadOnly | permissions.IsAdminUser]
+    serializer_class = CDSerializer
+
+    def get(self, request, *args, **kwargs):
+        since = request.query_params.get('since')
+        try:
+            token = ChangesToken.decode(since) if since else None
+        except InvalidToken:
+            raise ValidationError({'since': ['Invalid token.']})
+        changes = changes_since(token, settings.MUSICS_CHANGES_PAGE_SIZE)
+        return Response({
+            'changed': self.get_serializer(changes.changed, many=True).data,
+            'deleted': changes.deleted,
+            'token': changes.token.encode(),
+            'has_more': changes.has_more,
+        })
+
+
+class CacheStats(generics.GenericAPIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(cache.stats())
+
+
 class RegistrationView(RegisterView):
     serializer_class = RegistrationSerializer
 
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -58,13 +59,22 @@ REST_AUTH_SERIALIZERS = {
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES':[
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'musics.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES':[
         'rest_framework.permissions.IsAdminUser'  # la policy di default è che devi essere Admin
     ],
     'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.coreapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'musics.pagination.CDCursorPagination',
+    'PAGE_SIZE': 100,
 }
+# CDs written per transaction by the bulk endpoint
+MUSICS_BULK_CHUNK_SIZE = 500
+# rows fetched per round trip while streaming the export
+MUSICS_EXPORT_CHUNK_SIZE = 2000
+# maximum changes and tombstones returned by one call of the changes feed
+MUSICS_CHANGES_PAGE_SIZE = 1000
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -114,17 +124,100 @@ ACCOUNT_EMAIL_VERIFICATION = "none"
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+# MUSICS_SQLITE_PROFILE selects how the SQLite connections are tuned. 'development' keeps the SQLite defaults,
+# 'production' switches to WAL (readers don't wait for the writer), fsyncs only at checkpoints, maps the file in
+# memory, enlarges the page cache, waits for locks instead of failing and keeps connections open across requests.
+
+MUSICS_SQLITE_PROFILES = {
+    'development': {
+        'CONN_MAX_AGE': 0,
+        'PRAGMAS': {},
+    },
+    'production': {
+        'CONN_MAX_AGE': 600,
+        'PRAGMAS': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -64 * 1024,  # in KiB when negative
+            'busy_timeout': 5000,  # in milliseconds
+            'temp_store': 'MEMORY',
+        },
+    },
+}
+MUSICS_SQLITE_PROFILE = MUSICS_SQLITE_PROFILES[os.environ.get('MUSICS_SQLITE_PROFILE', 'development')]
+# applied by musics.signals on every new SQLite connection
+MUSICS_SQLITE_PRAGMAS = MUSICS_SQLITE_PROFILE['PRAGMAS']
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': MUSICS_SQLITE_PROFILE['CONN_MAX_AGE'],
+        'CONN_HEALTH_CHECKS': MUSICS_SQLITE_PROFILE['CONN_MAX_AGE'] > 0,
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# The CD read endpoints cache their responses in the 'musics' cache, MUSICS_CACHE_BACKEND selects its backend.
+
+MUSICS_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'musics',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    # shared by every worker and host, evicts by the maxmemory policy of the server
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('MUSICS_REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'musics': MUSICS_CACHE_BACKENDS[os.environ.get('MUSICS_CACHE_BACKEND', 'locmem')],
+}
+
+MUSICS_CACHE_ALIAS = 'musics'
+MUSICS_CACHE_TIMEOUT = 300
+# worker processes serving the api (gunicorn reads WEB_CONCURRENCY too), each of them has its own locmem cache:
+# state that other requests must see invalidated, like the group membership, is then cached for one request only
+MUSICS_WORKERS = int(os.environ.get('WEB_CONCURRENCY', 1))
+# seconds the publishers group membership of a user is cached, changes to the groups invalidate it sooner
+MUSICS_PUBLISHER_CACHE_TIMEOUT = 300
+# seconds an authentication token and its user are cached, logout and changes to the user invalidate it sooner.
+# Tokens are not cached when MUSICS_WORKERS processes each hold a locmem cache.
+MUSICS_TOKEN_CACHE_TIMEOUT = 60
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
+def env_flag(name, default):
+    return os.environ.get(name, str(default)).lower() in ('1', 'true', 'yes')
+
+
+# shared with the TUI Password value object, which reads the same variables
+MUSICS_PASSWORD_POLICY = {
+    'min_length': int(os.environ.get('MUSICS_PASSWORD_MIN_LENGTH', 8)),
+    'max_length': int(os.environ.get('MUSICS_PASSWORD_MAX_LENGTH', 128)),
+    'allow_spaces': env_flag('MUSICS_PASSWORD_ALLOW_SPACES', False),
+    'require_lowercase': env_flag('MUSICS_PASSWORD_REQUIRE_LOWERCASE', True),
+    'require_uppercase': env_flag('MUSICS_PASSWORD_REQUIRE_UPPERCASE', False),
+    'require_digit': env_flag('MUSICS_PASSWORD_REQUIRE_DIGIT', False),
+    'require_symbol': env_flag('MUSICS_PASSWORD_REQUIRE_SYMBOL', False),
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -138,6 +231,10 @@ AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
     },
+    {
+        'NAME': 'musics.password_validation.PasswordPolicyValidator',
+        'OPTIONS': MUSICS_PASSWORD_POLICY,
+    },
 ]
 
 
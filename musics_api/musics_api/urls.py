@@ -29,6 +29,8 @@ urlpatterns = [
     path('docs/', include_docs_urls(title=API_TITLE, description=API_DESCRIPTION, permission_classes=[AllowAny])),
     path('schema/', get_schema_view(title=API_TITLE, permission_classes=[AllowAny])),
     path('api/v1/musics/', include('musics.urls')),
+    # async read endpoints, for ASGI deployments
+    path('api/v1/async/musics/', include('musics.async_urls')),
     path('api/v1/auth/', include('dj_rest_auth.urls')),
     # path('api/v1/auth/registration/',include('dj_rest_auth.registration.urls')),
     path('api/v1/auth/registration/', RegistrationView.as_view())
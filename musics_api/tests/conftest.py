@@ -0,0 +1,26 @@
+import os
+
+import pytest
+from django.core.cache import caches
+
+from musics import cache as musics_cache
+
+# wall-clock comparisons depend on the machine and its load, they run only when asked for
+RUN_BENCHMARKS = os.environ.get('MUSICS_BENCHMARKS', '').lower() in ('1', 'true', 'yes')
+
+
+def pytest_collection_modifyitems(config, items):
+    if RUN_BENCHMARKS:
+        return
+    skip = pytest.mark.skip(reason='benchmark, set MUSICS_BENCHMARKS=1 to run it')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+    musics_cache.reset_stats()
+    yield
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient
+from django.urls import reverse
+from mixer.backend.django import mixer
+from rest_framework.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED, HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND, \
+    HTTP_405_METHOD_NOT_ALLOWED
+from rest_framework.test import APIClient
+
+from musics.models import CD
+
+
+@pytest.fixture()
+def musics(db):
+    return [mixer.blend('musics.CD', artist='PinkFloyd'), mixer.blend('musics.CD', artist='Queen'),
+            mixer.blend('musics.CD', artist='Pink', name='Trustfall')]
+
+
+@async_to_sync
+async def arequest(method, path, data=None, **extra):
+    # the async ORM calls run back on the test thread, inside the test transaction
+    return await getattr(AsyncClient(), method)(path, data, **extra)
+
+
+def aget(path, data=None, **extra):
+    return arequest('get', path, data, **extra)
+
+
+def test_async_list_matches_sync_list(musics):
+    response = aget(reverse('async-musics-list'))
+    assert response.status_code == HTTP_200_OK
+    assert response.json() == json.loads(APIClient().get(reverse('musics-list')).content)
+
+
+def test_async_list_paginates_with_cursors(musics):
+    first = aget(reverse('async-musics-list'), {'page_size': 2}).json()
+    assert [cd['id'] for cd in first['results']] == [musics[0].id, musics[1].id]
+    assert first['previous'] is None
+    second = aget(first['next']).json()
+    assert [cd['id'] for cd in second['results']] == [musics[2].id]
+    assert second['next'] is None
+    assert [cd['id'] for cd in aget(second['previous']).json()['results']] == [musics[0].id, musics[1].id]
+
+
+def test_async_detail_matches_sync_detail(musics):
+    pk = musics[1].pk
+    response = aget(reverse('async-musics-detail', kwargs={'pk': pk}))
+    assert response.status_code == HTTP_200_OK
+    assert response.json() == json.loads(APIClient().get(reverse('musics-detail', kwargs={'pk': pk})).content)
+
+
+def test_async_detail_of_unknown_cd_is_404(musics):
+    response = aget(reverse('async-musics-detail', kwargs={'pk': 404}))
+    assert response.status_code == HTTP_404_NOT_FOUND
+    assert response.json() == {'detail': 'Not found.'}
+
+
+@pytest.mark.parametrize('name, params', [
+    ('byartist', {'artist': 'Pink'}),
+    ('byname', {'name': 'Trust'}),
+    ('bypublishedby', {'publishedby': 'nobody'}),
+])
+def test_async_search_matches_sync_search(musics, name, params):
+    response = aget(reverse('async-' + name), params)
+    assert response.status_code == HTTP_200_OK
+    assert response.json() == json.loads(APIClient().get(reverse(name), params).content)
+
+
+@pytest.mark.parametrize('name, param', [('byartist', 'artist'), ('byname', 'name'), ('bypublishedby', 'publishedby')])
+def test_async_search_without_its_term_is_400_like_the_sync_search(musics, name, param):
+    response = aget(reverse('async-' + name))
+    assert response.status_code == HTTP_400_BAD_REQUEST
+    assert response.json() == {param: ['This field is required.']}
+    assert response.json() == json.loads(APIClient().get(reverse(name)).content)
+
+
+def test_async_list_with_matching_etag_get_304(musics):
+    etag = aget(reverse('async-musics-list'))['ETag']
+    # the AsyncClient of Django 4.1 takes the extra headers by name
+    response = aget(reverse('async-musics-list'), **{'if-none-match': etag})
+    assert response.status_code == HTTP_304_NOT_MODIFIED
+
+
+def test_async_detail_is_served_from_the_cache_and_invalidated(musics, django_assert_num_queries):
+    path = reverse('async-musics-detail', kwargs={'pk': musics[0].pk})
+    aget(path)
+    with django_assert_num_queries(1):  # the validators only
+        assert aget(path).json()['artist'] == 'PinkFloyd'
+    musics[0].artist = 'Metallica'
+    musics[0].save()
+    assert aget(path).json()['artist'] == 'Metallica'
+
+
+def test_async_views_are_read_only(musics):
+    response = arequest('post', reverse('async-musics-list'), {})
+    assert response.status_code == HTTP_405_METHOD_NOT_ALLOWED
+
+
+@async_to_sync
+async def throughput(path, clients, requests):
+    # requests/second of `clients` concurrent clients sharing `requests` calls, all through the ASGI handler
+    remaining = iter(range(requests))
+    statuses = []
+
+    async def client():
+        http = AsyncClient()
+        for _ in remaining:
+            statuses.append((await http.get(path)).status_code)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    assert statuses == [HTTP_200_OK] * requests
+    return requests / elapsed
+
+
+def concurrent_catalogue(settings):
+    settings.CACHES = {**settings.CACHES, 'musics': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    user = mixer.blend(get_user_model())
+    CD.objects.bulk_create(CD(artist=f'Artist {i}', name=f'Name {i}', record_company='Sony', genre='Rock',
+                              ean_code=f'{i:013d}', published_by=user) for i in range(500))
+    return reverse('async-musics-list')
+
+
+def test_async_list_answers_every_concurrent_client(db, settings):
+    throughput(concurrent_catalogue(settings), 16, 64)
+
+
+@pytest.mark.benchmark
+def test_async_list_throughput_under_concurrent_clients(db, settings):
+    path = concurrent_catalogue(settings)
+
+    results = {clients: throughput(path, clients, 256) for clients in (1, 16, 128)}
+    # on SQLite the queries are serialized, more clients must not make the endpoint collapse
+    assert results[128] > results[1] / 2, \
+        f'requests/s by concurrent clients: { {k: round(v) for k, v in results.items()} }'
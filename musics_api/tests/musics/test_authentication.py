@@ -0,0 +1,115 @@
+import pickle
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from mixer.backend.django import mixer
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.status import HTTP_200_OK, HTTP_403_FORBIDDEN
+from rest_framework.test import APIClient, APIRequestFactory
+
+from musics.authentication import CachedTokenAuthentication
+from musics.cache import token_key
+
+# SessionAuthentication comes first and sends no WWW-Authenticate header, so DRF answers 403 instead of 401
+REJECTED = HTTP_403_FORBIDDEN
+
+
+@pytest.fixture()
+def token(db):
+    return Token.objects.create(user=mixer.blend(get_user_model()))
+
+
+def get_client(key):
+    res = APIClient()
+    res.credentials(HTTP_AUTHORIZATION=f'Token {key}')
+    return res
+
+
+def token_queries(queries):
+    return [query['sql'] for query in queries if 'authtoken_token' in query['sql']]
+
+
+def test_token_is_looked_up_once_for_repeated_requests(token):
+    client = get_client(token.key)
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(5):
+            assert client.get(reverse('musics-list')).status_code == HTTP_200_OK
+    assert len(token_queries(queries)) == 1
+
+
+def test_logout_invalidates_the_cached_token(token, django_capture_on_commit_callbacks):
+    client = get_client(token.key)
+    assert client.get(reverse('musics-list')).status_code == HTTP_200_OK
+    with django_capture_on_commit_callbacks(execute=True):
+        assert client.post(reverse('rest_logout')).status_code == HTTP_200_OK
+    assert client.get(reverse('musics-list')).status_code == REJECTED
+
+
+def test_token_deletion_invalidates_the_cached_token(token, django_capture_on_commit_callbacks):
+    client = get_client(token.key)
+    assert client.get(reverse('musics-list')).status_code == HTTP_200_OK
+    with django_capture_on_commit_callbacks(execute=True):
+        Token.objects.filter(key=token.key).delete()
+    assert client.get(reverse('musics-list')).status_code == REJECTED
+
+
+def test_deactivating_the_user_invalidates_the_cached_token(token, django_capture_on_commit_callbacks):
+    client = get_client(token.key)
+    assert client.get(reverse('musics-list')).status_code == HTTP_200_OK
+    token.user.is_active = False
+    with django_capture_on_commit_callbacks(execute=True):
+        token.user.save()
+    assert client.get(reverse('musics-list')).status_code == REJECTED
+
+
+def test_cached_user_leaves_the_password_hash_in_the_database(token):
+    request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Token {token.key}')
+    CachedTokenAuthentication().authenticate(request)
+    entry = caches['musics'].get(token_key(token.key))
+    assert 'password' not in entry['user']
+    assert token.user.password not in pickle.dumps(entry).decode('latin-1')
+
+    user, auth = CachedTokenAuthentication().authenticate(request)
+    assert (user.pk, user.username, auth.key) == (token.user.pk, token.user.username, token.key)
+    user.first_name = 'Renamed'
+    user.save()
+    assert get_user_model().objects.get(pk=user.pk).password == token.user.password
+
+
+def test_tokens_are_not_cached_in_unshared_locmem_caches(token, settings):
+    settings.MUSICS_WORKERS = 4
+    client = get_client(token.key)
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(3):
+            assert client.get(reverse('musics-list')).status_code == HTTP_200_OK
+    assert len(token_queries(queries)) == 3
+
+
+def test_unknown_token_is_not_cached(db):
+    client = get_client('f' * 40)
+    assert client.get(reverse('musics-list')).status_code == REJECTED
+    user = mixer.blend(get_user_model())
+    Token.objects.create(key='f' * 40, user=user)
+    assert client.get(reverse('musics-list')).status_code == HTTP_200_OK
+
+
+@pytest.mark.benchmark
+def test_cached_token_authentication_is_faster(token):
+    request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def timed(authentication, calls=500):
+        start = time.perf_counter()
+        for _ in range(calls):
+            user, _ = authentication.authenticate(request)
+        assert user.pk == token.user.pk
+        return (time.perf_counter() - start) / calls
+
+    before = timed(TokenAuthentication())
+    after = timed(CachedTokenAuthentication())
+    assert after < before, f'{before * 1e6:.0f}us uncached, {after * 1e6:.0f}us cached'
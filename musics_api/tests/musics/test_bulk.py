@@ -0,0 +1,158 @@
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.urls import reverse
+from mixer.backend.django import mixer
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST, HTTP_403_FORBIDDEN
+from rest_framework.test import APIClient
+
+from musics.models import CD, CDChange, CDDeletion
+from musics.validators import ean_calc_check_digit
+
+
+@pytest.fixture()
+def publisher(db):
+    user = mixer.blend(get_user_model())
+    user.groups.add(mixer.blend(Group, name="publishers"))
+    return user
+
+
+def get_client(user=None):
+    res = APIClient()
+    if user is not None:
+        res.force_authenticate(user)
+    return res
+
+
+def ean(i):
+    code = str(400638133000 + i)
+    return code + ean_calc_check_digit(code)
+
+
+def cd_data(i, **kwargs):
+    data = {'name': f'Album {i}', 'artist': 'PinkFloyd', 'record_company': 'Sony', 'genre': 'Rock',
+            'ean_code': ean(i), 'price': '10.00', 'price_currency': 'EUR'}
+    data.update(kwargs)
+    return data
+
+
+def test_bulk_anon_user_get_403():
+    response = get_client().post(reverse('musics-bulk'), [cd_data(1)], format='json')
+    assert response.status_code == HTTP_403_FORBIDDEN
+
+
+def test_bulk_create_writes_every_item(publisher, settings):
+    settings.MUSICS_BULK_CHUNK_SIZE = 2
+    response = get_client(publisher).post(reverse('musics-bulk'), [cd_data(i) for i in range(5)], format='json')
+    assert response.status_code == HTTP_200_OK
+    results = response.data['results']
+    assert [r['status'] for r in results] == [201] * 5
+    assert sorted(r['id'] for r in results) == sorted(CD.objects.values_list('id', flat=True))
+    assert set(CD.objects.values_list('published_by', flat=True)) == {publisher.id}
+    assert CD.objects.search('name', 'Album 3').count() == 1
+
+
+def test_bulk_create_accepts_ndjson(publisher):
+    body = '\n'.join(json.dumps(cd_data(i)) for i in range(3)) + '\n'
+    response = get_client(publisher).post(reverse('musics-bulk'), body, content_type='application/x-ndjson')
+    assert response.status_code == HTTP_200_OK
+    assert CD.objects.count() == 3
+
+
+def test_bulk_create_invalid_items_are_reported_and_nothing_is_written(publisher):
+    items = [cd_data(1), cd_data(2, genre='rock'), cd_data(3, ean_code=ean(1))]
+    response = get_client(publisher).post(reverse('musics-bulk'), items, format='json')
+    assert response.status_code == HTTP_400_BAD_REQUEST
+    results = response.data['results']
+    assert [(r['index'], r['status']) for r in results] == [(1, 400)]
+    assert 'genre' in results[0]['errors']
+    assert CD.objects.count() == 0
+
+
+def test_bulk_create_duplicated_ean_codes_are_conflicts(publisher):
+    mixer.blend('musics.CD', ean_code=ean(1))
+    items = [cd_data(1), cd_data(2), cd_data(3, ean_code=ean(2))]
+    response = get_client(publisher).post(reverse('musics-bulk'), items, format='json')
+    assert response.status_code == HTTP_400_BAD_REQUEST
+    assert [(r['index'], r['status']) for r in response.data['results']] == [(0, 409), (2, 409)]
+
+
+def test_bulk_create_conflict_in_a_later_chunk_writes_nothing(publisher, settings, monkeypatch):
+    # a concurrent writer taking the code between the check and the insert
+    settings.MUSICS_BULK_CHUNK_SIZE = 2
+    monkeypatch.setattr('musics.bulk.ean_conflicts', lambda items: {})
+    items = [cd_data(0), cd_data(1), cd_data(2), cd_data(3, ean_code=ean(0))]
+    response = get_client(publisher).post(reverse('musics-bulk'), items, format='json')
+    assert response.status_code == HTTP_400_BAD_REQUEST
+    assert [(r['index'], r['status']) for r in response.data['results']] == [(2, 409), (3, 409)]
+    assert CD.objects.count() == 0
+
+
+def test_bulk_create_expects_a_list(publisher):
+    response = get_client(publisher).post(reverse('musics-bulk'), cd_data(1), format='json')
+    assert response.status_code == HTTP_400_BAD_REQUEST
+
+
+def test_bulk_update_changes_own_cds(publisher):
+    cds = [mixer.blend('musics.CD', published_by=publisher) for _ in range(3)]
+    items = [dict(cd_data(i, name='Renamed'), id=cd.id) for i, cd in enumerate(cds)]
+    response = get_client(publisher).put(reverse('musics-bulk'), items, format='json')
+    assert response.status_code == HTTP_200_OK
+    assert [r['status'] for r in response.data['results']] == [200] * 3
+    for cd in cds:
+        updated = CD.objects.get(pk=cd.pk)
+        assert updated.name == 'Renamed'
+        assert updated.updated_at > cd.updated_at
+    assert CD.objects.search('name', 'Renamed').count() == 3
+
+
+def test_bulk_update_other_published_cds_get_403_per_item(publisher):
+    own = mixer.blend('musics.CD', published_by=publisher)
+    other = mixer.blend('musics.CD')
+    items = [dict(cd_data(1), id=own.id), dict(cd_data(2), id=other.id), dict(cd_data(3), id=0)]
+    response = get_client(publisher).put(reverse('musics-bulk'), items, format='json')
+    assert response.status_code == HTTP_400_BAD_REQUEST
+    assert [(r['index'], r['status']) for r in response.data['results']] == [(1, 403), (2, 404)]
+    assert CD.objects.get(pk=own.pk).name == own.name
+
+
+def test_bulk_delete_removes_own_cds(publisher):
+    cds = [mixer.blend('musics.CD', published_by=publisher) for _ in range(3)]
+    response = get_client(publisher).delete(reverse('musics-bulk'), [cd.id for cd in cds[:2]], format='json')
+    assert response.status_code == HTTP_200_OK
+    assert [r['status'] for r in response.data['results']] == [204, 204]
+    assert list(CD.objects.values_list('id', flat=True)) == [cds[2].id]
+
+
+def test_bulk_delete_logs_tombstones_and_unindexes_the_cds(publisher):
+    cds = [mixer.blend('musics.CD', published_by=publisher, artist='PinkFloyd') for _ in range(3)]
+    deleted = [cd.id for cd in cds[:2]]
+    assert get_client(publisher).delete(reverse('musics-bulk'), deleted, format='json').status_code == HTTP_200_OK
+    assert sorted(CDDeletion.objects.values_list('cd_id', flat=True)) == deleted
+    assert list(CDChange.objects.values_list('cd_id', flat=True)) == [cds[2].id]
+    assert [cd.id for cd in CD.objects.search('artist', 'pinkfloyd')] == [cds[2].id]
+
+
+@pytest.mark.parametrize('method, items', [
+    ('delete', [[1], {'id': [2]}, True, 'abc']),
+    ('put', [dict(cd_data(1), id=[1]), dict(cd_data(2), id=None)]),
+])
+def test_bulk_malformed_ids_get_400_per_item(publisher, method, items):
+    response = getattr(get_client(publisher), method)(reverse('musics-bulk'), items, format='json')
+    assert response.status_code == HTTP_400_BAD_REQUEST
+    assert {r['status'] for r in response.data['results']} == {400}
+    assert len(response.data['results']) == len(items)
+
+
+def test_bulk_checks_publisher_group_once_per_request(publisher, django_assert_max_num_queries):
+    cds = [mixer.blend('musics.CD', published_by=publisher) for _ in range(20)]
+    client = get_client(publisher)
+    # group lookup, the CDs fetch, then one delete, unindex, unlog and tombstones insert for the chunk;
+    # no query per permission check or per CD
+    with django_assert_max_num_queries(8) as ctx:
+        response = client.delete(reverse('musics-bulk'), [cd.id for cd in cds], format='json')
+    assert response.status_code == HTTP_200_OK
+    group_queries = [q for q in ctx.captured_queries if 'auth_group' in q['sql']]
+    assert len(group_queries) == 1
@@ -0,0 +1,106 @@
+from urllib.parse import urlencode
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from mixer.backend.django import mixer
+from rest_framework.status import HTTP_200_OK, HTTP_403_FORBIDDEN
+from rest_framework.test import APIClient
+
+from musics import cache
+
+
+@pytest.fixture()
+def musics(db):
+    return [mixer.blend('musics.CD', artist='PinkFloyd'), mixer.blend('musics.CD', artist='Queen')]
+
+
+@pytest.fixture(params=['locmem', 'file'])
+def cache_backend(request, settings, tmp_path):
+    backend = dict(settings.MUSICS_CACHE_BACKENDS[request.param])
+    if request.param == 'file':
+        backend['LOCATION'] = tmp_path
+    settings.CACHES = {**settings.CACHES, 'musics': backend}
+    return request.param
+
+
+def get(path, **params):
+    response = APIClient().get(f'{path}?{urlencode(params)}' if params else path)
+    assert response.status_code == HTTP_200_OK
+    return response.data
+
+
+def test_list_is_served_from_cache(cache_backend, musics, django_assert_num_queries):
+    first = get(reverse('musics-list'))
+    # only the change log position computing the conditional GET validators, the CDs are not read
+    with django_assert_num_queries(1) as queries:
+        second = get(reverse('musics-list'))
+    assert 'musics_cd"' not in queries.captured_queries[0]['sql']
+    assert first == second
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_cache_hits_write_nothing(settings, tmp_path, musics):
+    settings.CACHES = {**settings.CACHES, 'musics': {**settings.MUSICS_CACHE_BACKENDS['file'], 'LOCATION': tmp_path}}
+    get(reverse('musics-list'))
+    files = sorted(path.name for path in tmp_path.iterdir())
+    get(reverse('musics-list'))
+    assert sorted(path.name for path in tmp_path.iterdir()) == files
+    assert len(files) == 1
+
+
+def test_query_params_are_cached_separately(musics):
+    assert len(get(reverse('byartist'), artist='Pink')['results']) == 1
+    assert len(get(reverse('byartist'), artist='Queen')['results']) == 1
+    assert len(get(reverse('musics-list'), page_size=1)['results']) == 1
+    assert cache.stats()['misses'] == 3
+
+
+def test_save_invalidates_lists(cache_backend, musics):
+    assert len(get(reverse('musics-list'))['results']) == 2
+    mixer.blend('musics.CD', artist='PinkFloyd')
+    assert len(get(reverse('musics-list'))['results']) == 3
+    assert len(get(reverse('byartist'), artist='Pink')['results']) == 2
+
+
+def test_delete_invalidates_detail_and_lists(musics):
+    pk = musics[0].pk
+    get(reverse('musics-detail', kwargs={'pk': pk}))
+    get(reverse('musics-list'))
+    musics[0].delete()
+    response = APIClient().get(reverse('musics-detail', kwargs={'pk': pk}))
+    assert response.status_code == 404
+    assert len(get(reverse('musics-list'))['results']) == 1
+
+
+def test_save_only_invalidates_the_changed_detail(musics, django_assert_num_queries):
+    get(reverse('musics-detail', kwargs={'pk': musics[0].pk}))
+    get(reverse('musics-detail', kwargs={'pk': musics[1].pk}))
+    musics[1].name = 'Innuendo'
+    musics[1].save()
+    with django_assert_num_queries(1):
+        get(reverse('musics-detail', kwargs={'pk': musics[0].pk}))
+    assert get(reverse('musics-detail', kwargs={'pk': musics[1].pk}))['name'] == 'Innuendo'
+
+
+def test_publisher_rename_invalidates_its_cds(musics):
+    user = musics[0].published_by
+    get(reverse('musics-detail', kwargs={'pk': musics[0].pk}))
+    user.username = 'renamed'
+    user.save()
+    assert get(reverse('musics-detail', kwargs={'pk': musics[0].pk}))['user'] == 'renamed'
+
+
+def test_cache_stats_are_admin_only(musics):
+    response = APIClient().get(reverse('cache-stats'))
+    assert response.status_code == HTTP_403_FORBIDDEN
+
+    get(reverse('musics-list'))
+    get(reverse('musics-list'))
+    client = APIClient()
+    client.force_authenticate(mixer.blend(get_user_model(), is_staff=True))
+    response = client.get(reverse('cache-stats'))
+    assert response.status_code == HTTP_200_OK
+    assert (response.data['hits'], response.data['misses']) == (1, 1)
+    assert response.data['hit_ratio'] == 0.5
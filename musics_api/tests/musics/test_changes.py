@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from mixer.backend.django import mixer
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+from rest_framework.test import APIClient
+
+from musics.models import CDChange, CDDeletion
+
+
+@pytest.fixture()
+def musics(db):
+    return [mixer.blend('musics.CD') for _ in range(3)]
+
+
+def changes(since=None):
+    response = APIClient().get(reverse('changes'), {'since': since} if since else {})
+    assert response.status_code == HTTP_200_OK
+    return response.data
+
+
+def test_changes_without_token_returns_the_whole_catalogue(musics):
+    feed = changes()
+    assert [cd['id'] for cd in feed['changed']] == [cd.id for cd in musics]
+    assert feed['deleted'] == []
+    assert feed['has_more'] is False
+
+
+def test_changes_since_token_returns_only_edits(musics):
+    token = changes()['token']
+    musics[1].name = 'Animals'
+    musics[1].save()
+    created = mixer.blend('musics.CD')
+    feed = changes(token)
+    assert [cd['id'] for cd in feed['changed']] == [musics[1].id, created.id]
+    assert feed['changed'][0]['name'] == 'Animals'
+    assert changes(feed['token'])['changed'] == []
+
+
+def test_changes_return_tombstones_of_deleted_cds(musics):
+    token = changes()['token']
+    pk = musics[0].pk
+    musics[0].delete()
+    feed = changes(token)
+    assert feed['changed'] == []
+    assert feed['deleted'] == [pk]
+    assert CDDeletion.objects.filter(cd_id=pk).exists()
+    assert changes(feed['token'])['deleted'] == []
+
+
+def test_changes_are_paged(musics, settings):
+    settings.MUSICS_CHANGES_PAGE_SIZE = 2
+    feed = changes()
+    assert len(feed['changed']) == 2
+    assert feed['has_more'] is True
+    feed = changes(feed['token'])
+    assert [cd['id'] for cd in feed['changed']] == [musics[2].id]
+    assert feed['has_more'] is False
+
+
+def test_changes_deliver_a_write_committed_after_a_later_stamped_one(musics, monkeypatch):
+    token = changes()['token']
+    now = timezone.now()
+    # auto_now stamps before the write lock: the first writer to commit carries the later timestamp
+    monkeypatch.setattr('django.utils.timezone.now', lambda: now + timedelta(seconds=1))
+    musics[0].name = 'Animals'
+    musics[0].save()
+    feed = changes(token)
+    assert [cd['id'] for cd in feed['changed']] == [musics[0].id]
+    monkeypatch.setattr('django.utils.timezone.now', lambda: now)
+    musics[1].name = 'Meddle'
+    musics[1].save()
+    feed = changes(feed['token'])
+    assert [cd['id'] for cd in feed['changed']] == [musics[1].id]
+    assert feed['changed'][0]['name'] == 'Meddle'
+
+
+def test_changes_send_each_cd_once_however_often_it_was_written(musics):
+    token = changes()['token']
+    for name in ('Animals', 'Meddle', 'Wish'):
+        musics[0].name = name
+        musics[0].save()
+    feed = changes(token)
+    assert [cd['name'] for cd in feed['changed']] == ['Wish']
+    assert CDChange.objects.count() == len(musics)
+
+
+def test_changes_of_an_updated_then_deleted_cd_are_a_tombstone(musics):
+    token = changes()['token']
+    musics[0].name = 'Animals'
+    musics[0].save()
+    pk = musics[0].pk
+    musics[0].delete()
+    feed = changes(token)
+    assert feed['changed'] == []
+    assert feed['deleted'] == [pk]
+
+
+def test_changes_with_invalid_token_get_400(db):
+    response = APIClient().get(reverse('changes'), {'since': 'not-a-token'})
+    assert response.status_code == HTTP_400_BAD_REQUEST
@@ -0,0 +1,85 @@
+import pytest
+from django.urls import reverse
+from mixer.backend.django import mixer
+from rest_framework.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED, HTTP_404_NOT_FOUND
+from rest_framework.test import APIClient
+
+
+@pytest.fixture()
+def musics(db):
+    return [mixer.blend('musics.CD', artist='PinkFloyd'), mixer.blend('musics.CD', artist='Queen')]
+
+
+def test_list_sends_validators(musics):
+    response = APIClient().get(reverse('musics-list'))
+    assert response.status_code == HTTP_200_OK
+    assert response['ETag'].startswith('"')
+    assert 'Last-Modified' not in response
+
+
+def test_list_with_matching_etag_get_304_with_a_single_query(musics, django_assert_num_queries):
+    client = APIClient()
+    etag = client.get(reverse('musics-list'))['ETag']
+    with django_assert_num_queries(1):
+        response = client.get(reverse('musics-list'), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTP_304_NOT_MODIFIED
+    assert response.content == b''
+
+
+def test_list_ignores_if_modified_since_after_a_delete(musics):
+    client = APIClient()
+    last_modified = client.get(reverse('musics-detail', kwargs={'pk': musics[1].pk}))['Last-Modified']
+    musics[0].delete()
+    response = client.get(reverse('musics-list'), HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == HTTP_200_OK
+    assert len(response.data['results']) == 1
+
+
+def test_publisher_rename_changes_list_and_detail_etags(musics):
+    client = APIClient()
+    list_etag = client.get(reverse('musics-list'))['ETag']
+    detail_etag = client.get(reverse('musics-detail', kwargs={'pk': musics[0].pk}))['ETag']
+    user = musics[0].published_by
+    user.username = 'renamed'
+    user.save()
+    response = client.get(reverse('musics-list'), HTTP_IF_NONE_MATCH=list_etag)
+    assert response.status_code == HTTP_200_OK
+    assert response.data['results'][0]['user'] == 'renamed'
+    response = client.get(reverse('musics-detail', kwargs={'pk': musics[0].pk}), HTTP_IF_NONE_MATCH=detail_etag)
+    assert response.status_code == HTTP_200_OK
+
+
+def test_detail_with_an_id_that_is_not_a_number_get_404(musics):
+    assert APIClient().get('/api/v1/musics/abc/').status_code == HTTP_404_NOT_FOUND
+
+
+def test_list_etag_changes_on_update_and_delete(musics):
+    client = APIClient()
+    etag = client.get(reverse('musics-list'))['ETag']
+    musics[0].name = 'Animals'
+    musics[0].save()
+    response = client.get(reverse('musics-list'), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTP_200_OK
+    etag = response['ETag']
+    musics[1].delete()
+    response = client.get(reverse('musics-list'), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTP_200_OK
+    assert len(response.data['results']) == 1
+
+
+def test_search_etag_depends_on_query_params(musics):
+    client = APIClient()
+    etag = client.get(reverse('byartist'), {'artist': 'Pink'})['ETag']
+    assert client.get(reverse('byartist'), {'artist': 'Queen'})['ETag'] != etag
+    assert client.get(reverse('byartist'), {'artist': 'Pink'}, HTTP_IF_NONE_MATCH=etag).status_code \
+        == HTTP_304_NOT_MODIFIED
+
+
+def test_detail_etag_follows_its_row_only(musics):
+    client = APIClient()
+    path = reverse('musics-detail', kwargs={'pk': musics[0].pk})
+    etag = client.get(path)['ETag']
+    musics[1].save()
+    assert client.get(path, HTTP_IF_NONE_MATCH=etag).status_code == HTTP_304_NOT_MODIFIED
+    musics[0].save()
+    assert client.get(path, HTTP_IF_NONE_MATCH=etag).status_code == HTTP_200_OK
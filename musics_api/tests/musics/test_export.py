@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from mixer.backend.django import mixer
+from rest_framework.status import HTTP_200_OK
+from rest_framework.test import APIClient
+
+from musics.models import CD
+
+
+def blend_catalogue(count, start=0):
+    user = get_user_model().objects.filter(username='ssdsbm').first() or mixer.blend(get_user_model(),
+                                                                                     username='ssdsbm')
+    CD.objects.bulk_create(CD(artist=f'Artist {i}', name=f'Name {i}', record_company='Sony', genre='Rock',
+                              ean_code=f'{i:013d}', published_by=user) for i in range(start, start + count))
+
+
+def export(**params):
+    response = APIClient().get(reverse('musics-export'), params)
+    assert response.status_code == HTTP_200_OK
+    assert response.streaming
+    return response
+
+
+def test_export_streams_ndjson_by_default(db):
+    blend_catalogue(5)
+    response = export()
+    assert response['Content-Type'].startswith('application/x-ndjson')
+    rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+    assert [row['artist'] for row in rows] == [f'Artist {i}' for i in range(5)]
+    assert rows[0]['user'] == 'ssdsbm'
+
+
+def test_export_streams_csv(db):
+    blend_catalogue(3)
+    response = export(format='csv')
+    assert response['Content-Type'].startswith('text/csv')
+    rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+    assert [row['name'] for row in rows] == ['Name 0', 'Name 1', 'Name 2']
+    assert rows[0]['price'] == '1.00'
+
+
+def test_export_of_empty_catalogue_is_empty(db):
+    assert b''.join(export().streaming_content) == b''
+
+
+def peak_memory_while_exporting():
+    response = export()
+    tracemalloc.start()
+    lines = sum(1 for _ in response.streaming_content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return lines, peak
+
+
+def test_export_memory_does_not_grow_with_catalogue(db, settings):
+    settings.MUSICS_EXPORT_CHUNK_SIZE = 50
+    blend_catalogue(500)
+    small_lines, small_peak = peak_memory_while_exporting()
+    blend_catalogue(2000, start=500)
+    large_lines, large_peak = peak_memory_while_exporting()
+    assert (small_lines, large_lines) == (500, 2500)
+    assert large_peak < small_peak * 2
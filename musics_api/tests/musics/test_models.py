@@ -4,7 +4,8 @@ import pytest
 from django.core.exceptions import ValidationError
 from mixer.backend.django import mixer
 
-from musics.validators import ean_is_valid, validate_genre, validate_record_company, validate_artist, validate_name
+from musics.validators import ean_is_valid, validate_genre, validate_record_company, validate_artist, validate_name, \
+    normalize_ean, ean_variants
 
 
 def test_cd_name_of_length_51_raises_exception(db):
@@ -138,6 +139,29 @@ def test_cd_wrong_ean_code_length(db):
         cd.full_clean()
 
 
+def test_cd_duplicated_ean_code_raises_exception(db):
+    mixer.blend('musics.CD', ean_code="978020137962")
+    cd = mixer.blend('musics.CD')
+    cd.ean_code = "978020137962"
+    with pytest.raises(ValidationError, match="already exists") as err:
+        cd.full_clean()
+
+
+def test_normalize_ean_strips_separators():
+    assert normalize_ean(" 4006-3813 3393-1 ") == "4006381333931"
+
+
+def test_normalize_ean_wrong_checksum_raises_exception():
+    with pytest.raises(ValidationError, match="Checksum fails."):
+        normalize_ean("4006381333932")
+
+
+def test_ean_variants_of_upc_include_ean13():
+    assert ean_variants("036000291452") == ["036000291452", "0036000291452"]
+    assert ean_variants("0036000291452") == ["0036000291452", "036000291452"]
+    assert ean_variants("4006381333931") == ["4006381333931"]
+
+
 def test_cd_price_0_raises_exceptions(db):
     cd = mixer.blend('musics.CD', price=0)
     with pytest.raises(Exception) as err:
@@ -0,0 +1,42 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.password_validation import get_default_password_validators
+from django.core.exceptions import ValidationError
+from rest_framework.status import HTTP_201_CREATED, HTTP_400_BAD_REQUEST
+from rest_framework.test import APIClient
+
+from musics.password_validation import PasswordPolicyValidator
+
+
+@pytest.mark.parametrize("password", ["Aaaaaaa", "A" * 128 + "a", "Aaaaaa a", "ABCDEFGH!1"])
+def test_default_policy_rejects_the_passwords_the_tui_rejects(password):
+    with pytest.raises(ValidationError):
+        PasswordPolicyValidator().validate(password)
+
+
+def test_default_policy_accepts_the_passwords_the_tui_accepts():
+    PasswordPolicyValidator().validate("Abcd!-@.")
+
+
+def test_policy_character_classes_are_configurable():
+    validator = PasswordPolicyValidator(min_length=4, require_uppercase=True, require_digit=True, require_symbol=True)
+    validator.validate("aB3!")
+    with pytest.raises(ValidationError) as exc:
+        validator.validate("abcd")
+    assert len(exc.value.error_list) == 3
+
+
+def test_policy_is_installed_once_from_settings(settings):
+    validators = [v for v in get_default_password_validators() if isinstance(v, PasswordPolicyValidator)]
+    assert len(validators) == 1
+    assert validators[0].min_length == settings.MUSICS_PASSWORD_POLICY['min_length']
+
+
+@pytest.mark.parametrize("password, status_code", [("kq7-zx!plm", HTTP_201_CREATED),
+                                                   ("KQ7-ZX!PLM", HTTP_400_BAD_REQUEST),
+                                                   ("kq7 zx!plm", HTTP_400_BAD_REQUEST)])
+def test_registration_enforces_the_password_policy(db, password, status_code):
+    response = APIClient().post('/api/v1/auth/registration/', {
+        'username': 'newpublisher', 'email': 'new@example.com', 'password1': password, 'password2': password})
+    assert response.status_code == status_code
+    assert get_user_model().objects.filter(username='newpublisher').exists() == (status_code == HTTP_201_CREATED)
@@ -0,0 +1,113 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from mixer.backend.django import mixer
+from rest_framework.status import HTTP_200_OK, HTTP_204_NO_CONTENT, HTTP_403_FORBIDDEN
+from rest_framework.test import APIClient
+
+from musics.models import CD
+
+
+@pytest.fixture()
+def publishers(db):
+    return mixer.blend(Group, name="publishers")
+
+
+@pytest.fixture()
+def publisher(publishers):
+    user = mixer.blend(get_user_model())
+    user.groups.add(publishers)
+    return user
+
+
+def get_client(user):
+    res = APIClient()
+    res.force_authenticate(user)
+    return res
+
+
+def group_queries(queries):
+    return [query['sql'] for query in queries if 'auth_user_groups' in query['sql']]
+
+
+def delete(user, cd):
+    return get_client(user).delete(reverse('musics-detail', kwargs={'pk': cd.pk}))
+
+
+def test_repeated_writes_do_one_group_query(publisher):
+    cds = [mixer.blend('musics.CD', published_by=publisher) for _ in range(5)]
+    with CaptureQueriesContext(connection) as queries:
+        for cd in cds:
+            assert delete(publisher, cd).status_code == HTTP_204_NO_CONTENT
+    assert len(group_queries(queries)) == 1
+
+
+def test_bulk_write_does_one_group_query(publisher):
+    cds = [mixer.blend('musics.CD', published_by=publisher) for _ in range(50)]
+    with CaptureQueriesContext(connection) as queries:
+        response = get_client(publisher).delete(reverse('musics-bulk'), [cd.id for cd in cds], format='json')
+    assert response.status_code == HTTP_200_OK
+    assert CD.objects.count() == 0
+    assert len(group_queries(queries)) == 1
+
+
+def test_removing_the_user_from_publishers_invalidates_the_cached_membership(publisher, publishers,
+                                                                            django_capture_on_commit_callbacks):
+    cds = [mixer.blend('musics.CD', published_by=publisher) for _ in range(2)]
+    assert delete(publisher, cds[0]).status_code == HTTP_204_NO_CONTENT
+    with django_capture_on_commit_callbacks(execute=True):
+        publisher.groups.remove(publishers)
+    assert delete(publisher, cds[1]).status_code == HTTP_403_FORBIDDEN
+    with django_capture_on_commit_callbacks(execute=True):
+        publishers.user_set.add(publisher)
+    assert delete(publisher, cds[1]).status_code == HTTP_204_NO_CONTENT
+
+
+@pytest.mark.parametrize('revoke', [
+    lambda user, group: group.user_set.remove(user),
+    lambda user, group: group.user_set.clear(),
+    lambda user, group: user.groups.clear(),
+    lambda user, group: group.delete(),
+    lambda user, group: setattr(group, 'name', 'former publishers') or group.save(),
+])
+def test_every_membership_change_invalidates_the_cached_membership(publisher, publishers, revoke,
+                                                                   django_capture_on_commit_callbacks):
+    cds = [mixer.blend('musics.CD', published_by=publisher) for _ in range(2)]
+    assert delete(publisher, cds[0]).status_code == HTTP_204_NO_CONTENT
+    with django_capture_on_commit_callbacks(execute=True):
+        revoke(publisher, publishers)
+    assert delete(publisher, cds[1]).status_code == HTTP_403_FORBIDDEN
+
+
+def test_cached_membership_is_invalidated_only_once_the_change_is_committed(publisher, publishers,
+                                                                            django_capture_on_commit_callbacks):
+    cds = [mixer.blend('musics.CD', published_by=publisher) for _ in range(3)]
+    assert delete(publisher, cds[0]).status_code == HTTP_204_NO_CONTENT
+    with django_capture_on_commit_callbacks() as callbacks:
+        publisher.groups.remove(publishers)
+        # a request racing the uncommitted change would cache the old membership again, dropping it now is useless
+        assert delete(publisher, cds[1]).status_code == HTTP_204_NO_CONTENT
+    for callback in callbacks:
+        callback()
+    assert delete(publisher, cds[2]).status_code == HTTP_403_FORBIDDEN
+
+
+def test_membership_is_not_cached_across_requests_in_unshared_locmem_caches(publisher, settings):
+    settings.MUSICS_WORKERS = 4
+    cds = [mixer.blend('musics.CD', published_by=publisher) for _ in range(3)]
+    with CaptureQueriesContext(connection) as queries:
+        for cd in cds:
+            assert delete(publisher, cd).status_code == HTTP_204_NO_CONTENT
+    assert len(group_queries(queries)) == 3
+
+
+def test_becoming_a_publisher_is_seen_by_the_next_request(publishers, django_capture_on_commit_callbacks):
+    user = mixer.blend(get_user_model())
+    cd = mixer.blend('musics.CD', published_by=user)
+    assert delete(user, cd).status_code == HTTP_403_FORBIDDEN
+    with django_capture_on_commit_callbacks(execute=True):
+        user.groups.add(publishers)
+    assert delete(user, cd).status_code == HTTP_204_NO_CONTENT
@@ -0,0 +1,80 @@
+from urllib.parse import urlencode
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from mixer.backend.django import mixer
+from rest_framework.status import HTTP_200_OK
+from rest_framework.test import APIClient, APIRequestFactory
+
+from musics.validators import ean_calc_check_digit
+from musics.views import CDByPublishedBy
+
+
+def published_by_queries(search):
+    request = APIRequestFactory().get('/', {'publishedby': search})
+    view = CDByPublishedBy()
+    view.setup(request)
+    view.request = view.initialize_request(request)
+    with CaptureQueriesContext(connection) as ctx:
+        cds = list(view.get_queryset())
+    return cds, len(ctx.captured_queries)
+
+
+@pytest.mark.parametrize('users_count', [1, 10, 50])
+def test_cd_by_published_by_query_count_is_constant(db, users_count):
+    for i in range(users_count):
+        user = mixer.blend(get_user_model(), username=f'publisher{i}')
+        mixer.blend('musics.CD', published_by=user)
+    mixer.blend('musics.CD', published_by=mixer.blend(get_user_model(), username='other'))
+
+    cds, queries = published_by_queries('publisher')
+    assert len(cds) == users_count
+    assert queries == 1
+
+
+def blend_cds(count):
+    return [mixer.blend('musics.CD', artist='PinkFloyd', name='Animals',
+                        published_by=mixer.blend(get_user_model(), username=f'publisher{i}'))
+            for i in range(count)]
+
+
+LIST_ENDPOINTS = [
+    ('musics-list', {}),
+    ('byartist', {'artist': 'Pink'}),
+    ('byname', {'name': 'Anim'}),
+    ('bypublishedby', {'publishedby': 'publisher'}),
+]
+
+
+@pytest.mark.parametrize('view,params', LIST_ENDPOINTS)
+@pytest.mark.parametrize('rows', [3, 30])
+def test_list_endpoints_query_count_does_not_grow_with_rows(db, django_assert_num_queries, view, params, rows):
+    blend_cds(rows)
+    path = '{}?{}'.format(reverse(view), urlencode(params))
+    # the conditional GET aggregate and the page itself
+    with django_assert_num_queries(2):
+        response = APIClient().get(path)
+    assert response.status_code == HTTP_200_OK
+    assert len(response.data['results']) == rows
+
+
+def test_detail_endpoint_runs_a_single_query_besides_validators(db, django_assert_num_queries):
+    cd = blend_cds(1)[0]
+    with django_assert_num_queries(2):
+        response = APIClient().get(reverse('musics-detail', kwargs={'pk': cd.pk}))
+    assert response.status_code == HTTP_200_OK
+    assert response.data['user'] == cd.published_by.username
+
+
+def test_ean_batch_resolves_all_codes_with_a_single_query(db, django_assert_num_queries):
+    codes = [str(400638133300 + i) for i in range(100)]
+    codes = [code + ean_calc_check_digit(code) for code in codes]
+    for code in codes:
+        mixer.blend('musics.CD', ean_code=code)
+    with django_assert_num_queries(1):
+        response = APIClient().post(reverse('byean-batch'), {'ean_codes': codes}, format='json')
+    assert response.status_code == HTTP_200_OK
+    assert len(response.data['results']) == len(codes)
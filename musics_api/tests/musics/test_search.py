@@ -0,0 +1,92 @@
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from mixer.backend.django import mixer
+
+from musics import search
+from musics.models import CD
+
+pytestmark = pytest.mark.skipif(not search.fts_enabled(connection), reason="FTS5 trigram tokenizer not available")
+
+
+@pytest.fixture()
+def catalogue(db):
+    user = mixer.blend(get_user_model(), username='ssdsbm')
+    return [
+        mixer.blend('musics.CD', artist='PinkFloyd', name='Animals', published_by=user),
+        mixer.blend('musics.CD', artist='Pink', name='Trustfall', published_by=user),
+        mixer.blend('musics.CD', artist='Queen', name='Innuendo'),
+    ]
+
+
+def ids(queryset):
+    return sorted(cd.id for cd in queryset)
+
+
+def test_search_matches_substrings_case_insensitively(catalogue):
+    assert ids(CD.objects.search('artist', 'pink')) == [catalogue[0].id, catalogue[1].id]
+    assert ids(CD.objects.search('artist', 'KFLO')) == [catalogue[0].id]
+    assert ids(CD.objects.search('name', 'nuen')) == [catalogue[2].id]
+    assert ids(CD.objects.search('publisher', 'dsb')) == [catalogue[0].id, catalogue[1].id]
+
+
+def test_search_with_short_term_falls_back_to_icontains(catalogue):
+    assert ids(CD.objects.search('artist', 'ee')) == [catalogue[2].id]
+
+
+def test_search_index_follows_updates(catalogue):
+    cd = catalogue[2]
+    cd.artist = 'Metallica'
+    cd.save()
+    assert ids(CD.objects.search('artist', 'queen')) == []
+    assert ids(CD.objects.search('artist', 'metal')) == [cd.id]
+
+
+def test_search_index_follows_deletes(catalogue):
+    catalogue[0].delete()
+    assert ids(CD.objects.search('artist', 'pink')) == [catalogue[1].id]
+
+
+def test_search_index_follows_publisher_rename(catalogue):
+    user = catalogue[0].published_by
+    user.username = 'renamed'
+    user.save()
+    assert ids(CD.objects.search('publisher', 'ssdsbm')) == []
+    assert ids(CD.objects.search('publisher', 'renamed')) == [catalogue[0].id, catalogue[1].id]
+
+
+def test_search_escapes_quotes(catalogue):
+    assert ids(CD.objects.search('artist', 'Pink"Floyd')) == []
+
+
+def query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def test_search_reads_the_trigram_index_instead_of_scanning_the_cds(db):
+    plan = query_plan(CD.objects.search('artist', 'Artist 1999').order_by('created_at', 'id')[:100])
+    assert any(step.startswith('SCAN musics_cd_search VIRTUAL TABLE') for step in plan)
+    assert not any(step.startswith('SCAN musics_cd ') for step in plan)
+
+
+@pytest.mark.benchmark
+def test_search_is_faster_than_icontains_scan(db):
+    user = mixer.blend(get_user_model())
+    CD.objects.bulk_create(CD(artist=f'Artist {i}', name=f'Name {i}', record_company='Sony', genre='Rock',
+                              ean_code=f'{i:013d}', published_by=user) for i in range(20000))
+    search.rebuild()
+
+    def timed(queryset):
+        start = time.perf_counter()
+        result = list(queryset.order_by('created_at', 'id')[:100])
+        return result, time.perf_counter() - start
+
+    fts, fts_time = timed(CD.objects.search('artist', 'Artist 1999'))
+    scan, scan_time = timed(CD.objects.filter(artist__icontains='Artist 1999'))
+    assert ids(fts) == ids(scan)
+    assert fts_time < scan_time
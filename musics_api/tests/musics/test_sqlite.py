@@ -0,0 +1,95 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+from django.conf import settings
+from django.db import connections
+
+from musics.sqlite import apply_pragmas
+
+PRODUCTION = settings.MUSICS_SQLITE_PROFILES['production']
+
+
+def test_production_pragmas_are_applied_to_new_connections(db, settings):
+    settings.MUSICS_SQLITE_PRAGMAS = PRODUCTION['PRAGMAS']
+    connection = connections.create_connection('default')
+    try:
+        with connection.cursor() as cursor:
+            assert cursor.execute('PRAGMA synchronous').fetchone() == (1,)  # NORMAL
+            assert cursor.execute('PRAGMA busy_timeout').fetchone() == (5000,)
+            assert cursor.execute('PRAGMA cache_size').fetchone() == (-64 * 1024,)
+    finally:
+        connection.close()
+
+
+def test_development_profile_keeps_sqlite_defaults():
+    assert settings.MUSICS_SQLITE_PROFILES['development'] == {'CONN_MAX_AGE': 0, 'PRAGMAS': {}}
+
+
+def mixed_workload(path, profile, threads=8, operations=150, write_every=5):
+    # each thread plays a client: 4 reads of a page of CDs for each update. The development profile opens a
+    # connection per operation like CONN_MAX_AGE=0 does, the production one keeps one per thread
+    errors = []
+
+    def connect():
+        connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        apply_pragmas(connection.cursor(), profile['PRAGMAS'])
+        return connection
+
+    def client(number):
+        persistent = connect() if profile['CONN_MAX_AGE'] else None
+        for i in range(operations):
+            connection = persistent or connect()
+            try:
+                if i % write_every == 0:
+                    connection.execute('UPDATE cd SET price = price + 1 WHERE id = ?', (number * operations + i,))
+                else:
+                    connection.execute('SELECT * FROM cd WHERE id > ? ORDER BY id LIMIT 20', (i * 10,)).fetchall()
+            except sqlite3.OperationalError as e:
+                errors.append(e)
+            finally:
+                if persistent is None:
+                    connection.close()
+        if persistent is not None:
+            persistent.close()
+
+    workers = [threading.Thread(target=client, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    return threads * operations / elapsed, errors
+
+
+def create_catalogue(path, rows=5000):
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE TABLE cd (id INTEGER PRIMARY KEY, name TEXT, artist TEXT, price INTEGER)')
+    connection.executemany('INSERT INTO cd VALUES (?, ?, ?, ?)',
+                           ((i, f'Name {i}', f'Artist {i % 100}', 1000) for i in range(rows)))
+    connection.commit()
+    connection.close()
+
+
+def test_production_profile_serves_a_mixed_workload_without_lock_errors(tmp_path):
+    path = tmp_path / 'production.sqlite3'
+    create_catalogue(path, rows=1000)
+    _, errors = mixed_workload(path, PRODUCTION, threads=4, operations=50)
+    assert errors == []
+    connection = sqlite3.connect(path)
+    assert connection.execute('PRAGMA journal_mode').fetchone() == ('wal',)
+    connection.close()
+
+
+@pytest.mark.benchmark
+def test_production_profile_serves_a_mixed_workload_faster(tmp_path):
+    results = {}
+    for name in ('development', 'production'):
+        path = tmp_path / f'{name}.sqlite3'
+        create_catalogue(path)
+        results[name] = mixed_workload(path, settings.MUSICS_SQLITE_PROFILES[name])
+    assert results['production'][1] == []
+    assert results['production'][0] > results['development'][0], \
+        f'operations/s: { {name: round(ops) for name, (ops, _) in results.items()} }'
@@ -6,7 +6,8 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from django.urls import reverse
 from mixer.backend.django import mixer
-from rest_framework.status import HTTP_403_FORBIDDEN, HTTP_200_OK, HTTP_204_NO_CONTENT
+from rest_framework.status import HTTP_403_FORBIDDEN, HTTP_200_OK, HTTP_204_NO_CONTENT, HTTP_404_NOT_FOUND, \
+    HTTP_400_BAD_REQUEST
 from rest_framework.test import APIClient
 
 
@@ -91,7 +92,7 @@ def test_musics_anon_user_get_200_with_GET(musics):
     response = client.get(path)
     assert response.status_code == HTTP_200_OK
     obj = parse(response)
-    assert len(obj) == len(musics)
+    assert len(obj['results']) == len(musics)
 def reverse_querystring(view, urlconf=None, args=None, kwargs=None, current_app=None, query_kwargs=None):
     base_url = reverse(view, urlconf=urlconf, args=args, kwargs=kwargs, current_app=current_app)
     if query_kwargs:
@@ -105,7 +106,37 @@ def test_musics_anon_user_get_200_with_GET_by_artist(musics):
     response = client.get(path)
     assert response.status_code == HTTP_200_OK
     obj = parse(response)
-    assert len(obj) == 2
+    assert len(obj['results']) == 2
+
+def test_musics_list_is_paginated_with_page_size(musics):
+    path = reverse_querystring('musics-list', query_kwargs={'page_size': 2})
+    client = get_client()
+    response = client.get(path)
+    assert response.status_code == HTTP_200_OK
+    obj = parse(response)
+    assert len(obj['results']) == 2
+    assert obj['next'] is not None
+    assert obj['previous'] is None
+
+
+def test_musics_list_cursor_walks_all_pages_in_creation_order(musics):
+    path = reverse_querystring('musics-list', query_kwargs={'page_size': 2})
+    client = get_client()
+    ids = []
+    while path:
+        obj = parse(client.get(path))
+        ids += [i['id'] for i in obj['results']]
+        path = obj['next']
+    assert ids == [cd.id for cd in sorted(musics, key=lambda cd: (cd.created_at, cd.id))]
+
+
+def test_musics_by_artist_is_paginated(musics):
+    path = reverse_querystring('byartist', query_kwargs={'artist': musics[4].artist, 'page_size': 1})
+    client = get_client()
+    obj = parse(client.get(path))
+    assert len(obj['results']) == 1
+    assert obj['next'] is not None
+
 
 def test_musics_anon_user_get_200_with_GET_by_name(musics):
     path = reverse_querystring('byname',query_kwargs={'name':musics[4].name})
@@ -163,3 +194,62 @@ def tests_music_anon_user_get_403_on_POST():
     response = client.post(path)
     assert response.status_code == HTTP_403_FORBIDDEN
 
+
+
+@pytest.fixture()
+def musics_with_ean(db):
+    return [
+        mixer.blend('musics.CD', ean_code="978020137962"),
+        mixer.blend('musics.CD', ean_code="4006381333931"),
+        mixer.blend('musics.CD', ean_code="0036000291452"),
+    ]
+
+
+def test_musics_anon_user_get_200_with_GET_by_ean(musics_with_ean):
+    path = reverse('byean', kwargs={'ean': '4006-3813-3393-1'})
+    client = get_client()
+    response = client.get(path)
+    assert response.status_code == HTTP_200_OK
+    assert parse(response)['id'] == musics_with_ean[1].id
+
+
+def test_musics_get_by_ean_matches_upc_and_ean13_encodings(musics_with_ean):
+    client = get_client()
+    response = client.get(reverse('byean', kwargs={'ean': '036000291452'}))
+    assert parse(response)['id'] == musics_with_ean[2].id
+    response = client.get(reverse('byean', kwargs={'ean': '0978020137962'}))
+    assert parse(response)['id'] == musics_with_ean[0].id
+
+
+def test_musics_get_by_ean_with_two_stored_encodings_returns_the_oldest(musics_with_ean):
+    mixer.blend('musics.CD', ean_code="036000291452")
+    response = get_client().get(reverse('byean', kwargs={'ean': '036000291452'}))
+    assert response.status_code == HTTP_200_OK
+    assert parse(response)['id'] == musics_with_ean[2].id
+
+
+def test_musics_get_by_ean_unknown_code_get_404(musics_with_ean):
+    response = get_client().get(reverse('byean', kwargs={'ean': '5901234123457'}))
+    assert response.status_code == HTTP_404_NOT_FOUND
+
+
+def test_musics_get_by_ean_wrong_checksum_get_400(musics_with_ean):
+    response = get_client().get(reverse('byean', kwargs={'ean': '4006381333932'}))
+    assert response.status_code == HTTP_400_BAD_REQUEST
+
+
+def test_musics_anon_user_get_200_with_POST_by_ean_batch(musics_with_ean):
+    client = get_client()
+    response = client.post(reverse('byean-batch'),
+                           {'ean_codes': ['978020137962', '4006381333931', '5901234123457', 'abc']}, format='json')
+    assert response.status_code == HTTP_200_OK
+    obj = parse(response)
+    assert obj['results']['978020137962']['id'] == musics_with_ean[0].id
+    assert obj['results']['4006381333931']['id'] == musics_with_ean[1].id
+    assert obj['not_found'] == ['5901234123457']
+    assert obj['invalid'] == ['abc']
+
+
+def test_musics_by_ean_batch_rejects_more_than_1000_codes(musics_with_ean):
+    response = get_client().post(reverse('byean-batch'), {'ean_codes': ['978020137962'] * 1001}, format='json')
+    assert response.status_code == HTTP_400_BAD_REQUEST
@@ -0,0 +1,4 @@
+from dotenv import load_dotenv
+
+# loaded once, before any submodule reads its MUSICS_* settings
+load_dotenv()
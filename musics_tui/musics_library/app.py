@@ -1,19 +1,17 @@
 from typing import Callable, Any
 
-import pwinput
 from rich.console import Console
 from rich.prompt import Prompt, Confirm
-from rich.table import Table
 from rich.text import Text
 
 from musics_library.domain import Username, Password, Name, Artist, RecordCompany, Genre, EANCode, Price, CD, \
     ID
-from musics_library.exceptions import AppException
+from musics_library.exceptions import AppException, ApiException
 from musics_library.menu import Menu, Entry, Description
+from musics_library.pager import CDPager, cd_table
 from musics_library.services import AuthenticationService, CDLibrary
-from dotenv import load_dotenv
 import os
-load_dotenv()
+import threading
 
 music_website= os.getenv('MUSIC_WEBSITE')
 
@@ -42,7 +40,11 @@ class App:
             .with_entry(
                 Entry.create('6', 'Get all CDs by Artist', on_selected=lambda: self.__print_cds_by_artist())) \
             .with_entry(
-                Entry.create('7', 'Get all CDs', on_selected=lambda: self.__print_all_cds()))
+                Entry.create('7', 'Get all CDs', on_selected=lambda: self.__print_all_cds())) \
+            .with_entry(
+                Entry.create('9', 'Sync offline catalogue', on_selected=lambda: self.__sync())) \
+            .with_entry(
+                Entry.create('d', 'Diagnostics', on_selected=lambda: self.__print_diagnostics()))
 
         if self.authenticated_user:
             menu_builder.with_entry(
@@ -68,6 +70,32 @@ class App:
     def __print_welcome(self) -> None:
         self.console.print("*** Welcome to ***")
 
+    def __sync(self) -> None:
+        try:
+            applied = self.music_library.sync()
+        except ApiException:
+            self.console.print("Music Library is offline, showing the last synced catalogue.")
+            return
+        self.console.print(f"Offline catalogue synced, {applied} changes applied.")
+
+    def __sync_in_background(self) -> None:
+        try:
+            self.music_library.sync()
+        except Exception:
+            pass  # reads fall back to the api until the next sync, nothing is printed over the menu
+
+    def __print_diagnostics(self) -> None:
+        from rich.table import Table
+
+        table = Table(title="Read cache")
+        stats = self.music_library.read_cache.stats()
+        for col in ['HITS', 'MISSES', 'HIT RATIO', 'EVICTIONS', 'INVALIDATIONS', 'SIZE', 'MAX ENTRIES', 'TTL']:
+            table.add_column(col, justify="center", style="cyan")
+        table.add_row(str(stats['hits']), str(stats['misses']), f"{stats['hit_ratio']:.0%}", str(stats['evictions']),
+                      str(stats['invalidations']), str(stats['size']), str(stats['max_entries']), f"{stats['ttl']:g}s")
+        self.console.print(table)
+        self.console.print(f"Offline catalogue: {len(self.music_library.store)} CDs")
+
     def __add_cd(self):
         if self.authenticated_user == None:
             raise AppException("You must be logged.")
@@ -115,29 +143,27 @@ class App:
             self.console.print("Record will not be deleted.")
 
     def __create_and_print_table_with_single_cd(self, cd):
-        table = Table(title="CD " + str(cd.id))
-        columns = ['#', 'NAME', 'ARTIST', 'RECORD COMPANY', 'GENRE', 'EANCODE', 'PRICE', 'PUBLISHED BY',
-                   'CREATED AT', 'UPDATED AT']
-        for col in columns:
-            table.add_column(col, justify="center", style="cyan")
-
-        table.add_row(str(cd.id.value), cd.name.value, cd.artist.value, cd.record_company.value, cd.genre.value,
-                      cd.ean_code.value, str(cd.price), cd.published_by.value, cd.createdat, cd.updatedat)
-
-        self.console.print(table)
+        self.console.print(cd_table("CD " + str(cd.id), [cd]))
 
     def __create_and_print_table_with_list_of_cd(self, cds):
-        table = Table(title="CDs")
-        columns = ['#', 'NAME', 'ARTIST', 'RECORD COMPANY', 'GENRE', 'EANCODE', 'PRICE', 'PUBLISHED BY',
-                   'CREATED AT', 'UPDATED AT']
-        for col in columns:
-            table.add_column(col, justify="center", style="cyan")
-
-        for cd in cds:
-            table.add_row(str(cd.id.value), cd.name.value, cd.artist.value, cd.record_company.value, cd.genre.value,
-                          cd.ean_code.value, str(cd.price),
-                          cd.published_by.value, cd.createdat, cd.updatedat)
-        self.console.print(table)
+        # only the visible page is rendered, the next rows are fetched while paging forward
+        pager = CDPager(cds)
+        while True:
+            self.console.print(pager.render())
+            if not pager.has_next and not pager.has_prev:
+                return
+            command = Prompt.ask("[n]ext, [p]rev, [j]ump <page>, [q]uit ",
+                                 default="n" if pager.has_next else "q").strip().lower()
+            if command.startswith('n'):
+                pager.next()
+            elif command.startswith('p'):
+                pager.prev()
+            elif command.startswith('j'):
+                number = command[1:].strip() or Prompt.ask("Page ")
+                if number.strip().isdigit():
+                    pager.jump(int(number) - 1)
+            elif command.startswith('q'):
+                return
 
     def __print_cds_by_artist(self):
         artist = self.__read('Artist', Artist)
@@ -216,6 +242,7 @@ class App:
     def __read_password(builder):
         while True:
             try:
+                import pwinput
                 line = pwinput.pwinput(prompt='Password : ', mask='*')
                 res = builder(line.strip())
                 return res
@@ -235,6 +262,8 @@ class App:
     def __run(self) -> None:
         try:
             self.__print_welcome()
+            # the catalogue is mirrored in the background, the menu doesn't wait for the network
+            threading.Thread(target=self.__sync_in_background, daemon=True).start()
         except:
             print('App Error')
         self.menu.run()
@@ -0,0 +1,101 @@
+import asyncio
+import os
+from typing import AsyncIterator, Iterable, List, Optional
+
+import httpx
+
+import musics_library.mappers as mappers
+from musics_library.domain import Username, CD, Artist, Name, ID
+from musics_library.exceptions import ApiException
+from musics_library.services import AuthenticatedUser, cd_to_dict, music_endpoint, CONNECTION_ERROR, GET_ERROR, \
+    GET_DETAIL_ERROR, POST_ERROR, PUT_ERROR, DELETE_ERROR, PERMISSION_ADD_ERROR, PERMISSION_ERROR
+from musics_library.transport import POOL_SIZE, CONNECT_TIMEOUT, READ_TIMEOUT
+
+MAX_CONCURRENCY = int(os.getenv('MUSICS_MAX_CONCURRENCY', POOL_SIZE))
+
+
+class AsyncCDLibrary:
+    # asyncio counterpart of CDLibrary, at most max_concurrency requests are in flight at the same time
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, max_concurrency: int = MAX_CONCURRENCY):
+        self.client = client or httpx.AsyncClient(
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency))
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def __request(self, method: str, url: str, auth_user: Optional[AuthenticatedUser] = None, **kwargs):
+        headers = {'Authorization': f'Token {auth_user.key}'} if auth_user is not None else None
+        async with self.semaphore:
+            try:
+                return await self.client.request(method, url, headers=headers, **kwargs)
+            except httpx.HTTPError:
+                raise ApiException(CONNECTION_ERROR)
+
+    async def __walk_cd_pages(self, url: str) -> AsyncIterator[CD]:
+        while url:
+            res = await self.__request('GET', url)
+            if res.status_code != 200:
+                raise ApiException(GET_ERROR)
+            page = res.json()
+            for i in page['results']:
+                yield mappers.FastCDMapper.map_cd(i)
+            url = page['next']
+
+    def cds(self) -> AsyncIterator[CD]:
+        return self.__walk_cd_pages(music_endpoint)
+
+    async def cd(self, id: ID) -> CD:
+        res = await self.__request('GET', music_endpoint + str(id.value) + "/")
+        if res.status_code != 200:
+            raise ApiException(GET_DETAIL_ERROR)
+        return mappers.FastCDMapper.map_cd(res.json())
+
+    async def gather_cds(self, ids: Iterable[ID]) -> List[CD]:
+        # the CDs are returned in the order of ids, the first failure is raised
+        return list(await asyncio.gather(*(self.cd(id) for id in ids)))
+
+    async def add_cd(self, cd: CD, auth_user: AuthenticatedUser) -> CD:
+        dict = cd_to_dict(cd)
+        dict['published_by'] = auth_user.id.value
+        res = await self.__request('POST', music_endpoint, auth_user, json=dict)
+        if res.status_code == 403:
+            raise ApiException(PERMISSION_ADD_ERROR)
+        if res.status_code != 201:
+            raise ApiException(POST_ERROR)
+        return mappers.FastCDMapper.map_cd(res.json())
+
+    async def update_cd(self, cd: CD, auth_user: AuthenticatedUser) -> bool:
+        dict = cd_to_dict(cd)
+        dict['id'] = cd.id.value
+        dict['published_by'] = auth_user.id.value
+        res = await self.__request('PUT', music_endpoint + str(cd.id) + "/", auth_user, json=dict)
+        if res.status_code == 403:
+            raise ApiException(PERMISSION_ERROR)
+        if res.status_code != 200:
+            raise ApiException(PUT_ERROR)
+        return True
+
+    async def remove_cd(self, id: ID, auth_user: AuthenticatedUser) -> bool:
+        res = await self.__request('DELETE', music_endpoint + str(id.value) + "/", auth_user)
+        if res.status_code == 403:
+            raise ApiException(PERMISSION_ERROR)
+        if res.status_code != 204:
+            raise ApiException(DELETE_ERROR)
+        return True
+
+    def cds_by_artist(self, artist: Artist) -> AsyncIterator[CD]:
+        return self.__walk_cd_pages(music_endpoint + "byartist?artist=" + artist.value)
+
+    def cds_by_published_by(self, published_by: Username) -> AsyncIterator[CD]:
+        return self.__walk_cd_pages(music_endpoint + "by_published_by?publishedby=" + published_by.value)
+
+    def cds_by_cd_name(self, cd_name: Name) -> AsyncIterator[CD]:
+        return self.__walk_cd_pages(music_endpoint + "byname?name=" + cd_name.value)
@@ -0,0 +1,125 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, Iterator
+
+from musics_library.domain import CD, ID
+
+READ_CACHE_TTL = float(os.getenv('MUSICS_READ_CACHE_TTL', 30))
+READ_CACHE_SIZE = int(os.getenv('MUSICS_READ_CACHE_SIZE', 256))
+# listings longer than this are streamed every time instead of being kept in memory
+READ_CACHE_MAX_ROWS = int(os.getenv('MUSICS_READ_CACHE_MAX_ROWS', 1000))
+
+# search keys are (column, term), the columns are matched like the api icontains lookups
+SEARCH_COLUMNS = {
+    'artist': lambda cd: cd.artist.value,
+    'name': lambda cd: cd.name.value,
+    'published_by': lambda cd: cd.published_by.value,
+}
+
+
+def detail_key(cd_id: ID) -> tuple:
+    return 'cd', cd_id.value
+
+
+LIST_KEY = ('cds',)
+
+
+class ReadCache:
+    # in-process TTL + LRU cache of the CDLibrary reads, entries expire after ttl seconds and the least
+    # recently used one is evicted beyond max_entries
+    def __init__(self, ttl: float = READ_CACHE_TTL, max_entries: int = READ_CACHE_SIZE,
+                 clock: Callable[[], float] = time.monotonic, max_rows: int = READ_CACHE_MAX_ROWS):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.__clock = clock
+        self.__entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self.__generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __lookup(self, key: Hashable):
+        entry = self.__entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > self.__clock():
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            del self.__entries[key]
+        self.misses += 1
+        return None
+
+    def __store(self, key: Hashable, value) -> None:
+        self.__entries[key] = (self.__clock() + self.ttl, value)
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.max_entries:
+            self.__entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: Hashable, load: Callable):
+        entry = self.__lookup(key)
+        if entry is not None:
+            return entry[1]
+        value = load()
+        self.__store(key, value)
+        return value
+
+    def iterate(self, key: Hashable, load: Callable[[], Iterable[CD]]) -> Iterator[CD]:
+        # lazy counterpart of get for listings: the rows of load are yielded as they arrive and kept only
+        # when the listing is read to the end within max_rows and no invalidation happened meanwhile
+        entry = self.__lookup(key)
+        if entry is not None:
+            return iter(entry[1])
+        return self.__collect(key, iter(load()), self.__generation)
+
+    def __collect(self, key: Hashable, cds: Iterator[CD], generation: int) -> Iterator[CD]:
+        rows = []
+        for cd in cds:
+            if rows is not None:
+                rows.append(cd)
+                if len(rows) > self.max_rows:
+                    rows = None
+            yield cd
+        if rows is not None and generation == self.__generation:
+            self.__store(key, rows)
+
+    def invalidate(self, key: Hashable) -> None:
+        self.__generation += 1
+        if self.__entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def invalidate_cd(self, cd_id: ID, cds: Iterable[CD] = ()) -> None:
+        # drops the detail of cd_id, the full list, the search results holding cd_id and the searches
+        # that the given versions of the CD (before and after the write) would match
+        self.invalidate(detail_key(cd_id))
+        self.invalidate(LIST_KEY)
+        cds = list(cds)
+        for key, (_, value) in list(self.__entries.items()):
+            column = key[0]
+            if column not in SEARCH_COLUMNS:
+                continue
+            term = key[1].lower()
+            if any(cd.id == cd_id for cd in value) or \
+                    any(term in SEARCH_COLUMNS[column](cd).lower() for cd in cds):
+                self.invalidate(key)
+
+    def peek(self, key: Hashable):
+        entry = self.__entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def clear(self) -> None:
+        self.__generation += 1
+        self.__entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions, 'invalidations': self.invalidations, 'size': len(self.__entries),
+                'max_entries': self.max_entries, 'max_rows': self.max_rows, 'ttl': self.ttl}
+
+    def __len__(self):
+        return len(self.__entries)
@@ -0,0 +1,126 @@
+import sys
+from array import array
+from datetime import datetime, timezone, timedelta
+from typing import Callable, Iterable, Iterator, List, Tuple, Union
+
+import musics_library.mappers as mappers
+from musics_library.domain import CD
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_UTC = EPOCH.replace(tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+STRING_COLUMNS = ('name', 'artist', 'record_company', 'genre', 'ean_code', 'published_by')
+INTEGER_COLUMNS = ('id', 'price', 'created_at', 'updated_at')
+COLUMNS = ('id',) + STRING_COLUMNS + ('price', 'created_at', 'updated_at')
+
+
+def _to_micros(value: datetime) -> Tuple[int, int]:
+    # datetimes are stored as microseconds since the epoch plus a flag telling whether they were aware
+    if value.tzinfo is None:
+        return (value - EPOCH) // MICROSECOND, 0
+    return (value - EPOCH_UTC) // MICROSECOND, 1
+
+
+def _from_micros(micros: int, aware: int) -> datetime:
+    return (EPOCH_UTC if aware else EPOCH) + timedelta(microseconds=micros)
+
+
+class CDCollection:
+    # columnar storage for large lists of CDs: one array per integer column, one list of interned strings
+    # per text column. CD objects are only built when a row is accessed.
+    __slots__ = ('_id', '_name', '_artist', '_record_company', '_genre', '_ean_code', '_published_by', '_price',
+                 '_created_at', '_updated_at', '_aware')
+
+    def __init__(self, cds: Iterable[CD] = ()):
+        for column in INTEGER_COLUMNS:
+            setattr(self, '_' + column, array('q'))
+        for column in STRING_COLUMNS:
+            setattr(self, '_' + column, [])
+        self._aware = bytearray()
+        self.extend(cds)
+
+    def append_row(self, id: int, name: str, artist: str, record_company: str, genre: str, ean_code: str,
+                   published_by: str, price_in_cents: int, created_at: datetime, updated_at: datetime) -> None:
+        intern = sys.intern
+        self._id.append(id)
+        self._name.append(intern(name))
+        self._artist.append(intern(artist))
+        self._record_company.append(intern(record_company))
+        self._genre.append(intern(genre))
+        self._ean_code.append(intern(ean_code))
+        self._published_by.append(intern(published_by))
+        self._price.append(price_in_cents)
+        created_at, created_aware = _to_micros(created_at)
+        updated_at, updated_aware = _to_micros(updated_at)
+        self._created_at.append(created_at)
+        self._updated_at.append(updated_at)
+        self._aware.append(created_aware | updated_aware << 1)
+
+    def append(self, cd: CD) -> None:
+        self.append_row(cd.id.value, cd.name.value, cd.artist.value, cd.record_company.value, cd.genre.value,
+                        cd.ean_code.value, cd.published_by.value, cd.price.value_in_cents, cd.created_at,
+                        cd.updated_at)
+
+    def extend(self, cds: Iterable[CD]) -> None:
+        for cd in cds:
+            self.append(cd)
+
+    def column(self, name: str) -> Union[array, List[str], List[datetime]]:
+        # the raw column, prices are in cents
+        if name not in COLUMNS:
+            raise KeyError(name)
+        if name in ('created_at', 'updated_at'):
+            return [self.__datetime(name, i) for i in range(len(self))]
+        return getattr(self, '_' + name)
+
+    def __datetime(self, name: str, index: int) -> datetime:
+        shift = 0 if name == 'created_at' else 1
+        return _from_micros(getattr(self, '_' + name)[index], self._aware[index] >> shift & 1)
+
+    def __row(self, index: int) -> CD:
+        return mappers.FastCDMapper.trusted_cd(self._id[index], self._name[index], self._artist[index],
+                                               self._record_company[index], self._genre[index],
+                                               self._ean_code[index], self._published_by[index], self._price[index],
+                                               self.__datetime('created_at', index),
+                                               self.__datetime('updated_at', index))
+
+    def take(self, indices: Iterable[int]) -> 'CDCollection':
+        indices = list(indices)
+        taken = CDCollection()
+        for column in INTEGER_COLUMNS:
+            source = getattr(self, '_' + column)
+            setattr(taken, '_' + column, array('q', (source[i] for i in indices)))
+        for column in STRING_COLUMNS:
+            source = getattr(self, '_' + column)
+            setattr(taken, '_' + column, [source[i] for i in indices])
+        taken._aware = bytearray(self._aware[i] for i in indices)
+        return taken
+
+    def filter(self, column: str, predicate: Callable) -> 'CDCollection':
+        # the predicate receives the raw column value, e.g. filter('price', lambda cents: cents < 1000)
+        values = self.column(column)
+        return self.take([i for i, value in enumerate(values) if predicate(value)])
+
+    def sort(self, column: str, reverse: bool = False) -> 'CDCollection':
+        if column not in COLUMNS:
+            raise KeyError(column)
+        values = getattr(self, '_' + column)
+        return self.take(sorted(range(len(self)), key=values.__getitem__, reverse=reverse))
+
+    def nbytes(self) -> int:
+        # memory held by the columns, every distinct string is counted once
+        size = sum(sys.getsizeof(getattr(self, '_' + column)) for column in INTEGER_COLUMNS + STRING_COLUMNS)
+        strings = {id(value): value for column in STRING_COLUMNS for value in getattr(self, '_' + column)}
+        return size + sys.getsizeof(self._aware) + sum(sys.getsizeof(value) for value in strings.values())
+
+    def __len__(self):
+        return len(self._id)
+
+    def __iter__(self) -> Iterator[CD]:
+        for index in range(len(self)):
+            yield self.__row(index)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[CD, 'CDCollection']:
+        if isinstance(index, slice):
+            return self.take(range(len(self))[index])
+        return self.__row(range(len(self))[index])
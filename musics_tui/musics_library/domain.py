@@ -1,15 +1,47 @@
+import os
 import re
 from dataclasses import dataclass, InitVar, field
 from datetime import datetime
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, Dict, Optional
 
-from password_validator import PasswordValidator
-from stdnum.util import clean, isdigits
 from typeguard import typechecked
 from valid8 import validate, ValidationError
 
 from validation.regex import pattern
 
+# compiled once at import instead of on every value object
+NAME_PATTERN = pattern(r"[A-Za-z0-9- ,'!@]*")
+ARTIST_PATTERN = pattern(r'[A-Za-z0-9- ,!@]*')
+RECORD_COMPANY_PATTERN = pattern(r'[A-Za-z0-9- ,!@#]*')
+GENRE_PATTERN = pattern(r'^[A-Z][A-Za-z ]*')
+USERNAME_PATTERN = pattern(r'[A-Za-z0-9-]*')
+
+INTERN_TABLE_SIZE = int(os.getenv('MUSICS_INTERN_TABLE_SIZE', 4096))
+INTERNED = []
+
+
+def interned(cls):
+    # adds cls.of(value): equal values share one validated instance, kept in a bounded LRU table.
+    # Invalid values are not cached, they are validated again on every call.
+    cls.of = staticmethod(lru_cache(maxsize=INTERN_TABLE_SIZE)(cls))
+    INTERNED.append(cls)
+    return cls
+
+
+def intern_stats() -> Dict[str, Dict[str, int]]:
+    stats = {}
+    for cls in INTERNED:
+        info = cls.of.cache_info()
+        stats[cls.__name__] = {'hits': info.hits, 'misses': info.misses, 'size': info.currsize,
+                               'maxsize': info.maxsize}
+    return stats
+
+
+def clear_intern_tables() -> None:
+    for cls in INTERNED:
+        cls.of.cache_clear()
+
 
 @typechecked
 @dataclass(frozen=True, order=True)
@@ -33,43 +65,46 @@ class Name:
     value: str
 
     def __post_init__(self):
-        validate('value', self.value, min_len=1, max_len=50, custom=pattern(r"[A-Za-z0-9- ,'!@]*"))
+        validate('value', self.value, min_len=1, max_len=50, custom=NAME_PATTERN)
 
     def __str__(self):
         return self.value
 
 
+@interned
 @typechecked
 @dataclass(frozen=True, order=True)
 class Artist:
     value: str
 
     def __post_init__(self):
-        validate('value', self.value, min_len=1, max_len=50, custom=pattern(r'[A-Za-z0-9- ,!@]*'))
+        validate('value', self.value, min_len=1, max_len=50, custom=ARTIST_PATTERN)
 
     def __str__(self):
         return self.value
 
 
+@interned
 @typechecked
 @dataclass(frozen=True, order=True)
 class RecordCompany:
     value: str
 
     def __post_init__(self):
-        validate('value', self.value, min_len=1, max_len=50, custom=pattern(r'[A-Za-z0-9- ,!@#]*'))
+        validate('value', self.value, min_len=1, max_len=50, custom=RECORD_COMPANY_PATTERN)
 
     def __str__(self):
         return self.value
 
 
+@interned
 @typechecked
 @dataclass(frozen=True, order=True)
 class Genre:
     value: str
 
     def __post_init__(self):
-        validate('value', self.value, min_len=1, max_len=25, custom=pattern(r'^[A-Z][A-Za-z ]*'))
+        validate('value', self.value, min_len=1, max_len=25, custom=GENRE_PATTERN)
 
     def __str__(self):
         return self.value
@@ -84,6 +119,8 @@ class EANCode:
         self.__validate_ean(self.value)
 
     def __compact(self, number):
+        from stdnum.util import clean
+
         return clean(number, ' -').strip()
 
     def __calc_check_digit(self, number):
@@ -91,6 +128,8 @@ class EANCode:
                              for i, n in enumerate(reversed(number)))) % 10)
 
     def __validate(self, number):
+        from stdnum.util import isdigits
+
         number = self.__compact(number)
         if not isdigits(number):
             raise ValidationError("EANCode is structured with numbers.")
@@ -152,33 +191,70 @@ class Price:
         return Price(self.value_in_cents + other.value_in_cents, self.__create_key)
 
 
+@interned
 @typechecked
 @dataclass(frozen=True, order=True)
 class Username:
     value: str
 
     def __post_init__(self):
-        validate('value', self.value, min_len=1, max_len=150, custom=pattern(r'[A-Za-z0-9-]*'))
+        validate('value', self.value, min_len=1, max_len=150, custom=USERNAME_PATTERN)
 
     def __str__(self):
         return self.value
 
 
+def _env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes')
+
+
+@dataclass(frozen=True)
+class PasswordPolicy:
+    # the same rules, read from the same MUSICS_PASSWORD_* variables, are enforced by the api on registration
+    min_length: int = 8
+    max_length: int = 128
+    allow_spaces: bool = False
+    require_lowercase: bool = True
+    require_uppercase: bool = False
+    require_digit: bool = False
+    require_symbol: bool = False
+    __classes = {
+        'require_lowercase': re.compile(r'[a-z]'),
+        'require_uppercase': re.compile(r'[A-Z]'),
+        'require_digit': re.compile(r'[0-9]'),
+        'require_symbol': re.compile(r'[^A-Za-z0-9\s]'),
+    }
+
+    @staticmethod
+    def from_env() -> 'PasswordPolicy':
+        return PasswordPolicy(
+            min_length=int(os.getenv('MUSICS_PASSWORD_MIN_LENGTH', 8)),
+            max_length=int(os.getenv('MUSICS_PASSWORD_MAX_LENGTH', 128)),
+            allow_spaces=_env_flag('MUSICS_PASSWORD_ALLOW_SPACES', False),
+            require_lowercase=_env_flag('MUSICS_PASSWORD_REQUIRE_LOWERCASE', True),
+            require_uppercase=_env_flag('MUSICS_PASSWORD_REQUIRE_UPPERCASE', False),
+            require_digit=_env_flag('MUSICS_PASSWORD_REQUIRE_DIGIT', False),
+            require_symbol=_env_flag('MUSICS_PASSWORD_REQUIRE_SYMBOL', False),
+        )
+
+    def validate(self, value: str) -> bool:
+        if not self.min_length <= len(value) <= self.max_length:
+            return False
+        if not self.allow_spaces and any(c.isspace() for c in value):
+            return False
+        return all(regex.search(value) for rule, regex in self.__classes.items() if getattr(self, rule))
+
+
+PASSWORD_POLICY = PasswordPolicy.from_env()
+
+
 @typechecked
 @dataclass(frozen=True, order=True)
 class Password:
     value: str
 
     def __post_init__(self):
-        schema = PasswordValidator()
-        schema \
-            .min(8) \
-            .max(128) \
-            .has().no().spaces() \
-            .has().lowercase() \
-            .has(r'[\@|\!|\.|\-]*')
-        validation = schema.validate(self.value)
-        if (not validation):
+        if not PASSWORD_POLICY.validate(self.value):
             raise ValueError("Password isn't valid")
 
 
@@ -193,8 +269,8 @@ class CD:
     price: Price
     id: Optional['ID'] = field(default=ID(1898989))
     published_by: Optional['Username'] = field(default=Username('music-library'))
-    created_at: Optional['datetime'] = field(default=datetime.now())
-    updated_at: Optional['datetime'] = field(default=datetime.now())
+    created_at: Optional['datetime'] = field(default_factory=datetime.now)
+    updated_at: Optional['datetime'] = field(default_factory=datetime.now)
 
     # Music.create(...)
 
@@ -1,11 +1,19 @@
+import os
+import re
+from datetime import datetime
+
 from musics_library.domain import CD, ID, Name, Artist, RecordCompany, Genre, EANCode, Username, Price
-from dateutil import parser
 import musics_library.services as services
 
+# the musics api validates every field before storing it, its payloads can skip the client side checks
+TRUSTED_API = os.getenv('MUSICS_TRUSTED_API', '').lower() in ('1', 'true', 'yes')
+
 
 class CDMapper:
     @staticmethod
     def map_cd(res):
+        from dateutil import parser
+
         created_at = parser.parse(res['created_at'])
         updated_at = parser.parse(res['updated_at'])
         cd = CD(
@@ -23,6 +31,76 @@ class CDMapper:
         return cd
 
 
+class FastCDMapper:
+    # DRF always emits ISO-8601 dates, fromisoformat parses them far faster than dateutil.
+    # In trusted mode the value objects are built without running their validation.
+    __price_pattern = re.compile(r'(\d{1,11})(?:\.(\d{2}))?')
+
+    @staticmethod
+    def parse_datetime(value: str) -> datetime:
+        if value.endswith('Z'):
+            value = value[:-1] + '+00:00'
+        return datetime.fromisoformat(value)
+
+    @staticmethod
+    def __trusted(cls, value):
+        instance = object.__new__(cls)
+        object.__setattr__(instance, 'value', value)
+        return instance
+
+    @staticmethod
+    def __price_in_cents(value: str) -> int:
+        n = FastCDMapper.__price_pattern.fullmatch(value)
+        if n is None:
+            return Price.parse(value).value_in_cents
+        return int(n.group(1)) * 100 + int(n.group(2) or 0)
+
+    @staticmethod
+    def map_cd(res, trusted: bool = None):
+        if trusted is None:
+            trusted = TRUSTED_API
+        created_at = FastCDMapper.parse_datetime(res['created_at'])
+        updated_at = FastCDMapper.parse_datetime(res['updated_at'])
+        if not trusted:
+            return CD(
+                id=ID(res['id']),
+                name=Name(res['name']),
+                artist=Artist.of(res['artist']),
+                record_company=RecordCompany.of(res['record_company']),
+                genre=Genre.of(res['genre']),
+                ean_code=EANCode(res['ean_code']),
+                published_by=Username.of(res['user']),
+                price=Price.parse(res['price']),
+                created_at=created_at,
+                updated_at=updated_at
+            )
+        return FastCDMapper.trusted_cd(res['id'], res['name'], res['artist'], res['record_company'], res['genre'],
+                                       res['ean_code'], res['user'], FastCDMapper.__price_in_cents(res['price']),
+                                       created_at, updated_at)
+
+    @staticmethod
+    def trusted_cd(id: int, name: str, artist: str, record_company: str, genre: str, ean_code: str,
+                   published_by: str, price_in_cents: int, created_at: datetime, updated_at: datetime) -> CD:
+        # builds a CD out of values that are known to be valid, no validation is run
+        value_of = FastCDMapper.__trusted
+        price = object.__new__(Price)
+        object.__setattr__(price, 'value_in_cents', price_in_cents)
+        cd = object.__new__(CD)
+        cd.__dict__.update(
+            id=value_of(ID, id),
+            name=value_of(Name, name),
+            artist=value_of(Artist, artist),
+            record_company=value_of(RecordCompany, record_company),
+            genre=value_of(Genre, genre),
+            ean_code=value_of(EANCode, ean_code),
+            published_by=value_of(Username, published_by),
+            price=price,
+            created_at=created_at,
+            updated_at=updated_at
+        )
+        return cd
+
+
 class AuthenticatedUserMapper:
     @staticmethod
     def map_auth_user(res):
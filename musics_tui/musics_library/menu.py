@@ -1,6 +1,5 @@
 from dataclasses import dataclass, field, InitVar
 from typing import Callable, List, Dict, Any, Optional
-from art import tprint
 from typeguard import typechecked
 from valid8 import validate
 from musics_library.exceptions import AppException
@@ -98,6 +97,8 @@ class Menu:
         object.__setattr__(self, "is_running", False)
 
     def run(self) -> None:
+        from art import tprint
+
         tprint(self.description.value)
         while self.is_running:
             self.__print()
@@ -0,0 +1,90 @@
+import os
+from typing import TYPE_CHECKING, Iterable, List, Optional
+
+from musics_library.collection import CDCollection
+from musics_library.domain import CD
+
+if TYPE_CHECKING:
+    from rich.table import Table
+
+PAGE_SIZE = int(os.getenv('MUSICS_PAGE_SIZE', 20))
+COLUMNS = ['#', 'NAME', 'ARTIST', 'RECORD COMPANY', 'GENRE', 'EANCODE', 'PRICE', 'PUBLISHED BY', 'CREATED AT',
+           'UPDATED AT']
+
+
+def cd_row(cd: CD) -> tuple:
+    return (str(cd.id.value), cd.name.value, cd.artist.value, cd.record_company.value, cd.genre.value,
+            cd.ean_code.value, str(cd.price), cd.published_by.value, cd.createdat, cd.updatedat)
+
+
+def cd_table(title: str, cds: Iterable[CD]) -> 'Table':
+    from rich.table import Table
+
+    table = Table(title=title)
+    for col in COLUMNS:
+        table.add_column(col, justify="center", style="cyan")
+    for cd in cds:
+        table.add_row(*cd_row(cd))
+    return table
+
+
+class CDPager:
+    # shows a listing one window at a time, rows are pulled from cds only when a page needs them and the
+    # ones already seen are kept in a compact CDCollection so that prev and jump don't hit the api again
+    def __init__(self, cds: Iterable[CD], page_size: int = PAGE_SIZE):
+        self.page_size = page_size
+        self.current = 0
+        self.__source = iter(cds)
+        self.__seen = CDCollection()
+        self.__exhausted = False
+
+    def __pull(self, rows: int) -> None:
+        while not self.__exhausted and len(self.__seen) < rows:
+            try:
+                self.__seen.append(next(self.__source))
+            except StopIteration:
+                self.__exhausted = True
+
+    @property
+    def page_count(self) -> Optional[int]:
+        # known only once the source has been consumed
+        if not self.__exhausted:
+            return None
+        return max(1, -(-len(self.__seen) // self.page_size))
+
+    def page(self, number: int) -> List[CD]:
+        start = number * self.page_size
+        self.__pull(start + self.page_size + 1)  # one row ahead tells whether a next page exists
+        return list(self.__seen[start:start + self.page_size])
+
+    @property
+    def has_next(self) -> bool:
+        self.__pull((self.current + 1) * self.page_size + 1)
+        return len(self.__seen) > (self.current + 1) * self.page_size
+
+    @property
+    def has_prev(self) -> bool:
+        return self.current > 0
+
+    def next(self) -> List[CD]:
+        if self.has_next:
+            self.current += 1
+        return self.page(self.current)
+
+    def prev(self) -> List[CD]:
+        if self.has_prev:
+            self.current -= 1
+        return self.page(self.current)
+
+    def jump(self, number: int) -> List[CD]:
+        # pages are numbered from 0, jumping past the end stops on the last page
+        self.__pull((max(number, 0) + 1) * self.page_size)
+        last = max(0, (len(self.__seen) - 1) // self.page_size)
+        self.current = min(max(number, 0), last)
+        return self.page(self.current)
+
+    def render(self) -> 'Table':
+        cds = self.page(self.current)
+        count = self.page_count
+        title = f"CDs - page {self.current + 1}" + (f" of {count}" if count is not None else "")
+        return cd_table(title, cds)
@@ -1,19 +1,28 @@
+import json
 import os
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import List
+from typing import Any, Iterator, Optional, Union
 
-import requests
-from dotenv import load_dotenv
 from typeguard import typechecked
 
+import musics_library.collection as collection
+from musics_library.cache import ReadCache, LIST_KEY, detail_key
 import musics_library.mappers as mappers
+import musics_library.store as mirror
 from musics_library.domain import Username, Password, CD, Artist, Name, ID
 from musics_library.exceptions import ApiException
+from musics_library.transport import transport
 
-load_dotenv()
 
 music_endpoint = os.getenv('MUSIC_ENDPOINT')
 auth_endpoint = os.getenv('AUTH_ENDPOINT')
+# seconds after which a read refreshes the local mirror before answering
+mirror_max_age = float(os.getenv('MUSICS_MIRROR_MAX_AGE', 60))
+# urls whose validators and payload are remembered for conditional requests
+CONDITIONAL_GET_SIZE = int(os.getenv('MUSICS_CONDITIONAL_GET_SIZE', 64))
 
 
 
@@ -42,11 +51,87 @@ DELETE_ERROR = "CD DELETE FAILED"
 PERMISSION_ADD_ERROR = "You must be publisher, register on website."
 PERMISSION_ERROR = "You must be the publisher of this record."
 
+
+class ConditionalGet:
+    # remembers the ETag/Last-Modified validators of every url and sends them back,
+    # on 304 the payload received with them is reused and nothing is downloaded,
+    # the least recently used url is forgotten beyond max_entries
+    def __init__(self, max_entries: int = CONDITIONAL_GET_SIZE):
+        self.max_entries = max_entries
+        self.__entries: 'OrderedDict[str, tuple]' = OrderedDict()
+
+    def get(self, url: str, error: str):
+        entry = self.__entries.get(url)
+        headers = {}
+        if entry is not None:
+            self.__entries.move_to_end(url)
+            etag, last_modified, _ = entry
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        try:
+            res = transport.get(url=url, headers=headers)
+        except:
+            raise ApiException(CONNECTION_ERROR)
+        if res.status_code == 304 and entry is not None:
+            return entry[2]
+        if res.status_code != 200:
+            raise ApiException(error)
+        payload = res.json()
+        etag = res.headers.get('ETag')
+        last_modified = res.headers.get('Last-Modified')
+        if etag or last_modified:
+            self.__entries[url] = (etag, last_modified, payload)
+            self.__entries.move_to_end(url)
+            while len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+        else:
+            self.__entries.pop(url, None)
+        return payload
+
+    def __len__(self):
+        return len(self.__entries)
+
+
+conditional_get = ConditionalGet()
+
+
+def _fetch_cd_page(url: str):
+    return conditional_get.get(url, GET_ERROR)
+
+
+def _walk_cd_pages(page) -> Iterator[CD]:
+    while True:
+        for i in page['results']:
+            yield mappers.FastCDMapper.map_cd(i)
+        if not page['next']:
+            return
+        page = _fetch_cd_page(page['next'])
+
+
+def fetch_cd_pages(url: str) -> Iterator[CD]:
+    # the first page is fetched eagerly so that errors are raised by the caller,
+    # the following ones are requested lazily while the generator is consumed
+    return _walk_cd_pages(_fetch_cd_page(url))
+
+
+def cd_to_dict(cd: CD):
+    return {
+        "name": cd.name.value,
+        "artist": cd.artist.value,
+        "record_company": cd.record_company.value,
+        "genre": cd.genre.value,
+        "ean_code": cd.ean_code.value,
+        "price": str(cd.price)
+    }
+
+
 class AuthenticationService:
     # User
     def login(self, username: Username, password: Password):
         try:
-            res = requests.post(url=auth_endpoint + "login/", json={"username": username.value \
+            res = transport.post(url=auth_endpoint + "login/", json={"username": username.value \
                 , "password": password.value})
         except:
             raise ApiException(CONNECTION_ERROR)
@@ -54,62 +139,68 @@ class AuthenticationService:
             raise ApiException(LOGIN_ERROR)
 
         authenticated_user = mappers.AuthenticatedUserMapper.map_auth_user(res)
+        transport.authenticate(authenticated_user.key)
         return authenticated_user
 
     def logout(self, auth_user: AuthenticatedUser):
         try:
-            res = requests.post(url=auth_endpoint + "logout/", headers={'Authorization': f'Token {auth_user.key}'})
+            res = transport.post(url=auth_endpoint + "logout/", headers={'Authorization': f'Token {auth_user.key}'})
         except:
             raise ApiException(CONNECTION_ERROR)
         if res.status_code != 200:
             raise ApiException(LOGOUT_ERROR)
+        transport.clear_authentication()
         return res.json()
 
 
 class CDService:
     authenticated_user = AuthenticatedUser
 
-    def __to_dict(self, cd: CD):
-        return {
-            "name": cd.name.value,
-            "artist": cd.artist.value,
-            "record_company": cd.record_company.value,
-            "genre": cd.genre.value,
-            "ean_code": cd.ean_code.value,
-            "price": str(cd.price)
-        }
-
     def fetch_cd_list(self):
+        return fetch_cd_pages(music_endpoint)
+
+    def stream_cd_list(self) -> Iterator[CD]:
         try:
-            res = requests.get(url=music_endpoint)
+            res = transport.get(url=music_endpoint + "export/?format=ndjson", stream=True)
         except:
             raise ApiException(CONNECTION_ERROR)
         if res.status_code != 200:
+            res.close()
             raise ApiException(GET_ERROR)
-        cds = []
-        for i in res.json():
-            cd = mappers.CDMapper.map_cd(i)
-            cds.append(cd)
-        return cds
-
-    def fetch_cd_detail(self, cd_id: ID):
+        return self.__read_cd_lines(res)
+
+    @staticmethod
+    def __read_cd_lines(res) -> Iterator[CD]:
+        with res:
+            for line in res.iter_lines():
+                if line:
+                    yield mappers.FastCDMapper.map_cd(json.loads(line))
+
+    def fetch_changes(self, token: Optional[str]):
+        # http://localhost:8000/api/v1/musics/changes?since=token
+        url = music_endpoint + "changes" + ("?since=" + token if token else "")
         try:
-            res = requests.get(url=music_endpoint + str(cd_id.value) + "/")
+            res = transport.get(url=url)
         except:
             raise ApiException(CONNECTION_ERROR)
         if res.status_code != 200:
-            raise ApiException(GET_DETAIL_ERROR)
+            raise ApiException(GET_ERROR)
+        changes = res.json()
+        changed = [mappers.FastCDMapper.map_cd(i) for i in changes['changed']]
+        deleted = [ID(i) for i in changes['deleted']]
+        return changed, deleted, changes['token'], changes['has_more']
 
-        i = res.json()
-        cd = mappers.CDMapper.map_cd(i)
+    def fetch_cd_detail(self, cd_id: ID):
+        i = conditional_get.get(music_endpoint + str(cd_id.value) + "/", GET_DETAIL_ERROR)
+        cd = mappers.FastCDMapper.map_cd(i)
         return cd
 
     def add_cd(self, cd: CD, auth_user: AuthenticatedUser):
-        dict = self.__to_dict(cd)
+        dict = cd_to_dict(cd)
         dict['published_by'] = auth_user.id.value
 
         try:
-            res = requests.post(url=music_endpoint, headers={'Authorization': f'Token {auth_user.key}'},
+            res = transport.post(url=music_endpoint, headers={'Authorization': f'Token {auth_user.key}'},
                                 json=dict)
         except:
             raise ApiException(CONNECTION_ERROR)
@@ -117,16 +208,16 @@ class CDService:
             raise ApiException(PERMISSION_ADD_ERROR)
         if res.status_code != 201:
             raise ApiException(POST_ERROR)
-        cd2 = mappers.CDMapper.map_cd(res.json())
+        cd2 = mappers.FastCDMapper.map_cd(res.json())
         return cd2
 
     def update_cd(self, cd: CD, auth_user: AuthenticatedUser):
-        dict = self.__to_dict(cd)
+        dict = cd_to_dict(cd)
         dict['id'] = cd.id.value
         dict['published_by'] = auth_user.id.value
         try:
 
-            res = requests.put(url=music_endpoint + str(cd.id) + "/",
+            res = transport.put(url=music_endpoint + str(cd.id) + "/",
                                headers={'Authorization': f'Token {auth_user.key}'},
                                json=dict)
         except:
@@ -140,7 +231,7 @@ class CDService:
 
     def remove_cd(self, cd_id: ID, auth_user: AuthenticatedUser):
         try:
-            res = requests.delete(url=music_endpoint + str(cd_id.value) + "/",
+            res = transport.delete(url=music_endpoint + str(cd_id.value) + "/",
                                   headers={'Authorization': f'Token {auth_user.key}'})
         except:
             raise ApiException(CONNECTION_ERROR)
@@ -154,49 +245,19 @@ class CDService:
 class CDByArtistService():
     # http://localhost:8000/api/v1/musics/byartist?artist=ciccio
     def fetch_cd_by_artist_list(self, artist_name: Artist):
-        try:
-            res = requests.get(url=music_endpoint + "byartist?artist=" + artist_name.value)
-        except:
-            raise ApiException(CONNECTION_ERROR)
-        if res.status_code != 200:
-            raise ApiException(GET_ERROR)
-        cds = []
-        for i in res.json():
-            cd = mappers.CDMapper.map_cd(i)
-            cds.append(cd)
-        return cds
+        return fetch_cd_pages(music_endpoint + "byartist?artist=" + artist_name.value)
 
 
 class CDByPublishedByService():
     # http://localhost:8000/api/v1/musics/by_published_by?published_by=ciccio
     def fetch_cd_by_published_by_list(self, published_by: Username):
-        try:
-            res = requests.get(url=music_endpoint + "by_published_by?publishedby=" + published_by.value)
-        except:
-            raise ApiException(CONNECTION_ERROR)
-        if res.status_code != 200:
-            raise ApiException(GET_ERROR)
-        cds = []
-        for i in res.json():
-            cd = mappers.CDMapper.map_cd(i)
-            cds.append(cd)
-        return cds
+        return fetch_cd_pages(music_endpoint + "by_published_by?publishedby=" + published_by.value)
 
 
 class CDByNameService():
     # http://localhost:8000/api/v1/musics/byname?name=ciccio
     def fetch_cds_by_name_list(self, cd_name: Name):
-        try:
-            res = requests.get(url=music_endpoint + "byname?name=" + cd_name.value)
-        except:
-            raise ApiException(CONNECTION_ERROR)
-        if res.status_code != 200:
-            raise ApiException(GET_ERROR)
-        cds = []
-        for i in res.json():
-            cd = mappers.CDMapper.map_cd(i)
-            cds.append(cd)
-        return cds
+        return fetch_cd_pages(music_endpoint + "byname?name=" + cd_name.value)
 
 
 @typechecked
@@ -206,27 +267,95 @@ class CDLibrary:
     cd_by_artists_service: CDByArtistService = field(default_factory=CDByArtistService, init=False)
     cd_by_published_by_service: CDByPublishedByService = field(default_factory=CDByPublishedByService,init=False)
     cd_by_name_service: CDByNameService = field(default_factory=CDByNameService, init=False)
+    store: 'mirror.CDStore' = field(default_factory=lambda: mirror.CDStore())
+    read_cache: ReadCache = field(default_factory=ReadCache)
+    # one sync pages the changes feed at a time, whether started by the app thread, a stale read or a write
+    sync_lock: Any = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    @staticmethod
+    def __result(cds: Iterator[CD], columnar: bool) -> 'Union[Iterator[CD], collection.CDCollection]':
+        # large listings can be collected into a compact columnar CDCollection instead of being streamed
+        return collection.CDCollection(cds) if columnar else cds
+
+    def __mirrored(self) -> bool:
+        # reads are answered by the local mirror once it has been synced, a stale mirror is refreshed first
+        # and keeps answering with the last known catalogue when the api can't be reached
+        synced_at = self.store.synced_at
+        if synced_at is None:
+            return False
+        if time.time() - synced_at > mirror_max_age:
+            try:
+                self.sync()
+            except ApiException:
+                pass
+        return True
 
-    def cds(self) -> 'List[CD]':
-        return self.cd_service.fetch_cd_list()
+    def cds(self, columnar: bool = False) -> 'Union[Iterator[CD], collection.CDCollection]':
+        if self.__mirrored():
+            return self.__result(iter(self.store.cds()), columnar)
+        return self.__result(self.read_cache.iterate(LIST_KEY, self.cd_service.fetch_cd_list), columnar)
+
+    def sync(self) -> int:
+        # applies the changes published since the last sync to the local store, returns how many were applied
+        applied = 0
+        has_more = True
+        with self.sync_lock:
+            while has_more:
+                changed, deleted, token, has_more = self.cd_service.fetch_changes(self.store.token)
+                self.store.apply(changed, deleted, token, complete=not has_more)
+                applied += len(changed) + len(deleted)
+        return applied
+
+    def __sync_after_write(self) -> None:
+        if self.store.synced_at is not None:
+            try:
+                self.sync()
+            except ApiException:
+                pass
 
     def cd(self, id: ID) -> 'CD':
-        return self.cd_service.fetch_cd_detail(id)
+        if self.__mirrored():
+            cd = self.store.cd(id)
+            if cd is not None:
+                return cd
+        return self.read_cache.get(detail_key(id), lambda: self.cd_service.fetch_cd_detail(id))
 
     def add_cd(self, cd: CD, auth_user: AuthenticatedUser) -> 'CD':
-        return self.cd_service.add_cd(cd, auth_user)
+        added = self.cd_service.add_cd(cd, auth_user)
+        self.read_cache.invalidate_cd(added.id, [added])
+        self.__sync_after_write()
+        return added
 
     def update_cd(self, cd: CD, auth_user: AuthenticatedUser) -> bool:
-        return self.cd_service.update_cd(cd, auth_user)
+        previous = self.read_cache.peek(detail_key(cd.id))
+        updated = self.cd_service.update_cd(cd, auth_user)
+        self.read_cache.invalidate_cd(cd.id, [version for version in (previous, cd) if version is not None])
+        self.__sync_after_write()
+        return updated
 
     def remove_cd(self, id: ID, auth_user: AuthenticatedUser) -> bool:
-        return self.cd_service.remove_cd(id, auth_user)
-
-    def cds_by_artist(self, artist: Artist) -> 'List[CD]':
-        return self.cd_by_artists_service.fetch_cd_by_artist_list(artist)
-
-    def cds_by_published_by(self, published_by: Username) -> 'List[CD]':
-        return self.cd_by_published_by_service.fetch_cd_by_published_by_list(published_by)
-
-    def cds_by_cd_name(self, cd_name: Name) -> 'List[CD]':
-        return self.cd_by_name_service.fetch_cds_by_name_list(cd_name)
+        removed = self.cd_service.remove_cd(id, auth_user)
+        self.read_cache.invalidate_cd(id)
+        self.__sync_after_write()
+        return removed
+
+    def cds_by_artist(self, artist: Artist, columnar: bool = False) -> 'Union[Iterator[CD], collection.CDCollection]':
+        if self.__mirrored():
+            return self.__result(iter(self.store.search('artist', artist.value)), columnar)
+        cds = self.read_cache.iterate(('artist', artist.value),
+                                      lambda: self.cd_by_artists_service.fetch_cd_by_artist_list(artist))
+        return self.__result(cds, columnar)
+
+    def cds_by_published_by(self, published_by: Username, columnar: bool = False) -> 'Union[Iterator[CD], collection.CDCollection]':
+        if self.__mirrored():
+            return self.__result(iter(self.store.search('published_by', published_by.value)), columnar)
+        cds = self.read_cache.iterate(('published_by', published_by.value),
+                                      lambda: self.cd_by_published_by_service.fetch_cd_by_published_by_list(published_by))
+        return self.__result(cds, columnar)
+
+    def cds_by_cd_name(self, cd_name: Name, columnar: bool = False) -> 'Union[Iterator[CD], collection.CDCollection]':
+        if self.__mirrored():
+            return self.__result(iter(self.store.search('name', cd_name.value)), columnar)
+        cds = self.read_cache.iterate(('name', cd_name.value),
+                                      lambda: self.cd_by_name_service.fetch_cds_by_name_list(cd_name))
+        return self.__result(cds, columnar)
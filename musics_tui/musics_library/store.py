@@ -0,0 +1,127 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+
+import musics_library.mappers as mappers
+from musics_library.domain import CD, ID
+
+
+
+def _default_mirror_path() -> str:
+    # the mirror outlives the app: the next launch only syncs what changed and reads work offline
+    if os.name == 'nt':
+        base = os.getenv('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.getenv('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(base, 'musics_library', 'mirror.sqlite3')
+
+
+# ':memory:' keeps the mirror for the current process only, the tests use it
+MIRROR_PATH = os.getenv('MUSICS_MIRROR_PATH') or _default_mirror_path()
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cd (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    record_company TEXT NOT NULL,
+    genre TEXT NOT NULL,
+    ean_code TEXT NOT NULL,
+    published_by TEXT NOT NULL,
+    price INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cd_artist_idx ON cd (artist COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS cd_name_idx ON cd (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS cd_published_by_idx ON cd (published_by COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+'''
+COLUMNS = 'id, name, artist, record_company, genre, ean_code, published_by, price, created_at, updated_at'
+SEARCHABLE = ('artist', 'name', 'published_by')
+# rows mapped per query while a listing is read
+FETCH_SIZE = 100
+
+
+def _like(term: str) -> str:
+    # same semantic as the api icontains lookups
+    return '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+class CDStore:
+    # local SQLite mirror of the catalogue kept up to date by CDLibrary.sync(), it survives restarts unless
+    # MUSICS_MIRROR_PATH is ':memory:'
+    def __init__(self, path: str = MIRROR_PATH):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        with self.__lock, self.__connection:
+            self.__connection.executescript(SCHEMA)
+
+    def __meta(self, key: str) -> Optional[str]:
+        row = self.__connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def token(self) -> Optional[str]:
+        with self.__lock:
+            return self.__meta('token')
+
+    @property
+    def synced_at(self) -> Optional[float]:
+        with self.__lock:
+            synced_at = self.__meta('synced_at')
+        return float(synced_at) if synced_at is not None else None
+
+    def apply(self, changed: List[CD], deleted: List[ID], token: str, complete: bool = True) -> None:
+        # synced_at only moves once the last page of a sync is applied, an interrupted sync resumes from token
+        # but doesn't make a partial mirror answer the reads
+        rows = [(cd.id.value, cd.name.value, cd.artist.value, cd.record_company.value, cd.genre.value,
+                 cd.ean_code.value, cd.published_by.value, cd.price.value_in_cents, cd.created_at.isoformat(),
+                 cd.updated_at.isoformat()) for cd in changed]
+        with self.__lock, self.__connection:
+            self.__connection.executemany(f'INSERT OR REPLACE INTO cd ({COLUMNS}) VALUES (?,?,?,?,?,?,?,?,?,?)', rows)
+            self.__connection.executemany('DELETE FROM cd WHERE id = ?', [(cd_id.value,) for cd_id in deleted])
+            meta = [('token', token)] + ([('synced_at', repr(time.time()))] if complete else [])
+            self.__connection.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', meta)
+
+    def __select(self, condition: str = '1', params: Iterable = ()) -> Iterator[CD]:
+        # rows are read FETCH_SIZE at a time in id order, no cursor is left open between two batches so that
+        # a sync can write while a listing is being paged; the rows were validated when they were first mapped
+        last_id = -1
+        while True:
+            with self.__lock:
+                rows = self.__connection.execute(
+                    f'SELECT {COLUMNS} FROM cd WHERE ({condition}) AND id > ? ORDER BY id LIMIT ?',
+                    (*params, last_id, FETCH_SIZE)).fetchall()
+            for row in rows:
+                yield mappers.FastCDMapper.trusted_cd(*row[:8], datetime.fromisoformat(row[8]),
+                                                      datetime.fromisoformat(row[9]))
+            if len(rows) < FETCH_SIZE:
+                return
+            last_id = rows[-1][0]
+
+    def cds(self) -> Iterator[CD]:
+        return self.__select()
+
+    def cd(self, cd_id: ID) -> Optional[CD]:
+        return next(self.__select('id = ?', (cd_id.value,)), None)
+
+    def search(self, column: str, term: str) -> Iterator[CD]:
+        if column not in SEARCHABLE:
+            raise KeyError(column)
+        return self.__select(f"{column} LIKE ? ESCAPE '\\'", (_like(term),))
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    def __len__(self):
+        with self.__lock:
+            return self.__connection.execute('SELECT COUNT(*) FROM cd').fetchone()[0]
@@ -0,0 +1,87 @@
+import os
+import threading
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+POOL_SIZE = int(os.getenv('MUSICS_POOL_SIZE', 10))
+CONNECT_TIMEOUT = float(os.getenv('MUSICS_CONNECT_TIMEOUT', 3.05))
+READ_TIMEOUT = float(os.getenv('MUSICS_READ_TIMEOUT', 10))
+RETRIES = int(os.getenv('MUSICS_RETRIES', 3))
+BACKOFF_FACTOR = float(os.getenv('MUSICS_BACKOFF_FACTOR', 0.3))
+
+# POST is left out, retrying it could publish the same CD twice
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+RETRY_STATUSES = (502, 503, 504)
+
+
+class Transport:
+    # one keep-alive requests.Session shared by every service, connections to the api are pooled
+    # and reused instead of paying a new TCP (and TLS) handshake on each call. The session, and requests
+    # with it, is only loaded on the first call so that the menu doesn't wait for it at startup
+    def __init__(self, pool_size: int = POOL_SIZE, connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT, retries: int = RETRIES, backoff_factor: float = BACKOFF_FACTOR):
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.__session = None
+        self.__lock = threading.Lock()
+
+    @property
+    def session(self) -> 'requests.Session':
+        with self.__lock:
+            if self.__session is None:
+                self.__session = self.__create_session()
+        return self.__session
+
+    def __create_session(self) -> 'requests.Session':
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(total=self.retries, backoff_factor=self.backoff_factor, allowed_methods=IDEMPOTENT_METHODS,
+                      status_forcelist=RETRY_STATUSES, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def authenticate(self, key: str) -> None:
+        self.session.headers['Authorization'] = f'Token {key}'
+
+    def clear_authentication(self) -> None:
+        if self.__session is not None:
+            self.__session.headers.pop('Authorization', None)
+
+    @property
+    def key(self) -> Optional[str]:
+        if self.__session is None:
+            return None
+        header = self.__session.headers.get('Authorization')
+        return header[len('Token '):] if header else None
+
+    def request(self, method: str, url: str, **kwargs) -> 'requests.Response':
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> 'requests.Response':
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> 'requests.Response':
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> 'requests.Response':
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> 'requests.Response':
+        return self.request('DELETE', url, **kwargs)
+
+    def close(self) -> None:
+        if self.__session is not None:
+            self.__session.close()
+
+
+transport = Transport()
@@ -0,0 +1,22 @@
+import os
+
+import pytest
+
+# read by musics_library.store on import: the tests never touch the mirror of the user
+os.environ['MUSICS_MIRROR_PATH'] = ':memory:'
+
+# wall-clock comparisons depend on the machine and its load, they run only when asked for
+RUN_BENCHMARKS = os.getenv('MUSICS_BENCHMARKS', '').lower() in ('1', 'true', 'yes')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'benchmark: timing comparisons, skipped unless MUSICS_BENCHMARKS=1')
+
+
+def pytest_collection_modifyitems(config, items):
+    if RUN_BENCHMARKS:
+        return
+    skip = pytest.mark.skip(reason='benchmark, set MUSICS_BENCHMARKS=1 to run it')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
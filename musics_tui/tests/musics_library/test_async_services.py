@@ -0,0 +1,212 @@
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from musics_library.async_services import AsyncCDLibrary
+from musics_library.domain import Username, ID, Price, EANCode, Genre, RecordCompany, Artist, Name, CD
+from musics_library.services import AuthenticatedUser, ApiException, GET_DETAIL_ERROR, PERMISSION_ADD_ERROR
+
+PAGE_SIZE = 2
+PREFIX = '/api/v1/musics/'
+
+
+def cd_json(id, artist="Ciao"):
+    return {
+        "id": id,
+        "name": "Mod",
+        "artist": artist,
+        "record_company": "Ciao",
+        "genre": "Rock",
+        "ean_code": "978020137962",
+        "price": "15.00",
+        "price_currency": "EUR",
+        "published_by": 1,
+        "user": "ssdsbm",
+        "created_at": "2022-12-04T17:27:28.325209Z",
+        "updated_at": "2022-12-09T14:13:02.610624Z"
+    }
+
+
+class MusicsApiStandIn:
+    # in-process ASGI stand-in of musics_api, serves an in-memory catalogue and records
+    # how many detail requests are handled concurrently
+    def __init__(self, cds):
+        self.cds = {cd['id']: cd for cd in cds}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        headers = dict(scope['headers'])
+        query = {k: v[0] for k, v in parse_qs(scope['query_string'].decode()).items()}
+        status, payload = await self.handle(scope['method'], scope['path'][len(PREFIX):], query,
+                                            headers.get(b'authorization') == b'Token kkbb', body)
+        content = json.dumps(payload).encode() if payload is not None else b''
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'application/json')]})
+        await send({'type': 'http.response.body', 'body': content})
+
+    def page(self, cds, path, query):
+        start = int(query.get('page', 0))
+        end = start + PAGE_SIZE
+        next_url = None
+        if end < len(cds):
+            sep = '&' if path.count('?') else '?'
+            next_url = f'http://localhost:8000{PREFIX}{path}{sep}page={end}'
+        return {'next': next_url, 'previous': None, 'results': cds[start:end]}
+
+    async def handle(self, method, path, query, authorized, body):
+        if path == '' and method == 'GET':
+            return 200, self.page(list(self.cds.values()), '', query)
+        if path == '' and method == 'POST':
+            if not authorized:
+                return 403, {}
+            return 201, dict(cd_json(max(self.cds) + 1), **json.loads(body))
+        if path == 'byartist' and method == 'GET':
+            cds = [cd for cd in self.cds.values() if cd['artist'] == query['artist']]
+            return 200, self.page(cds, 'byartist?artist=' + query['artist'], query)
+        cd_id = int(path.rstrip('/'))
+        if cd_id not in self.cds:
+            return 404, {}
+        if method == 'GET':
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            return 200, self.cds[cd_id]
+        if not authorized:
+            return 403, {}
+        if method == 'PUT':
+            return 200, self.cds[cd_id]
+        del self.cds[cd_id]
+        return 204, None
+
+
+@pytest.fixture
+def api():
+    return MusicsApiStandIn([cd_json(i, artist="Ciao" if i % 2 else "Blur") for i in range(1, 21)])
+
+
+def library(api, max_concurrency=4):
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=api))
+    return AsyncCDLibrary(client=client, max_concurrency=max_concurrency)
+
+
+def auth_user(key="kkbb"):
+    return AuthenticatedUser(key, ID(1), Username("ciao"), True, True)
+
+
+def new_cd():
+    return CD(id=ID(1), name=Name("Mod"), artist=Artist("Ciao"), record_company=RecordCompany("Ciao"),
+              genre=Genre("Rock"), ean_code=EANCode("978020137962"), price=Price.parse("15.00"))
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_async_cd_library_cds_walks_every_page(api):
+    async def collect():
+        async with library(api) as lib:
+            return [cd.id async for cd in lib.cds()]
+    assert run(collect()) == [ID(i) for i in range(1, 21)]
+
+
+def test_async_cd_library_cds_by_artist(api):
+    async def collect():
+        async with library(api) as lib:
+            return [cd.artist async for cd in lib.cds_by_artist(Artist("Blur"))]
+    assert run(collect()) == [Artist("Blur")] * 10
+
+
+def test_async_cd_library_cd(api):
+    async def fetch():
+        async with library(api) as lib:
+            return await lib.cd(ID(3))
+    assert run(fetch()).id == ID(3)
+
+
+def test_async_cd_library_cd_not_found_raises_exception(api):
+    async def fetch():
+        async with library(api) as lib:
+            return await lib.cd(ID(99))
+    with pytest.raises(ApiException, match=GET_DETAIL_ERROR):
+        run(fetch())
+
+
+def test_async_cd_library_gather_cds_keeps_order_and_bounds_concurrency(api):
+    ids = [ID(i) for i in range(20, 0, -1)]
+
+    async def gather():
+        async with library(api, max_concurrency=4) as lib:
+            return await lib.gather_cds(ids)
+    assert [cd.id for cd in run(gather())] == ids
+    assert api.max_in_flight == 4
+
+
+def test_async_cd_library_sequential_lookups_do_not_overlap(api):
+    async def sequential():
+        async with library(api) as lib:
+            for id in range(1, 6):
+                await lib.cd(ID(id))
+    run(sequential())
+    assert api.max_in_flight == 1
+
+
+@pytest.mark.benchmark
+def test_async_cd_library_gather_cds_is_faster_than_sequential_lookups(api):
+    ids = [ID(i) for i in range(1, 21)]
+
+    async def sequential():
+        async with library(api) as lib:
+            start = asyncio.get_running_loop().time()
+            for id in ids:
+                await lib.cd(id)
+            return asyncio.get_running_loop().time() - start
+
+    async def gathered():
+        async with library(api) as lib:
+            start = asyncio.get_running_loop().time()
+            await lib.gather_cds(ids)
+            return asyncio.get_running_loop().time() - start
+    assert run(gathered()) < run(sequential())
+
+
+def test_async_cd_library_add_update_remove_cd(api):
+    async def write():
+        async with library(api) as lib:
+            added = await lib.add_cd(new_cd(), auth_user())
+            updated = await lib.update_cd(new_cd(), auth_user())
+            removed = await lib.remove_cd(ID(1), auth_user())
+            return added, updated, removed
+    added, updated, removed = run(write())
+    assert added.id == ID(21)
+    assert updated and removed
+    assert 1 not in api.cds
+
+
+def test_async_cd_library_add_cd_without_permission_raises_exception(api):
+    async def write():
+        async with library(api) as lib:
+            return await lib.add_cd(new_cd(), auth_user("unknown"))
+    with pytest.raises(ApiException, match=PERMISSION_ADD_ERROR):
+        run(write())
+
+
+def test_async_cd_library_connection_error_raises_api_exception():
+    def refuse(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    async def fetch():
+        async with AsyncCDLibrary(client=httpx.AsyncClient(transport=httpx.MockTransport(refuse))) as lib:
+            return await lib.cd(ID(1))
+    with pytest.raises(ApiException):
+        run(fetch())
@@ -0,0 +1,94 @@
+from musics_library.cache import ReadCache, LIST_KEY, detail_key
+from musics_library.domain import Username, ID, Price, EANCode, Genre, RecordCompany, Artist, Name, CD
+
+
+def cd(id, name="Mod", artist="Ciao"):
+    return CD(id=ID(id), name=Name(name), artist=Artist(artist), record_company=RecordCompany("Ciao"),
+              genre=Genre("Rock"), ean_code=EANCode("978020137962"), price=Price.parse("15.00"),
+              published_by=Username("ssdsbm"))
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_read_cache_hits_until_ttl_expires():
+    clock = Clock()
+    cache = ReadCache(ttl=10, clock=clock)
+    loads = []
+    load = lambda: loads.append(1) or len(loads)
+    assert cache.get('k', load) == 1
+    clock.now = 9
+    assert cache.get('k', load) == 1
+    clock.now = 10
+    assert cache.get('k', load) == 2
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+
+
+def test_read_cache_evicts_least_recently_used():
+    cache = ReadCache(max_entries=2)
+    cache.get('a', lambda: 'a')
+    cache.get('b', lambda: 'b')
+    cache.get('a', lambda: 'a')
+    cache.get('c', lambda: 'c')
+    assert cache.peek('b') is None
+    assert cache.peek('a') == 'a' and cache.peek('c') == 'c'
+    assert cache.stats()['evictions'] == 1
+
+
+def test_read_cache_does_not_store_failed_loads():
+    cache = ReadCache()
+
+    def fail():
+        raise RuntimeError()
+    try:
+        cache.get('k', fail)
+    except RuntimeError:
+        pass
+    assert len(cache) == 0
+
+
+def test_read_cache_iterate_keeps_a_listing_only_once_it_is_read_to_the_end():
+    cache = ReadCache()
+    listing = [cd(1), cd(2)]
+    cds = cache.iterate(LIST_KEY, lambda: listing)
+    assert next(cds) == listing[0]
+    assert cache.peek(LIST_KEY) is None
+    assert list(cds) == listing[1:]
+    assert cache.peek(LIST_KEY) == listing
+    assert list(cache.iterate(LIST_KEY, lambda: [])) == listing
+
+
+def test_read_cache_iterate_drops_a_listing_invalidated_while_it_was_read():
+    cache = ReadCache()
+    cds = cache.iterate(LIST_KEY, lambda: [cd(1), cd(2)])
+    next(cds)
+    cache.invalidate_cd(ID(2))
+    list(cds)
+    assert cache.peek(LIST_KEY) is None
+
+
+def test_invalidate_cd_drops_exactly_the_affected_keys():
+    cache = ReadCache()
+    cache.get(detail_key(ID(1)), lambda: cd(1))
+    cache.get(detail_key(ID(2)), lambda: cd(2))
+    cache.get(LIST_KEY, lambda: [cd(1), cd(2)])
+    cache.get(('artist', 'ciao'), lambda: [cd(1), cd(2)])
+    cache.get(('artist', 'blur'), lambda: [])
+    cache.get(('artist', 'oasis'), lambda: [])
+    cache.get(('name', 'Parklife'), lambda: [])
+
+    cache.invalidate_cd(ID(1), [cd(1, name="Parklife", artist="Blur")])
+
+    assert cache.peek(detail_key(ID(1))) is None
+    assert cache.peek(LIST_KEY) is None
+    assert cache.peek(('artist', 'ciao')) is None
+    assert cache.peek(('artist', 'blur')) is None
+    assert cache.peek(('name', 'Parklife')) is None
+    assert cache.peek(detail_key(ID(2))) is not None
+    assert cache.peek(('artist', 'oasis')) is not None
+    assert cache.stats()['invalidations'] == 5
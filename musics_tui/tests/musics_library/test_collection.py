@@ -0,0 +1,111 @@
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+from musics_library.collection import CDCollection
+from musics_library.domain import Username, ID, Price, EANCode, Genre, RecordCompany, Artist, Name, CD
+from musics_library.mappers import FastCDMapper
+from musics_library.services import CDLibrary
+
+CREATED_AT = datetime(2022, 12, 4, 17, 27, 28, 325209, tzinfo=timezone.utc)
+
+
+def cd(id, name="Mod", artist="Ciao", price="15.00", created_at=CREATED_AT):
+    return CD(id=ID(id), name=Name(name), artist=Artist(artist), record_company=RecordCompany("Ciao"),
+              genre=Genre("Rock"), ean_code=EANCode("978020137962"), price=Price.parse(price),
+              published_by=Username("ssdsbm"), created_at=created_at, updated_at=created_at)
+
+
+def row(i):
+    return (i, f'Name {i}', f'Artist {i % 1000}', f'Label {i % 100}', 'Rock', f'{i:013d}', f'user{i % 50}',
+            1500 + i % 100, CREATED_AT, CREATED_AT)
+
+
+def test_cd_collection_materializes_equal_cds():
+    cds = [cd(1), cd(2, price="9.99"), cd(3, created_at=datetime(2022, 12, 4, 17, 27))]
+    collection = CDCollection(cds)
+    assert len(collection) == 3
+    assert list(collection) == cds
+    assert collection[-1] == cds[-1]
+    assert list(collection[1:]) == cds[1:]
+
+
+def test_cd_collection_interns_strings():
+    collection = CDCollection([cd(1, artist="Blur"), cd(2, artist="Bl" + "ur".lower())])
+    artists = collection.column('artist')
+    assert artists[0] is artists[1]
+
+
+def test_cd_collection_stores_prices_in_cents():
+    collection = CDCollection([cd(1, price="15.00"), cd(2, price="9.99")])
+    assert list(collection.column('price')) == [1500, 999]
+    assert collection.column('price').typecode == 'q'
+
+
+def test_cd_collection_filter_by_column():
+    collection = CDCollection([cd(1, price="15.00"), cd(2, price="9.99"), cd(3, price="5.00")])
+    cheap = collection.filter('price', lambda cents: cents < 1000)
+    assert [c.id for c in cheap] == [ID(2), ID(3)]
+
+
+def test_cd_collection_sort_by_column():
+    collection = CDCollection([cd(1, name="Parklife"), cd(2, name="Animals"), cd(3, name="Mod")])
+    assert [c.name for c in collection.sort('name')] == [Name("Animals"), Name("Mod"), Name("Parklife")]
+    assert [c.id for c in collection.sort('id', reverse=True)] == [ID(3), ID(2), ID(1)]
+
+
+def test_cd_collection_unknown_column_raises_key_error():
+    with pytest.raises(KeyError):
+        CDCollection().sort('label')
+
+
+def test_cd_library_cds_can_return_a_collection(requests_mock):
+    requests_mock.get("http://localhost:8000/api/v1/musics/byartist?artist=Ciao", json={
+        "next": None, "previous": None, "results": [{
+            "id": 1, "name": "Mod", "artist": "Ciao", "record_company": "Ciao", "genre": "Rock",
+            "ean_code": "978020137962", "price": "15.00", "price_currency": "EUR", "published_by": 1,
+            "user": "ssdsbm", "created_at": "2022-12-04T17:27:28.325209Z", "updated_at": "2022-12-04T17:27:28.325209Z"
+        }]})
+    collection = CDLibrary().cds_by_artist(Artist("Ciao"), columnar=True)
+    assert isinstance(collection, CDCollection)
+    assert list(collection) == [cd(1)]
+
+
+def deep_size(objects, seen):
+    size = 0
+    stack = list(objects)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if hasattr(obj, '__dict__'):
+            stack.append(obj.__dict__)
+            stack.extend(obj.__dict__.values())
+    return size
+
+
+def test_cd_collection_bytes_per_row():
+    rows = 5_000
+    collection = CDCollection()
+    for i in range(rows):
+        collection.append_row(*row(i))
+    cds = [FastCDMapper.trusted_cd(*row(i)) for i in range(rows)]
+    # the two unique strings of every row (name, ean code) take most of the 256 bytes
+    assert collection.nbytes() / rows < 256
+    assert collection.nbytes() * 4 < sys.getsizeof(cds) + deep_size(cds, set())
+
+
+@pytest.mark.benchmark
+def test_cd_collection_memory_at_one_million_rows():
+    rows = 1_000_000
+    collection = CDCollection()
+    for i in range(rows):
+        collection.append_row(*row(i))
+
+    sample = 10_000
+    cds = [FastCDMapper.trusted_cd(*row(i)) for i in range(sample)]
+    list_estimate = (sys.getsizeof(cds) + deep_size(cds, set())) * (rows // sample)
+    assert collection.nbytes() * 4 < list_estimate
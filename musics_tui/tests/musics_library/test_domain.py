@@ -1,8 +1,10 @@
+import time
 from datetime import datetime
 
 from valid8 import ValidationError
 
-from musics_library.domain import ID, Password, Name, Artist, RecordCompany, Genre, Username, EANCode, Price, CD
+from musics_library.domain import ID, Password, Name, Artist, RecordCompany, Genre, Username, EANCode, Price, CD, \
+    intern_stats, clear_intern_tables, PasswordPolicy, PASSWORD_POLICY
 import pytest
 
 
@@ -261,3 +263,73 @@ def test_cd_updated_at():
     assert CD(ID(1), Name("Ciao"), Artist("Bino"), RecordCompany("BinoRecord"), Genre("Rock"),
               EANCode("978020137962"), Username("ssdsbm-test"), Price.create(10, 20), datetime.now(),
               datetime.now()).updatedat == datetime.now().strftime('%d-%m-%Y %H:%M')
+
+
+
+# Interning
+@pytest.mark.parametrize("cls, value", [(Artist, "Blur"), (Genre, "Rock"), (RecordCompany, "EMI"),
+                                        (Username, "ssdsbm")])
+def test_interned_value_objects_are_shared(cls, value):
+    clear_intern_tables()
+    first = cls.of(value)
+    assert first == cls(value)
+    assert cls.of(value) is first
+    assert intern_stats()[cls.__name__] == {'hits': 1, 'misses': 1, 'size': 1, 'maxsize': 4096}
+
+
+def test_interned_value_objects_still_validate():
+    clear_intern_tables()
+    for _ in range(2):
+        with pytest.raises(ValidationError):
+            Genre.of("rock")
+    assert intern_stats()['Genre']['size'] == 0
+
+
+def test_intern_table_is_bounded():
+    clear_intern_tables()
+    for i in range(4096 + 10):
+        Artist.of(f"Artist {i}")
+    assert intern_stats()['Artist']['size'] == 4096
+
+
+
+def test_interned_value_objects_validate_each_distinct_value_once(monkeypatch):
+    import musics_library.domain
+    clear_intern_tables()
+    validations = []
+    monkeypatch.setattr(musics_library.domain, 'validate', lambda *args, **kwargs: validations.append(args[1]))
+    artists = [f"Artist {i % 50}" for i in range(2000)]
+    for artist in artists:
+        Artist.of(artist)
+    assert len(validations) == 50
+    assert intern_stats()['Artist']['hits'] == 2000 - 50
+
+
+@pytest.mark.benchmark
+def test_interned_value_objects_are_faster_than_fresh_ones():
+    clear_intern_tables()
+    artists = [f"Artist {i % 50}" for i in range(2000)]
+
+    def timed(build):
+        start = time.perf_counter()
+        for artist in artists:
+            build(artist)
+        return time.perf_counter() - start
+    assert timed(Artist.of) < timed(Artist)
+
+
+
+def test_password_policy_defaults_match_the_password_rules():
+    assert PASSWORD_POLICY == PasswordPolicy()
+    assert PASSWORD_POLICY.validate("Abcd!-@.")
+    assert not PASSWORD_POLICY.validate("ABCDEFGH")
+
+
+def test_password_policy_is_configurable(monkeypatch):
+    monkeypatch.setenv('MUSICS_PASSWORD_MIN_LENGTH', '4')
+    monkeypatch.setenv('MUSICS_PASSWORD_REQUIRE_DIGIT', 'true')
+    monkeypatch.setenv('MUSICS_PASSWORD_REQUIRE_SYMBOL', 'true')
+    policy = PasswordPolicy.from_env()
+    assert policy.validate("ab1!")
+    assert not policy.validate("abcd")
+    assert not policy.validate("ab1d")
@@ -1,4 +1,5 @@
-from musics_library.mappers import CDMapper
+import time
+from musics_library.mappers import CDMapper, FastCDMapper
 from musics_library.domain import *
 import pytest
 
@@ -18,4 +19,78 @@ def test_music_mapper_from_fake_json():
         "user": "ssdsbm2",
         "created_at": str(datetime.now()),
         "updated_at": str(datetime.now())
-    }) == CD(id=ID(39), name=Name("Ciao"), artist=Artist("Ciao"), record_company=RecordCompany("Ciao"), genre=Genre("Ciao"), ean_code=EANCode("978020137962"), price=Price.parse("10.00"), published_by=Username("ssdsbm2"), created_at=datetime.now(), updated_at=datetime.now())
\ No newline at end of file
+    }) == CD(id=ID(39), name=Name("Ciao"), artist=Artist("Ciao"), record_company=RecordCompany("Ciao"), genre=Genre("Ciao"), ean_code=EANCode("978020137962"), price=Price.parse("10.00"), published_by=Username("ssdsbm2"), created_at=datetime.now(), updated_at=datetime.now())
+
+
+def api_cd(id):
+    return {
+        "id": id,
+        "name": "Ciao",
+        "artist": "Ciao2",
+        "record_company": "Ciao",
+        "genre": "Rock",
+        "ean_code": "978020137962",
+        "price": "10.05",
+        "price_currency": "EUR",
+        "published_by": 3,
+        "user": "ssdsbm2",
+        "created_at": "2022-12-04T17:27:28.325209Z",
+        "updated_at": "2022-12-09T14:13:02.610624Z"
+    }
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_fast_mapper_matches_strict_mapper(trusted):
+    cd = FastCDMapper.map_cd(api_cd(39), trusted=trusted)
+    assert cd == CDMapper.map_cd(api_cd(39))
+    assert cd.price.euro == 10 and cd.price.cents == 5
+    assert cd.created_at.tzinfo is not None
+
+
+def test_fast_mapper_parses_naive_iso_dates():
+    payload = dict(api_cd(1), created_at=str(datetime(2022, 12, 4, 17, 27)))
+    assert FastCDMapper.map_cd(payload).created_at == datetime(2022, 12, 4, 17, 27)
+
+
+def test_fast_mapper_validates_untrusted_payloads():
+    with pytest.raises(Exception):
+        FastCDMapper.map_cd(dict(api_cd(1), genre="rock"), trusted=False)
+
+
+def test_fast_mapper_never_calls_dateutil_and_trusted_mode_never_validates(monkeypatch):
+    import dateutil.parser
+    import musics_library.domain
+    validations = []
+
+    def counting_validate(*args, **kwargs):
+        validations.append(args[0])
+        return validate(*args, **kwargs)
+
+    def no_dateutil(*args, **kwargs):
+        raise AssertionError('dateutil called')
+
+    monkeypatch.setattr(musics_library.domain, 'validate', counting_validate)
+    monkeypatch.setattr(dateutil.parser, 'parse', no_dateutil)
+    payloads = [api_cd(i) for i in range(1, 50)]
+    for payload in payloads:
+        FastCDMapper.map_cd(payload, trusted=True)
+    assert validations == []
+    for payload in payloads:
+        FastCDMapper.map_cd(payload, trusted=False)
+    assert validations != []
+
+
+@pytest.mark.benchmark
+def test_fast_mapper_is_faster_than_strict_mapper():
+    payloads = [api_cd(i) for i in range(2000)]
+
+    def timed(map_cd):
+        start = time.perf_counter()
+        for payload in payloads:
+            map_cd(payload)
+        return time.perf_counter() - start
+
+    strict_time = timed(CDMapper.map_cd)
+    fast_time = timed(lambda payload: FastCDMapper.map_cd(payload, trusted=False))
+    trusted_time = timed(lambda payload: FastCDMapper.map_cd(payload, trusted=True))
+    assert trusted_time < fast_time < strict_time
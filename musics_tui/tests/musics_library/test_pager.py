@@ -0,0 +1,96 @@
+import io
+import time
+from datetime import datetime, timezone
+
+import pytest
+from rich.console import Console
+
+from musics_library.domain import ID
+from musics_library.mappers import FastCDMapper
+from musics_library.pager import CDPager, cd_table
+
+CREATED_AT = datetime(2022, 12, 4, 17, 27, tzinfo=timezone.utc)
+
+
+class Source:
+    # generator of CDs that counts how many rows have been pulled
+    def __init__(self, rows):
+        self.rows = rows
+        self.pulled = 0
+
+    def __iter__(self):
+        for i in range(1, self.rows + 1):
+            self.pulled += 1
+            yield FastCDMapper.trusted_cd(i, f'Name {i}', 'Artist', 'Label', 'Rock', '978020137962', 'ssdsbm', 1500,
+                                          CREATED_AT, CREATED_AT)
+
+
+def ids(cds):
+    return [cd.id.value for cd in cds]
+
+
+def test_pager_pulls_only_the_rows_of_the_visible_page():
+    source = Source(1000)
+    pager = CDPager(source, page_size=10)
+    assert ids(pager.page(0)) == list(range(1, 11))
+    assert source.pulled == 11
+    assert pager.page_count is None
+
+
+def test_pager_next_prev_and_jump():
+    pager = CDPager(Source(25), page_size=10)
+    assert not pager.has_prev and pager.has_next
+    assert ids(pager.next()) == list(range(11, 21))
+    assert ids(pager.next()) == list(range(21, 26))
+    assert not pager.has_next
+    assert ids(pager.next()) == list(range(21, 26))
+    assert ids(pager.prev()) == list(range(11, 21))
+    assert ids(pager.jump(0)) == list(range(1, 11))
+    assert ids(pager.jump(99)) == list(range(21, 26))
+    assert pager.current == 2
+    assert pager.page_count == 3
+
+
+def test_pager_does_not_pull_seen_rows_again():
+    source = Source(30)
+    pager = CDPager(source, page_size=10)
+    pager.jump(2)
+    pulled = source.pulled
+    pager.jump(0)
+    assert source.pulled == pulled
+    assert pager.page(0)[0].id == ID(1)
+
+
+def test_pager_renders_the_visible_window():
+    pager = CDPager(Source(25), page_size=10)
+    pager.jump(2)
+    table = pager.render()
+    assert table.row_count == 5
+    assert table.title == "CDs - page 3 of 3"
+
+
+def test_pager_empty_listing():
+    pager = CDPager([], page_size=10)
+    assert pager.render().row_count == 0
+    assert not pager.has_next and pager.page_count == 1
+
+
+def test_pager_first_screen_of_a_large_listing_pulls_one_page():
+    source = Source(100_000)
+    console = Console(file=io.StringIO(), width=200)
+    console.print(CDPager(source, page_size=20).render())
+    assert source.pulled == 21
+    assert console.file.getvalue().count('978020137962') == 20
+
+
+@pytest.mark.benchmark
+def test_pager_time_to_first_screen_is_faster_than_rendering_the_whole_table():
+    def first_screen(renderable):
+        console = Console(file=io.StringIO(), width=200)
+        start = time.perf_counter()
+        console.print(renderable())
+        return time.perf_counter() - start
+
+    paged = first_screen(lambda: CDPager(Source(100_000)).render())
+    full = first_screen(lambda: cd_table("CDs", Source(2_000)))
+    assert paged * 10 < full
@@ -1,11 +1,15 @@
+import json
 import os
+import threading
+import time
 
 import dotenv
 import pytest
 
+from musics_library.cache import ReadCache
 from musics_library.domain import Username, ID, Price, EANCode, Genre, RecordCompany, Artist, Name, CD, Password
-from musics_library.services import AuthenticatedUser, CDService, CDByPublishedByService, CDByArtistService, \
-    ApiException, CDByNameService, AuthenticationService
+from musics_library.services import CDLibrary, AuthenticatedUser, CDService, CDByPublishedByService, CDByArtistService, \
+    ApiException, CDByNameService, AuthenticationService, ConditionalGet, GET_ERROR
 
 
 @pytest.fixture
@@ -32,16 +36,104 @@ def test_musics_service_fetch_musics_detail_wrong_url_raises_exception(requests_
         resp = ms.fetch_cd_detail(id)
 
 
+EMPTY_PAGE = {"next": None, "previous": None, "results": []}
+
+
+def cd_json(id):
+    return {
+        "id": id,
+        "name": "Mod",
+        "artist": "Ciao",
+        "record_company": "Ciao",
+        "genre": "Rock",
+        "ean_code": "978020137962",
+        "price": "15.00",
+        "price_currency": "EUR",
+        "published_by": 1,
+        "user": "ssdsbm",
+        "created_at": "2022-12-04T17:27:28.325209Z",
+        "updated_at": "2022-12-09T14:13:02.610624Z"
+    }
+
+
 def test_musics_service_fetch_musics_list(requests_mock):
-    requests_mock.get("http://localhost:8000/api/v1/musics/", json="")
+    requests_mock.get("http://localhost:8000/api/v1/musics/", json=EMPTY_PAGE)
     ms = CDService()
     resp = ms.fetch_cd_list()
     assert resp != None
 
 
+def test_musics_service_fetch_musics_list_walks_pages_lazily(requests_mock):
+    second_page = "http://localhost:8000/api/v1/musics/?cursor=abc"
+    requests_mock.get("http://localhost:8000/api/v1/musics/",
+                      json={"next": second_page, "previous": None, "results": [cd_json(1), cd_json(2)]})
+    requests_mock.get(second_page, json={"next": None, "previous": None, "results": [cd_json(3)]})
+    ms = CDService()
+    resp = ms.fetch_cd_list()
+    assert requests_mock.call_count == 1
+    assert next(resp).id == ID(1)
+    assert requests_mock.call_count == 1
+    assert [cd.id for cd in resp] == [ID(2), ID(3)]
+    assert requests_mock.call_count == 2
+
+
+def test_musics_service_sends_validators_and_reuses_payload_on_304(requests_mock):
+    path = "http://localhost:8000/api/v1/musics/?page_size=7"
+    requests_mock.get(path, [
+        {'json': {"next": None, "previous": None, "results": [cd_json(1)]},
+         'headers': {'ETag': '"v1"', 'Last-Modified': 'Sun, 04 Dec 2022 17:27:28 GMT'}},
+        {'status_code': 304},
+    ])
+    conditional_get = ConditionalGet()
+    first = conditional_get.get(path, GET_ERROR)
+    second = conditional_get.get(path, GET_ERROR)
+    assert first == second
+    assert requests_mock.request_history[1].headers['If-None-Match'] == '"v1"'
+    assert requests_mock.request_history[1].headers['If-Modified-Since'] == 'Sun, 04 Dec 2022 17:27:28 GMT'
+
+
+def test_conditional_get_forgets_the_least_recently_used_url(requests_mock):
+    paths = [f"http://localhost:8000/api/v1/musics/{i}/" for i in range(1, 4)]
+    for i, path in enumerate(paths, 1):
+        requests_mock.get(path, json=cd_json(i), headers={'ETag': f'"d{i}"'})
+    conditional_get = ConditionalGet(max_entries=2)
+    for path in paths[:2] + [paths[0]] + paths[2:]:
+        conditional_get.get(path, GET_ERROR)
+    assert len(conditional_get) == 2
+    conditional_get.get(paths[0], GET_ERROR)
+    assert requests_mock.request_history[-1].headers['If-None-Match'] == '"d1"'
+    conditional_get.get(paths[1], GET_ERROR)
+    assert 'If-None-Match' not in requests_mock.request_history[-1].headers
+
+
+def test_musics_service_fetch_musics_detail_reuses_payload_on_304(requests_mock):
+    requests_mock.get("http://localhost:8000/api/v1/musics/1/", [
+        {'json': cd_json(1), 'headers': {'ETag': '"d1"'}},
+        {'status_code': 304},
+    ])
+    ms = CDService()
+    assert ms.fetch_cd_detail(ID(1)) == ms.fetch_cd_detail(ID(1))
+    assert requests_mock.request_history[1].headers['If-None-Match'] == '"d1"'
+
+
+def test_musics_service_stream_musics_list(requests_mock):
+    body = "\n".join(json.dumps(cd_json(i)) for i in range(1, 4)) + "\n"
+    requests_mock.get("http://localhost:8000/api/v1/musics/export/?format=ndjson", text=body)
+    ms = CDService()
+    resp = ms.stream_cd_list()
+    assert [cd.id for cd in resp] == [ID(1), ID(2), ID(3)]
+
+
+def test_musics_service_stream_musics_list_wrong_url_raises_exception(requests_mock):
+    with pytest.raises(ApiException):
+        requests_mock.get("http://localhost:8000/api/v1/musics/export/?format=ndjson", status_code=404)
+        ms = CDService()
+        resp = ms.stream_cd_list()
+
+
 def test_musics_service_by_publisher_fetch_musics_list(requests_mock):
     published_by = Username("ssdsbm")
-    requests_mock.get("http://localhost:8000/api/v1/musics/by_published_by?publishedby=" + published_by.value, json="")
+    requests_mock.get("http://localhost:8000/api/v1/musics/by_published_by?publishedby=" + published_by.value, json=EMPTY_PAGE)
     ms = CDByPublishedByService()
     resp = ms.fetch_cd_by_published_by_list(published_by)
     assert resp != None
@@ -49,7 +141,7 @@ def test_musics_service_by_publisher_fetch_musics_list(requests_mock):
 
 def test_musics_service_by_artist_fetch_musics_list(requests_mock):
     artist = Artist("ssdsbm")
-    requests_mock.get("http://localhost:8000/api/v1/musics/byartist?artist=" + artist.value, json="")
+    requests_mock.get("http://localhost:8000/api/v1/musics/byartist?artist=" + artist.value, json=EMPTY_PAGE)
     ms = CDByArtistService()
     resp = ms.fetch_cd_by_artist_list(artist)
     assert resp != None
@@ -58,7 +150,7 @@ def test_musics_service_by_artist_fetch_musics_list(requests_mock):
 def test_musics_service_by_cd_name_fetch_musics_list(requests_mock):
     cd_name = Name("ssdsbm")
     requests_mock.get("http://localhost:8000/api/v1/musics/byname?name=" + cd_name.value,
-                      json="")
+                      json=EMPTY_PAGE)
     ms = CDByNameService()
     resp = ms.fetch_cds_by_name_list(cd_name)
     assert resp != None
@@ -153,3 +245,136 @@ def test_musics_service_add_music_raises_exception(requests_mock):
             auth_user=AuthenticatedUser("kkbb", ID(1), Username("ciao"),True,True))
 
 
+
+
+def test_cd_library_sync_applies_changes_to_store(requests_mock):
+    requests_mock.get("http://localhost:8000/api/v1/musics/changes",
+                      json={"changed": [cd_json(1), cd_json(2)], "deleted": [], "token": "t1", "has_more": True})
+    requests_mock.get("http://localhost:8000/api/v1/musics/changes?since=t1",
+                      json={"changed": [cd_json(3)], "deleted": [], "token": "t2", "has_more": False})
+    library = CDLibrary()
+    assert library.sync() == 3
+    assert [cd.id for cd in library.store.cds()] == [ID(1), ID(2), ID(3)]
+
+    updated = dict(cd_json(2), name="Animals")
+    requests_mock.get("http://localhost:8000/api/v1/musics/changes?since=t2",
+                      json={"changed": [updated], "deleted": [1], "token": "t3", "has_more": False})
+    assert library.sync() == 2
+    assert [cd.id for cd in library.store.cds()] == [ID(2), ID(3)]
+    assert library.store.cd(ID(2)).name == Name("Animals")
+    assert library.store.token == "t3"
+
+
+def test_cd_library_sync_wrong_url_raises_exception(requests_mock):
+    requests_mock.get("http://localhost:8000/api/v1/musics/changes", status_code=404)
+    with pytest.raises(ApiException):
+        CDLibrary().sync()
+
+
+def test_cd_library_listing_is_fetched_lazily_and_cached_once_read_to_the_end(requests_mock):
+    requests_mock.get("http://localhost:8000/api/v1/musics/",
+                      json={"next": "http://localhost:8000/api/v1/musics/?cursor=p2", "previous": None,
+                            "results": [cd_json(1)]})
+    requests_mock.get("http://localhost:8000/api/v1/musics/?cursor=p2",
+                      json={"next": None, "previous": None, "results": [cd_json(2)]})
+    library = CDLibrary()
+    cds = library.cds()
+    assert requests_mock.call_count == 1
+    assert [cd.id for cd in cds] == [ID(1), ID(2)]
+    assert requests_mock.call_count == 2
+    assert [cd.id for cd in library.cds()] == [ID(1), ID(2)]
+    assert requests_mock.call_count == 2
+
+
+def test_cd_library_does_not_cache_listings_longer_than_max_rows(requests_mock):
+    requests_mock.get("http://localhost:8000/api/v1/musics/",
+                      json={"next": None, "previous": None, "results": [cd_json(1), cd_json(2)]})
+    library = CDLibrary(read_cache=ReadCache(max_rows=1))
+    assert len(list(library.cds())) == len(list(library.cds())) == 2
+    assert requests_mock.call_count == 2
+
+
+def test_cd_library_interrupted_sync_leaves_the_mirror_unsynced(requests_mock):
+    requests_mock.get("http://localhost:8000/api/v1/musics/changes",
+                      json={"changed": [cd_json(1)], "deleted": [], "token": "t1", "has_more": True})
+    requests_mock.get("http://localhost:8000/api/v1/musics/changes?since=t1", status_code=503)
+    requests_mock.get("http://localhost:8000/api/v1/musics/", json={"next": None, "previous": None,
+                                                                    "results": [cd_json(1), cd_json(2)]})
+    library = CDLibrary()
+    with pytest.raises(ApiException):
+        library.sync()
+    assert library.store.token == "t1"
+    assert library.store.synced_at is None
+    assert [cd.id for cd in library.cds()] == [ID(1), ID(2)]
+
+
+def test_cd_library_concurrent_syncs_page_the_feed_one_at_a_time(monkeypatch):
+    library = CDLibrary()
+    active, overlaps = [], []
+
+    def fetch_changes(token):
+        active.append(token)
+        overlaps.append(len(active))
+        time.sleep(0.01)
+        active.pop()
+        return [], [], "t1", token is None
+
+    monkeypatch.setattr(library.cd_service, 'fetch_changes', fetch_changes)
+    threads = [threading.Thread(target=library.sync) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(overlaps) == 1
+    assert library.store.synced_at is not None
+
+
+def synced_library(requests_mock):
+    requests_mock.get("http://localhost:8000/api/v1/musics/changes",
+                      json={"changed": [cd_json(1), dict(cd_json(2), artist="Blur")], "deleted": [], "token": "t1",
+                            "has_more": False})
+    library = CDLibrary()
+    library.sync()
+    return library
+
+
+def test_cd_library_reads_are_served_by_the_mirror_once_synced(requests_mock):
+    library = synced_library(requests_mock)
+    requests_mock.reset_mock()
+    assert [cd.id for cd in library.cds()] == [ID(1), ID(2)]
+    assert [cd.id for cd in library.cds_by_artist(Artist("blur"))] == [ID(2)]
+    assert [cd.id for cd in library.cds_by_cd_name(Name("Mod"))] == [ID(1), ID(2)]
+    assert [cd.id for cd in library.cds_by_published_by(Username("ssdsbm"))] == [ID(1), ID(2)]
+    assert library.cd(ID(2)).artist == Artist("Blur")
+    assert requests_mock.call_count == 0
+
+
+def test_cd_library_stale_mirror_keeps_answering_when_the_api_is_down(requests_mock, monkeypatch):
+    library = synced_library(requests_mock)
+    monkeypatch.setattr('musics_library.services.mirror_max_age', -1)
+    requests_mock.get("http://localhost:8000/api/v1/musics/changes?since=t1", status_code=503)
+    assert [cd.id for cd in library.cds()] == [ID(1), ID(2)]
+
+
+def test_cd_library_unsynced_reads_go_to_the_api(requests_mock):
+    requests_mock.get("http://localhost:8000/api/v1/musics/", json=EMPTY_PAGE)
+    assert list(CDLibrary().cds()) == []
+    assert requests_mock.called
+
+
+def test_cd_library_caches_reads_until_a_write_invalidates_them(requests_mock):
+    requests_mock.get("http://localhost:8000/api/v1/musics/2/", json=cd_json(2))
+    requests_mock.get("http://localhost:8000/api/v1/musics/byartist?artist=Other",
+                      json={"next": None, "previous": None, "results": []})
+    requests_mock.put("http://localhost:8000/api/v1/musics/2/", json=cd_json(2))
+    library = CDLibrary()
+    cd = library.cd(ID(2))
+    library.cd(ID(2))
+    list(library.cds_by_artist(Artist("Other")))
+    assert requests_mock.call_count == 2
+
+    library.update_cd(cd, AuthenticatedUser("kkbb", ID(1), Username("ciao"), True, True))
+    list(library.cds_by_artist(Artist("Other")))
+    library.cd(ID(2))
+    assert requests_mock.call_count == 4
+    assert library.read_cache.stats()['hits'] == 2
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+# cumulative import time of musics_library.app, most of it is typeguard instrumenting the domain
+STARTUP_BUDGET = float(os.getenv('MUSICS_STARTUP_BUDGET', 3.0))
+# loaded on first use, never before the menu shows up
+DEFERRED = ['requests', 'urllib3', 'pwinput', 'dateutil', 'stdnum', 'art', 'rich.table', 'httpx']
+
+
+def import_app():
+    # a fresh interpreter, the test session has already imported everything
+    code = 'import sys, musics_library.app; print(" ".join(sorted(sys.modules)))'
+    res = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, capture_output=True,
+                         text=True, check=True)
+    cumulative = {}
+    for line in res.stderr.splitlines():
+        if line.startswith('import time:') and not line.endswith('package'):
+            _, us, total, name = (part.strip() for part in line.replace('import time:', '|').split('|'))
+            cumulative[name] = int(total)
+    return set(res.stdout.split()), cumulative
+
+
+def test_heavy_modules_are_not_imported_at_startup():
+    modules, _ = import_app()
+    assert [name for name in DEFERRED if name in modules] == []
+
+
+def test_startup_import_time_is_within_budget():
+    _, cumulative = import_app()
+    assert cumulative['musics_library.app'] / 1e6 < STARTUP_BUDGET
@@ -0,0 +1,95 @@
+import sqlite3
+from datetime import datetime, timezone
+
+from musics_library.domain import Username, ID, Price, EANCode, Genre, RecordCompany, Artist, Name, CD
+from musics_library.mappers import FastCDMapper
+from musics_library.pager import CDPager
+from musics_library.store import CDStore, FETCH_SIZE, _default_mirror_path
+
+CREATED_AT = datetime(2022, 12, 4, 17, 27, 28, 325209, tzinfo=timezone.utc)
+
+
+def cd(id, name="Mod", artist="Ciao", published_by="ssdsbm"):
+    return CD(id=ID(id), name=Name(name), artist=Artist(artist), record_company=RecordCompany("Ciao"),
+              genre=Genre("Rock"), ean_code=EANCode("978020137962"), price=Price.parse("15.99"),
+              published_by=Username(published_by), created_at=CREATED_AT, updated_at=CREATED_AT)
+
+
+def test_store_apply_and_read_back():
+    store = CDStore()
+    store.apply([cd(2), cd(1)], [], "t1")
+    assert list(store.cds()) == [cd(1), cd(2)]
+    assert store.cd(ID(2)) == cd(2)
+    assert store.cd(ID(3)) is None
+    assert store.token == "t1"
+    assert len(store) == 2
+
+
+def test_store_apply_replaces_and_deletes():
+    store = CDStore()
+    store.apply([cd(1), cd(2)], [], "t1")
+    store.apply([cd(2, name="Animals")], [ID(1)], "t2")
+    assert list(store.cds()) == [cd(2, name="Animals")]
+
+
+def test_store_partial_apply_keeps_the_store_unsynced():
+    store = CDStore()
+    store.apply([cd(1)], [], "t1", complete=False)
+    assert store.token == "t1"
+    assert store.synced_at is None
+    store.apply([cd(2)], [], "t2")
+    assert store.synced_at is not None
+
+
+def test_store_search_is_case_insensitive_substring():
+    store = CDStore()
+    store.apply([cd(1, artist="Pink Floyd"), cd(2, artist="Blur"), cd(3, name="Floyd", published_by="floyd")], [],
+                "t1")
+    assert [c.id for c in store.search('artist', 'floyd')] == [ID(1)]
+    assert [c.id for c in store.search('name', 'FLO')] == [ID(3)]
+    assert [c.id for c in store.search('published_by', 'loy')] == [ID(3)]
+    assert list(store.search('artist', '%')) == []
+
+
+def test_store_reads_listings_lazily_in_batches(monkeypatch):
+    store = CDStore()
+    store.apply([cd(i) for i in range(1, 2 * FETCH_SIZE + 51)], [], "t1")
+    mapped = []
+    trusted_cd = FastCDMapper.trusted_cd
+    monkeypatch.setattr(FastCDMapper, 'trusted_cd', lambda *row: mapped.append(row[0]) or trusted_cd(*row))
+    pager = CDPager(store.cds(), page_size=10)
+    assert [c.id for c in pager.page(0)] == [ID(i) for i in range(1, 11)]
+    assert max(mapped) == 11  # the rows of the page and the one ahead, not the whole batch
+    store.apply([cd(1000)], [], "t2")  # a sync can write while the listing is paged
+    assert len(list(store.cds())) == 2 * FETCH_SIZE + 51
+    assert [c.id for c in store.search('artist', 'ciao')][-1] == ID(1000)
+
+
+def test_store_persists_across_restarts(tmp_path):
+    path = str(tmp_path / 'mirror.sqlite3')
+    store = CDStore(path)
+    store.apply([cd(1)], [], "t1")
+    store.close()
+    reopened = CDStore(path)
+    assert list(reopened.cds()) == [cd(1)]
+    assert reopened.token == "t1"
+    assert reopened.synced_at is not None
+
+
+def test_store_creates_the_directory_of_its_file(tmp_path):
+    path = tmp_path / 'data' / 'musics_library' / 'mirror.sqlite3'
+    CDStore(str(path)).close()
+    assert path.exists()
+
+
+def test_default_mirror_is_a_file_in_the_user_data_directory(monkeypatch, tmp_path):
+    monkeypatch.setattr('os.name', 'posix')
+    monkeypatch.setenv('XDG_DATA_HOME', str(tmp_path))
+    assert _default_mirror_path() == str(tmp_path / 'musics_library' / 'mirror.sqlite3')
+
+
+def test_store_indexes_searchable_columns(tmp_path):
+    path = str(tmp_path / 'mirror.sqlite3')
+    CDStore(path).close()
+    indexes = {row[0] for row in sqlite3.connect(path).execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert {'cd_artist_idx', 'cd_name_idx', 'cd_published_by_idx'} <= indexes
@@ -0,0 +1,119 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from musics_library.domain import Username, Password
+from musics_library.services import AuthenticationService
+from musics_library.transport import Transport, transport
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    failures = 0
+    connections = 0
+
+    def setup(self):
+        StubHandler.connections += 1
+        super().setup()
+
+    def do_GET(self):
+        if self.path == '/flaky' and StubHandler.failures > 0:
+            StubHandler.failures -= 1
+            self.reply(503, b'{}')
+            return
+        self.reply(200, b'{"results": [], "next": null}')
+
+    def do_POST(self):
+        self.reply(503, b'{}')
+
+    def reply(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_transport_applies_default_timeout(requests_mock):
+    requests_mock.get('http://localhost:8000/api/v1/musics/', json={})
+    Transport(connect_timeout=1, read_timeout=2).get('http://localhost:8000/api/v1/musics/')
+    assert requests_mock.last_request.timeout == (1, 2)
+
+
+def test_login_presets_authorization_header_and_logout_clears_it(requests_mock):
+    requests_mock.post(url="http://localhost:8000/api/v1/auth/login/",
+                       json={"key": "abCde", "user": {"id": 1, "username": "ssdsbm", "is_superuser": True,
+                                                      "groups": [{"name": "publishers"}]}})
+    requests_mock.post(url="http://localhost:8000/api/v1/auth/logout/", json="Logout successfull")
+    requests_mock.get('http://localhost:8000/api/v1/musics/', json={})
+    auth_service = AuthenticationService()
+    user = auth_service.login(Username("sssbm"), Password("ssdsbm1234"))
+    assert transport.key == "abCde"
+
+    transport.get('http://localhost:8000/api/v1/musics/')
+    assert requests_mock.last_request.headers['Authorization'] == 'Token abCde'
+
+    auth_service.logout(user)
+    assert transport.key is None
+
+
+def test_transport_retries_idempotent_requests_with_backoff(stub_server):
+    StubHandler.failures = 2
+    res = Transport(retries=3, backoff_factor=0).get(stub_server + '/flaky')
+    assert res.status_code == 200
+    assert StubHandler.failures == 0
+
+
+def test_transport_does_not_retry_post(stub_server):
+    res = Transport(retries=3, backoff_factor=0).post(stub_server + '/')
+    assert res.status_code == 503
+    assert len(res.raw.retries.history) == 0
+
+
+def test_pooled_transport_reuses_one_connection(stub_server):
+    pooled = Transport()
+    StubHandler.connections = 0
+    for _ in range(20):
+        assert pooled.get(stub_server + '/').status_code == 200
+    pooled.close()
+    assert StubHandler.connections == 1
+
+    StubHandler.connections = 0
+    for _ in range(20):
+        assert requests.get(stub_server + '/').status_code == 200
+    assert StubHandler.connections == 20
+
+
+@pytest.mark.benchmark
+def test_pooled_transport_is_faster_than_a_connection_per_request(stub_server):
+    rounds = 200
+
+    def timed(get):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            assert get(stub_server + '/').status_code == 200
+        return time.perf_counter() - start
+
+    pooled = Transport()
+    pooled.get(stub_server + '/')  # warm up the pool
+    fresh_time = timed(requests.get)
+    pooled_time = timed(pooled.get)
+    pooled.close()
+    assert pooled_time < fresh_time
@@ -1,2 +1,42 @@
+import re
+import time
 
+import pytest
 
+from validation.regex import pattern
+
+
+def test_pattern_matches_the_whole_value():
+    validator = pattern(r'[A-Za-z0-9-]*')
+    assert validator("ssdsbm-28")
+    assert not validator("ssdsbm 28")
+
+
+def test_pattern_returns_the_shared_callable():
+    assert pattern(r'[A-Za-z ]*') is pattern(r'[A-Za-z ]*')
+    assert pattern(r'[A-Za-z ]*') is not pattern(r'[a-z ]*')
+
+
+def test_shared_pattern_compiles_its_regex_once(monkeypatch):
+    import validation.regex
+    compiled = []
+    monkeypatch.setattr(validation.regex, '_compile', lambda regex: compiled.append(regex) or re.compile(regex))
+    regex = r'Artist \d{1,3}'  # not used by the domain, compiled for the first time here
+    for i in range(100):
+        assert pattern(regex)(f"Artist {i}")
+    assert compiled == [regex]
+
+
+@pytest.mark.benchmark
+def test_shared_pattern_is_faster_than_the_re_module_cache():
+    # re.fullmatch with the pattern string looks the compiled regex up in the re module cache on every call
+    values = [f"Artist {i}" for i in range(20000)]
+    regex = r'[A-Za-z0-9- ,!@]*'
+
+    def timed(validate):
+        start = time.perf_counter()
+        for value in values:
+            validate(value)
+        return time.perf_counter() - start
+    shared, cached = timed(pattern(regex)), timed(lambda value: bool(re.fullmatch(regex, value)))
+    assert shared < cached, f'{shared:.4f}s shared, {cached:.4f}s through the re module cache'
@@ -1,11 +1,21 @@
 from typeguard import typechecked
-from typing import Callable
+from typing import Callable, Dict
 import re
 
+# every validator is compiled once and shared, asking again for the same regex returns the same callable
+_registry: Dict[str, Callable] = {}
+# how the registry compiles, replaced by the tests that count compilations
+_compile = re.compile
+
+
 @typechecked
 def pattern(regex:str) -> Callable:
-    r = re.compile(regex)
+    res = _registry.get(regex)
+    if res is not None:
+        return res
+    r = _compile(regex)
     def res(value):
         return bool(r.fullmatch(value))
     res.__name__ = f'pattern({regex})'
+    _registry[regex] = res
     return res
\ No newline at end of file